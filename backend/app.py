@@ -1,82 +1,147 @@
 # backend/app.py
 
 import logging
+import threading
 from flask import Flask, send_from_directory, jsonify, request
 from flask_restful import Api
-from flasgger import Swagger
 from flask_cors import CORS
 from config.config import Config
-from db.cosmos_mongo_db import CosmosDB
+from config.logging_config import configure_logging
+from db.lazy_db import LazyCosmosDB
+from db.catalog_snapshot import CatalogSnapshot
+from metrics import init_request_metrics, register_collections
+from profiling import init_profiling
 from resources.course_resource import CourseResource
 from resources.college_degree_resource import CollegeDegrees  # Import CollegeDegrees
-from course_types import COURSE_TYPES  # Import COURSE_TYPES from course_types.py
-from swagger_config import generate_swagger_spec  # Import the Swagger config generator
+from swagger_config import CachedSwaggerSpec  # Swagger spec generated on first use
+from services.conditional_get import conditional_get
+from services.read_options import parse_read_options
+from services.program_registry import ProgramRegistry, discover_program_slugs, program_slug
+from services.course_search import CourseSearchIndex, MAX_RESULTS
+from services.prerequisite_graph import PrerequisiteGraph, normalize_course_code
+from services.program_overlap import ProgramOverlapIndex
 import os
-import time
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG,  # Set the logging level to DEBUG
-                    format='%(asctime)s %(levelname)s: %(message)s',  # Set log format
-                    datefmt='%Y-%m-%d %H:%M:%S')  # Set date and time format
+logger = logging.getLogger(__name__)
 
 def print_available_routes(app):
-    """Print all available routes in the application."""
-    print("\nAvailable Routes:")
+    """Log all available routes in the application at DEBUG level."""
     for rule in app.url_map.iter_rules():
         if "GET" in rule.methods:
-            print(f"{rule} -> {rule.endpoint}")
-            time.sleep(5)
+            logger.debug("Route %s -> %s", rule, rule.endpoint)
+
+def create_cosmos_db():
+    """
+    Create the storage backend chosen by the 'storage_backend' environment variable: 'cosmos' (the default)
+    or 'local', which serves the data/*.json files without a database. Only the chosen backend is imported.
+    """
+    storage_backend = os.getenv('storage_backend', 'cosmos').lower()
+    if storage_backend == 'local':
+        from db.local_store import LocalStore
+        return LocalStore.from_environment()
+    if storage_backend != 'cosmos':
+        raise ValueError(f"Unknown storage backend: {storage_backend}")
+    from db.cosmos_mongo_db import CosmosDB
+    return CosmosDB.from_environment()
+
+def init_swagger(app, program_slugs):
+    """Set up Swagger API documentation, importing flasgger only here."""
+    from flasgger import Swagger
+    return Swagger(app, template=CachedSwaggerSpec(program_slugs))  # Built on the first request to the docs
 
 def create_app():
+    # Levels, format, truncation and sampling come from the environment (see config/logging_config.py)
+    configure_logging()
+
     # Initialize Flask application
     app = Flask(__name__, static_folder='../frontend', static_url_path='/')
     CORS(app)  # Enable CORS for cross-origin requests
 
+    # Every program roadmap served under /api/<program_slug>
+    program_slugs = discover_program_slugs()
+
     # Configuring Swagger for API documentation
     app.config.from_object(Config)
-    swagger = Swagger(app, template=generate_swagger_spec())  # Use the dynamic Swagger generation
+    if app.config['ENABLE_SWAGGER']:
+        init_swagger(app, program_slugs)
+
+    # The database handle is created on first use ('lazy'), in a background thread ('background', the default)
+    # or before any route is registered ('eager'). The connection string comes from the environment, a local
+    # file or Key Vault, in that order.
+    cosmos_db = LazyCosmosDB(create_cosmos_db)
+    db_init_mode = app.config['DB_INIT_MODE']
+    if db_init_mode == 'eager':
+        cosmos_db.get()
+    elif db_init_mode == 'background':
+        cosmos_db.start_background()
+
+    # The catalog collections: metrics are labelled with these names, any other collection as 'other'
+    collection_names = [slug.replace("-", "_") for slug in program_slugs] + ['colleges_degrees']
+    register_collections(collection_names)
+
+    # With 'catalog_snapshot_path' set, every worker maps one file of pre-encoded roadmaps and colleges-degrees
+    # and serves them from it, even before the database is connected. It is rebuilt in the background after writes.
+    snapshot = CatalogSnapshot.from_environment(cosmos_db, collection_names)
+    if snapshot is not None:
+        snapshot.schedule_build()  # Nothing is written if the snapshot is already current
+
+    programs = ProgramRegistry(cosmos_db, program_slugs, snapshot)
 
-    # Initialize CosmosDB using Key Vault for secure credential management
-    cosmos_db = CosmosDB.from_key_vault()
+    # Opt-in cProfile profiles of roadmap, colleges-degrees and update-course requests, and tracemalloc snapshots
+    init_profiling(app)
+
+    # Request latency and size per route, and the Prometheus /metrics endpoint
+    init_request_metrics(app)
 
     # Initialize API and resources with the `cosmos_db` instance
     api = Api(app)
     
     # Register the CollegeDegrees resource
-    api.add_resource(CollegeDegrees, '/api/colleges-degrees', resource_class_args=[cosmos_db])
-
-    # Dynamically add routes for courses
-    for course in COURSE_TYPES:
-        level = course["level"]
-        course_type = course["course_type"]
-        endpoint = f"/api/{level}-{course_type.replace('_', '-')}-courses"
+    api.add_resource(CollegeDegrees, '/api/colleges-degrees', resource_class_args=[cosmos_db, snapshot])
 
-        # Unique endpoint name with underscores
-        endpoint_name = f"{level}_{course_type}_courses"
-
-        api.add_resource(
-            CourseResource,
-            endpoint,
-            resource_class_args=(cosmos_db, level, course_type),
-            endpoint=endpoint_name  # Use underscores for the endpoint name
-        )
-        logging.debug(f"Added resource: {endpoint} with endpoint name {endpoint_name}")
+    # One route serves every program roadmap, e.g. /api/bachelor-economics-courses; the registry is built once
+    # from colleges_degrees.json, data_files_config.json and COURSE_TYPES. Static /api/... rules take precedence.
+    api.add_resource(CourseResource, '/api/<string:program_slug>', resource_class_args=[programs], endpoint='program_courses')
+    logger.debug("Added resource: /api/<program_slug> for %s programs", len(programs))
 
     # Prevent caching by setting headers
     @app.after_request
     def add_cache_control_headers(response):
+        # Versioned responses may be stored but must be revalidated with If-None-Match on every use
+        if response.get_etag()[0] is not None:
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
         response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
         return response
 
     # Register additional routes
-    register_routes(app, cosmos_db)
+    register_routes(app, cosmos_db, programs, snapshot)
 
     return app
 
 
-def register_routes(app, cosmos_db):
+def register_routes(app, cosmos_db, programs, snapshot=None):
+    # Indexes derived from the roadmaps, built on first use and then kept current as courses are written
+    search_index = CourseSearchIndex(cosmos_db, programs)
+    prerequisite_graph = PrerequisiteGraph(cosmos_db, programs)
+    overlap_index = ProgramOverlapIndex(cosmos_db, programs)
+    catalog_indexes = [search_index, prerequisite_graph, overlap_index]
+
+    def collection_written(collection_name):
+        for index in catalog_indexes:
+            index.invalidate(collection_name)
+        if snapshot is not None:
+            snapshot.schedule_build()
+
+    def course_updated(collection_name, course_id, field, value):
+        for index in catalog_indexes:
+            index.course_updated(collection_name, course_id, field, value)
+        if snapshot is not None:
+            snapshot.schedule_build()
+
     # API routes
     @app.route('/api/create-collection', methods=['POST'])
     def create_collection():
@@ -91,42 +156,238 @@ def register_routes(app, cosmos_db):
     @app.route('/api/add-data/<collection_name>', methods=['POST'])
     def add_data(collection_name):
         data = request.get_json()
-        return cosmos_db.add_data(collection_name, data)
+        body, status_code = cosmos_db.add_data(collection_name, data)
+        if 200 <= status_code < 300:
+            collection_written(collection_name)
+        return body, status_code
 
     @app.route('/api/get-data/<collection_name>', methods=['GET'])
     def get_data(collection_name):
-        return cosmos_db.get_data(collection_name)
+        try:
+            options = parse_read_options(request.args, course_collection=collection_name.endswith('_courses'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if options:
+            return cosmos_db.get_data(collection_name, **options)
+        return conditional_get(cosmos_db, collection_name, lambda: cosmos_db.get_data(collection_name), snapshot)
+
+    # Hours per semester/year/degree, advanced hours and GEC coverage without downloading the roadmap
+    @app.route('/api/<program_slug>/summary', methods=['GET'])
+    def program_summary(program_slug):
+        service = programs.get(program_slug)
+        if service is None:
+            return jsonify({"error": f"Unknown program: {program_slug}"}), 404
+        collection_name = service.collection_name
+        return conditional_get(cosmos_db, collection_name, lambda: cosmos_db.get_summary(collection_name))
+
+    # Prerequisites of a course and the courses it unlocks, e.g. /api/prerequisites/ECON-2301
+    @app.route('/api/prerequisites/<course_code>', methods=['GET'])
+    def course_prerequisites(course_code):
+        code = normalize_course_code(course_code)
+        if code is None:
+            return jsonify({"error": f"Invalid course code: {course_code}"}), 400
+        try:
+            course = prerequisite_graph.course(code)
+        except Exception as e:
+            logger.error("Prerequisite lookup failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+        if course is None:
+            return jsonify({"error": f"Course not found: {code}"}), 404
+        return jsonify(course), 200
+
+    # Prerequisite cycles across all roadmaps
+    @app.route('/api/prerequisite-cycles', methods=['GET'])
+    def prerequisite_cycles():
+        try:
+            return jsonify({"cycles": prerequisite_graph.cycles()}), 200
+        except Exception as e:
+            logger.error("Prerequisite cycle check failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+
+    # Courses scheduled before (or with) their prerequisites, and cycles, in a program's roadmap
+    @app.route('/api/<program_slug>/prerequisite-check', methods=['GET'])
+    def program_prerequisite_check(program_slug):
+        service = programs.get(program_slug)
+        if service is None:
+            return jsonify({"error": f"Unknown program: {program_slug}"}), 404
+        try:
+            return jsonify(prerequisite_graph.check_program(service.collection_name)), 200
+        except Exception as e:
+            logger.error("Prerequisite check failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+
+    # Courses shared by programs, e.g. /api/programs/overlap?a=bachelor-economics-courses&b=bachelor-economics-finance-double-major-courses
+    # (more programs can be compared with repeated 'program' parameters)
+    @app.route('/api/programs/overlap', methods=['GET'])
+    def programs_overlap():
+        slugs = request.args.getlist('program') or [slug for slug in (request.args.get('a'), request.args.get('b')) if slug]
+        if len(slugs) < 2:
+            return jsonify({"error": "At least two programs are required (a and b, or repeated program)"}), 400
+        unknown = [slug for slug in slugs if slug not in programs]
+        if unknown:
+            return jsonify({"error": f"Unknown program: {', '.join(unknown)}"}), 404
+        try:
+            return jsonify(overlap_index.overlap([program_slug(slug) for slug in slugs])), 200
+        except Exception as e:
+            logger.error("Overlap query failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+
+    # All-pairs similarity of the programs' course sets
+    @app.route('/api/programs/similarity', methods=['GET'])
+    def programs_similarity():
+        try:
+            return jsonify(overlap_index.similarity_matrix(request.args.get('metric', 'jaccard'))), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            logger.error("Similarity matrix failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+
+    # Programs and positions where a course appears, e.g. /api/courses/MATH-1324/programs
+    @app.route('/api/courses/<course_code>/programs', methods=['GET'])
+    def course_programs(course_code):
+        code = normalize_course_code(course_code)
+        if code is None:
+            return jsonify({"error": f"Invalid course code: {course_code}"}), 400
+        try:
+            return jsonify({"course": code, "programs": overlap_index.programs_of(code)}), 200
+        except Exception as e:
+            logger.error("Course program lookup failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+
+    # Expose the catalog cache counters so the hit ratio can be monitored
+    @app.route('/api/cache-stats', methods=['GET'])
+    def cache_stats():
+        return jsonify(cosmos_db.cache.stats()), 200
+
+    # Revisions of the catalog collections (or of ?collections=a,b) in one query, to check freshness cheaply
+    @app.route('/api/revisions', methods=['GET'])
+    def collection_revisions():
+        collection_names = [name.strip() for name in request.args.get('collections', '').split(',') if name.strip()]
+        if not collection_names:
+            collection_names = list(programs.collections().values()) + ['colleges_degrees']
+        try:
+            revisions = cosmos_db.get_revisions(collection_names)
+        except Exception as e:
+            logger.error("Failed to read revisions: %s", e)
+            return jsonify({"error": str(e)}), 500
+        return jsonify({"revisions": revisions}), 200
+
+    # Collections written after ?since=<sequence>, waiting up to ?timeout=<seconds> for one (long polling).
+    # Without 'since' only the current sequence is returned. A waiting request holds a worker thread, so at most
+    # 'change_feed_max_waiters' requests wait per process (4 of the 8 threads per worker in the Dockerfile);
+    # past that they are answered right away, as with timeout=0.
+    max_change_wait = float(os.getenv('change_feed_max_wait_seconds', 25))
+    change_waiters = threading.BoundedSemaphore(int(os.getenv('change_feed_max_waiters', 4)))
+
+    @app.route('/api/changes', methods=['GET'])
+    def collection_changes():
+        try:
+            since = int(request.args['since']) if 'since' in request.args else None
+            timeout = float(request.args.get('timeout', 0))
+        except ValueError:
+            return jsonify({"error": "since must be an integer and timeout a number"}), 400
+        if since is not None and since < 0:
+            return jsonify({"error": "since must not be negative"}), 400
+        if not 0 <= timeout <= max_change_wait:
+            return jsonify({"error": f"timeout must be between 0 and {max_change_wait:g}"}), 400
+
+        waiting = timeout > 0 and change_waiters.acquire(blocking=False)
+        try:
+            result = cosmos_db.get_changes(since, timeout if waiting else 0)
+        except Exception as e:
+            logger.error("Failed to read changes: %s", e)
+            return jsonify({"error": str(e)}), 500
+        finally:
+            if waiting:
+                change_waiters.release()
+        return jsonify(result), 200
+
+    # Assign stable course ids to documents stored before ids existed
+    @app.route('/api/backfill-course-ids/<collection_name>', methods=['POST'])
+    def backfill_course_ids(collection_name):
+        body, status_code = cosmos_db.backfill_course_ids(collection_name)
+        if 200 <= status_code < 300:
+            collection_written(collection_name)
+        return body, status_code
+
+    # Courses of every program matching all terms of q (course number, title, notes, prerequisites)
+    @app.route('/api/search', methods=['GET'])
+    def search_courses():
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Query parameter 'q' is required"}), 400
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        if not 0 < limit <= MAX_RESULTS:
+            return jsonify({"error": f"limit must be between 1 and {MAX_RESULTS}"}), 400
+
+        program = request.args.get('program')
+        if program and program not in programs:
+            return jsonify({"error": f"Unknown program: {program}"}), 404
+
+        try:
+            results = search_index.search(query, limit=limit, program=program_slug(program) if program else None)
+        except Exception as e:
+            logger.error("Search failed: %s", e)
+            return jsonify({"error": str(e)}), 500
+        return jsonify({"query": query, "results": results}), 200
 
     # New route to handle course updates
     @app.route('/api/update-course', methods=['PUT'])
     def update_course():
-        logging.debug("Received request to update course")
-
         try:
             data = request.get_json()
-            logging.debug(f"Request data: {data}")
 
             collection_name = data.get('collectionName')
+            course_id = data.get('courseId')  # Stable id, preferred when the client has it
             course_title = data.get('courseTitle')  # Using course title
             field = data.get('field')
             value = data.get('value')
 
-            logging.debug(f"Collection: {collection_name}, Course Title: {course_title}, Field: {field}, Value: {value}")
+            # Arguments are only formatted if DEBUG is enabled for this module, on the logging thread
+            logger.debug("Update course: collection %s, course id %s, title %s, field %s, value %r",
+                         collection_name, course_id, course_title, field, value)
+
+            update_result = cosmos_db.update_course(collection_name, course_title, field, value, course_id=course_id)
 
-            update_result = cosmos_db.update_course(collection_name, course_title, field, value)
+            # Errors come back as (body, status_code) tuples
+            if isinstance(update_result, tuple):
+                body, status_code = update_result
+                return jsonify(body), status_code
 
             if update_result.get('updated'):
-                logging.info(f"Update successful for course title {course_title} in field {field} with new value {value}")
+                course_updated(collection_name, course_id, field, value)
+                logger.info("Update successful for course %s in field %s", course_id or course_title, field,
+                            extra={"event": "course_updated", "collection": collection_name})
                 return jsonify({"message": "Update successful"}), 200
             else:
-                logging.warning(f"Update failed or not needed for course title {course_title}")
+                logger.warning("Update failed or not needed for course title %s", course_title)
                 return jsonify({"error": "Update failed"}), 500
 
         except Exception as e:
-            logging.error(f"Exception occurred while processing the update request: {e}")
+            logger.error("Exception occurred while processing the update request: %s", e)
             return jsonify({"error": "Internal Server Error"}), 500
 
 
+    # Batch of cell edits; each touched document is written once
+    @app.route('/api/update-courses', methods=['PUT'])
+    def update_courses():
+        data = request.get_json(silent=True) or {}
+        edits = data.get('edits')
+        if not isinstance(edits, list) or not edits:
+            return jsonify({"error": "Request body must contain a non-empty 'edits' list"}), 400
+
+        logger.debug("Received batch of %s course edits", len(edits))
+        results = cosmos_db.update_courses(edits)
+        for edit, result in zip(edits, results):
+            if result.get('status') == 'success':
+                course_updated(edit['collectionName'], edit.get('courseId'), edit['field'], edit.get('value'))
+        failed = sum(1 for result in results if "error" in result)
+        return jsonify({"results": results, "succeeded": len(results) - failed, "failed": failed}), 200
+
     # Serve the index.html file for all non-API routes (SPA support)
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -136,11 +397,19 @@ def register_routes(app, cosmos_db):
         else:
             return send_from_directory(app.static_folder, 'index.html')
 
-    # Health check route to confirm that the service is running
+    # Health check route to confirm that the service is running (liveness; never touches the database)
     @app.route('/health', methods=['GET'])
     def health_check():
         return jsonify({"status": "healthy"}), 200
 
+    # Readiness: whether the database handle exists and answers
+    @app.route('/ready', methods=['GET'])
+    def readiness_check():
+        ready, status = cosmos_db.readiness()
+        if not ready and status["status"] == "starting":
+            cosmos_db.start_background()  # In lazy mode the first readiness probe starts the connection
+        return jsonify(status), 200 if ready else 503
+
 if __name__ == '__main__':
     app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,153 @@
+# backend/asgi.py
+#
+# Async serving mode: run with an ASGI server instead of gunicorn's sync workers, e.g.
+#     uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+# Catalog reads (program roadmaps, colleges-degrees, get-data, summaries) are served by coroutines on a shared
+# motor connection pool, so slow or throttled Cosmos reads no longer hold a worker each. Every other route, and
+# reads with projection/pagination/streaming options, go to the Flask app from create_app in a thread pool.
+
+import os
+import json
+import asyncio
+import logging
+from a2wsgi import WSGIMiddleware
+from werkzeug.http import http_date, parse_accept_header, parse_etags
+from app import create_app
+from services.conditional_get import collection_etag
+from services.program_registry import discover_program_slugs, program_slug
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogASGI:
+    def __init__(self, flask_app, program_slugs, wsgi_threads=None):
+        """
+        ASGI application answering the catalog read routes asynchronously and passing the rest to Flask.
+
+        :param flask_app: The Flask application from create_app.
+        :param program_slugs: The program slugs served under /api/<program_slug>.
+        :param wsgi_threads: Threads running Flask requests; 'asgi_wsgi_threads' from the environment by default (10).
+        """
+        if wsgi_threads is None:
+            wsgi_threads = int(os.getenv('asgi_wsgi_threads', 10))
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_threads)
+        self.collections = {slug: slug.replace("-", "_") for slug in program_slugs}
+        self.catalog = None
+        self._catalog_lock = None
+        # Reads fall back to Flask when the async client is disabled (e.g. the local storage backend) or failed
+        self.enabled = os.getenv('storage_backend', 'cosmos').lower() == 'cosmos'
+        # Same setting as CosmosDB.get_data: without it the bodies are encoded once but not compressed
+        self.precompressed_responses = os.getenv('precompressed_responses', 'true').lower() == 'true'
+
+    async def _get_catalog(self):
+        if self.catalog is None:
+            if self._catalog_lock is None:
+                self._catalog_lock = asyncio.Lock()
+            async with self._catalog_lock:
+                if self.catalog is None:
+                    from db.async_catalog import AsyncCatalog
+                    self.catalog = await AsyncCatalog.from_environment()
+        return self.catalog
+
+    def _route(self, path):
+        """
+        Match the read routes served asynchronously.
+
+        :return: A tuple of (collection name, whether the summary is requested), or None.
+        """
+        parts = path.strip("/").split("/")
+        if parts[0] != "api" or len(parts) < 2:
+            return None
+        if len(parts) == 2 and parts[1] == "colleges-degrees":
+            return "colleges_degrees", False
+        if len(parts) == 3 and parts[1] == "get-data":
+            return parts[2], False
+        slug = program_slug(parts[1])
+        if slug not in self.collections:
+            return None
+        if len(parts) == 2:
+            return self.collections[slug], False
+        if len(parts) == 3 and parts[2] == "summary":
+            return self.collections[slug], True
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+
+        if scope["type"] == "http" and self.enabled and scope["method"] in ("GET", "HEAD") and not scope.get("query_string"):
+            route = self._route(scope["path"])
+            if route is not None:
+                return await self._serve(scope, send, *route)
+        return await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.catalog is not None:
+                    self.catalog.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _send(send, status, body, headers, head=False):
+        """
+        Send a complete response. Every response, including 304 and errors, carries the CORS header
+        flask_cors adds to the Flask routes.
+        """
+        headers = headers + [(b"access-control-allow-origin", b"*")]
+        if status != 304:
+            if not isinstance(body, bytes):
+                body = (json.dumps(body, separators=(",", ":"), sort_keys=True, default=str) + "\n").encode("utf-8")
+                headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if head or status == 304 else body})
+
+    async def _serve(self, scope, send, collection_name, summary):
+        """
+        Answer a collection or summary read, with the same ETag, Last-Modified and content encodings as the Flask routes.
+        """
+        request_headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        head = scope["method"] == "HEAD"
+        try:
+            catalog = await self._get_catalog()
+            revision = await catalog.get_revision(collection_name)
+            etag = collection_etag(collection_name, revision)
+            headers = [(b"etag", f'W/"{etag}"'.encode()), (b"cache-control", b"no-cache")]
+            if revision["updated_at"] is not None:
+                headers.append((b"last-modified", http_date(revision["updated_at"]).encode()))
+
+            if parse_etags(request_headers.get("if-none-match")).contains_weak(etag):
+                return await self._send(send, 304, b"", headers, head)
+
+            if summary:
+                summaries = await catalog.get_summary(collection_name, revision["revision"])
+                if not summaries:
+                    return await self._send(send, 404, {"error": "No roadmap found"}, [], head)
+                return await self._send(send, 200, summaries, headers, head)
+
+            entry = await catalog.get_collection(collection_name, revision["revision"])
+            encoding, body = entry.body(compress=self.precompressed_responses).select(parse_accept_header(request_headers.get("accept-encoding")))
+            headers += [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding")]
+            if encoding is not None:
+                headers.append((b"content-encoding", encoding.encode()))
+            return await self._send(send, 200, body, headers, head)
+        except Exception as e:
+            logger.error("Failed to retrieve data: %s", e)
+            return await self._send(send, 500, {"error": str(e)}, [], head)
+
+
+def create_asgi_app():
+    program_slugs = discover_program_slugs()
+    return CatalogASGI(create_app(), program_slugs)
+
+
+app = create_asgi_app()
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run("asgi:app", host='0.0.0.0', port=5001, workers=int(os.getenv('asgi_workers', 4)))
@@ -0,0 +1,459 @@
+# backend/benchmarks/catalog_benchmark.py
+#
+# Throughput and latency of the catalog API at increasing concurrency and catalog sizes, written as JSON so
+# runs of different commits can be compared:
+#
+#     python benchmarks/catalog_benchmark.py run --output before.json
+#     python benchmarks/catalog_benchmark.py run --backend mongo --mongo-uri mongodb://localhost:27017 --output after.json
+#     python benchmarks/catalog_benchmark.py compare before.json after.json
+#
+# The 'local' backend serves the data files through LocalStore, so neither Cosmos DB nor Key Vault is needed.
+# The 'mongo' backend loads a local mongod with the BulkLoader of insert_data.py --bulk-loader and times that load.
+# With --url, an already running server is measured instead (e.g. gunicorn 'app:create_app()' or uvicorn asgi:app),
+# which is how the sync and ASGI serving modes are compared.
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import logging
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+import requests
+
+# Make the backend packages importable when running this script directly
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+DATA_FILES_CONFIG = os.path.join(BACKEND_DIR, "config", "data_files_config.json")
+
+# Progress is reported at INFO whatever log level the app under test is configured with
+logger = logging.getLogger("benchmark")
+logger.setLevel(logging.INFO)
+
+SCENARIOS = ("program", "colleges-degrees", "get-data", "update-course")
+
+# Bump when the layout of the results file changes
+RESULTS_VERSION = 1
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    """
+    :param latencies: Request latencies in seconds.
+    :return: p50, p95, p99, mean and max in milliseconds.
+    """
+    values = sorted(latencies)
+    if not values:
+        return None
+    return {
+        "p50": round(percentile(values, 0.50) * 1000, 3),
+        "p95": round(percentile(values, 0.95) * 1000, 3),
+        "p99": round(percentile(values, 0.99) * 1000, 3),
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "max": round(values[-1] * 1000, 3)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_data_files(config_path=DATA_FILES_CONFIG):
+    """
+    :param config_path: A data files configuration, e.g. one written by db/generate_synthetic_catalog.py.
+    :return: The configured data files that exist, as absolute paths.
+    """
+    with open(config_path, 'r') as file:
+        data_files = json.load(file)
+    existing = []
+    for data_file in data_files:
+        path = os.path.join(BACKEND_DIR, data_file["json_file_path"])
+        if os.path.exists(path):
+            existing.append(dict(data_file, json_file_path=path))
+    return existing
+
+
+def scale_documents(documents, scale):
+    """
+    Repeat the documents of a data file 'scale' times. Copies get a distinct program or course name so they
+    stay distinct documents, and lose their ids so new ones are assigned when they are stored.
+    """
+    scaled = []
+    for copy_number in range(scale):
+        for document in documents:
+            document = json.loads(json.dumps(document))
+            if copy_number:
+                document.pop("_id", None)
+                for key in ("program", "course"):
+                    if isinstance(document.get(key), str):
+                        document[key] = f"{document[key]} (copy {copy_number})"
+                for year in document.get("years", []):
+                    for semester in year.get("semesters", []):
+                        for course in semester.get("courses", []):
+                            course.pop("courseId", None)
+            scaled.append(document)
+    return scaled
+
+
+def write_scaled_catalog(data_files, scale, directory):
+    """
+    Write every data file, scaled, to a directory laid out like backend/data.
+
+    :return: The data files entries pointing at the scaled copies, and the number of documents written.
+    """
+    scaled_files = []
+    total = 0
+    for data_file in data_files:
+        with open(data_file["json_file_path"], 'r') as file:
+            data = json.load(file)
+        documents = scale_documents(data if isinstance(data, list) else [data], scale)
+        path = os.path.join(directory, f"{data_file['collection_name']}.json")
+        with open(path, 'w') as file:
+            json.dump(documents, file)
+        scaled_files.append(dict(data_file, json_file_path=path))
+        total += len(documents)
+    return scaled_files, total
+
+
+def load_mongo(mongo_uri, db_name, data_files):
+    """
+    Load the scaled catalog into a fresh database the way insert_data.py --bulk-loader does, and time it.
+
+    :return: The BulkLoader statistics.
+    """
+    from pymongo import MongoClient
+    from db.cosmos_mongo_db import CosmosDB
+    from db.bulk_loader import AdaptiveRateLimiter, BulkLoader
+    from db.degree_summary import add_degree_summary
+    from db.insert_data import dedup_query
+
+    MongoClient(mongo_uri).drop_database(db_name)
+    cosmos_db = CosmosDB(connection_string=mongo_uri, db_name=db_name)
+    # A local mongod does not throttle, so the rate limiter starts (and stays) at its maximum
+    loader = BulkLoader(cosmos_db, key_for=dedup_query, prepare=add_degree_summary,
+                        rate_limiter=AdaptiveRateLimiter(initial_rate=5000.0))
+    started = time.perf_counter()
+    stats = loader.load(data_files)
+    elapsed = time.perf_counter() - started
+    cosmos_db.client.close()
+    return dict(stats, elapsed_seconds=round(elapsed, 3))
+
+
+class BenchmarkServer:
+    def __init__(self, app, threads):
+        """
+        Serve a WSGI app on a free local port in a background thread, with waitress (as in production
+        deployments without gunicorn) or with the werkzeug server when waitress is not installed.
+        """
+        try:
+            from waitress.server import create_server
+            self.server = create_server(app, host="127.0.0.1", port=0, threads=threads, connection_limit=1000)
+            self.port = self.server.effective_port
+            self.name = "waitress"
+        except ImportError:
+            from werkzeug.serving import make_server
+            self.server = make_server("127.0.0.1", 0, app, threaded=True)
+            self.port = self.server.server_port
+            self.name = "werkzeug"
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self):
+        if self.name == "waitress":
+            self.server.run()
+        else:
+            self.server.serve_forever()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.name == "waitress":
+            self.server.close()
+        else:
+            self.server.shutdown()
+
+
+def discover_targets(base_url, data_files):
+    """
+    Read the catalog through the API once to choose the programs, collections and course ids the scenarios use.
+    """
+    collections = []
+    courses = []
+    for data_file in data_files:
+        collection_name = data_file["collection_name"]
+        response = requests.get(f"{base_url}/api/get-data/{collection_name}", timeout=60)
+        if response.status_code != 200:
+            logger.warning(f"Skipping {collection_name}: HTTP {response.status_code}")
+            continue
+        collections.append(collection_name)
+        for document in response.json():
+            for year in document.get("years", []):
+                for semester in year.get("semesters", []):
+                    for course in semester.get("courses", []):
+                        if course.get("courseId"):
+                            courses.append((collection_name, course["courseId"]))
+    programs = [name.replace("_", "-") for name in collections if name != "colleges_degrees"]
+    return {"collections": collections, "programs": programs, "courses": courses}
+
+
+def make_request(scenario, targets, rng):
+    """
+    :return: A tuple of (method, path, JSON body) for one request of a scenario.
+    """
+    if scenario == "program":
+        return "GET", f"/api/{rng.choice(targets['programs'])}", None
+    if scenario == "colleges-degrees":
+        return "GET", "/api/colleges-degrees", None
+    if scenario == "get-data":
+        return "GET", f"/api/get-data/{rng.choice(targets['collections'])}", None
+    collection_name, course_id = rng.choice(targets["courses"])
+    body = {"collectionName": collection_name, "courseId": course_id, "field": "notes",
+            "value": f"benchmark {time.time_ns()}"}
+    return "PUT", "/api/update-course", body
+
+
+def run_load(base_url, scenario, targets, concurrency, duration, warmup_requests=3):
+    """
+    Send requests of one scenario from 'concurrency' threads, each with its own keep-alive session,
+    for 'duration' seconds, and summarize throughput and latency.
+    """
+    window = {}
+
+    def start_window():
+        window["started"] = time.perf_counter()
+        window["deadline"] = window["started"] + duration
+
+    # The measured window starts when every worker has finished its warmup requests
+    start_barrier = threading.Barrier(concurrency, action=start_window)
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    response_bytes = [0] * concurrency
+
+    def worker(index):
+        rng = random.Random(index)
+        session = requests.Session()
+        for _ in range(warmup_requests):
+            method, path, body = make_request(scenario, targets, rng)
+            session.request(method, base_url + path, json=body, timeout=60)
+        start_barrier.wait()
+        deadline = window["deadline"]
+        while time.perf_counter() < deadline:
+            method, path, body = make_request(scenario, targets, rng)
+            started = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=60)
+                size = len(response.content)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                size = 0
+                ok = False
+            latencies[index].append(time.perf_counter() - started)
+            response_bytes[index] += size
+            if not ok:
+                errors[index] += 1
+        session.close()
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - window["started"]
+
+    all_latencies = [latency for thread_latencies in latencies for latency in thread_latencies]
+    return {
+        "requests": len(all_latencies),
+        "errors": sum(errors),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_response_bytes": round(sum(response_bytes) / len(all_latencies)) if all_latencies else 0,
+        "latency_ms": latency_summary(all_latencies)
+    }
+
+
+def run_scenarios(base_url, targets, scenarios, concurrency_levels, duration, scale):
+    results = []
+    for scenario in scenarios:
+        if scenario == "program" and not targets["programs"] or scenario == "update-course" and not targets["courses"]:
+            logger.warning(f"Skipping {scenario}: nothing to request")
+            continue
+        for concurrency in concurrency_levels:
+            result = run_load(base_url, scenario, targets, concurrency, duration)
+            result.update(scenario=scenario, scale=scale, concurrency=concurrency)
+            results.append(result)
+            latency = result["latency_ms"] or {}
+            logger.info(f"{scenario:<17} scale {scale} concurrency {concurrency:>3}: {result['throughput_rps']:>8} req/s, "
+                         f"p50 {latency.get('p50')} ms, p95 {latency.get('p95')} ms, p99 {latency.get('p99')} ms, "
+                         f"{result['errors']} errors")
+    return results
+
+
+def run(args):
+    scenarios = args.scenarios.split(",")
+    concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+    data_files = load_data_files(args.config)
+    report = {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {"backend": "url" if args.url else args.backend, "url": args.url, "config": args.config,
+                     "data_files": len(data_files), "duration": args.duration,
+                     "concurrency": concurrency_levels, "scenarios": scenarios},
+        "load": [],
+        "results": []
+    }
+
+    if args.url:
+        targets = discover_targets(args.url, data_files)
+        report["results"] = run_scenarios(args.url, targets, scenarios, concurrency_levels, args.duration, None)
+        return report
+
+    # The app reads its settings from the environment when create_app runs
+    os.environ.setdefault("log_level", args.log_level)
+    os.environ.setdefault("log_format", "text")
+    os.environ["db_init_mode"] = "eager"
+    os.environ["enable_swagger"] = "false"
+    from app import create_app
+
+    for scale in [int(scale) for scale in args.scales.split(",")]:
+        work_dir = tempfile.mkdtemp(prefix=f"edupathfinder-bench-{scale}-")
+        try:
+            scaled_files, documents = write_scaled_catalog(data_files, scale, work_dir)
+            logger.info(f"Scale {scale}: {documents} documents in {len(scaled_files)} collections")
+            if args.backend == "mongo":
+                db_name = f"edupathfinder_bench_{scale}"
+                load = load_mongo(args.mongo_uri, db_name, scaled_files)
+                report["load"].append(dict(load, scale=scale))
+                logger.info(f"Scale {scale}: loaded in {load['elapsed_seconds']}s ({load['documents_per_second']} docs/s)")
+                os.environ.update(storage_backend="cosmos", cosmos_connection_string=args.mongo_uri,
+                                  cosmosdb_account_name=db_name)
+            else:
+                os.environ.update(storage_backend="local", local_data_dir=work_dir)
+            # Register the programs of the catalog under test (scaling keeps the collection names)
+            os.environ.update(data_files_config=os.path.abspath(args.config),
+                              colleges_degrees_file=os.path.join(work_dir, "colleges_degrees.json"))
+
+            app = create_app()
+            with BenchmarkServer(app, threads=max(concurrency_levels)) as server:
+                report["settings"]["server"] = server.name
+                targets = discover_targets(server.url, scaled_files)
+                report["results"] += run_scenarios(server.url, targets, scenarios, concurrency_levels,
+                                                   args.duration, scale)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return report
+
+
+def compare(args):
+    """
+    Compare two results files and report the scenarios whose throughput dropped or whose p95 latency rose
+    by more than the threshold. The exit status is 1 when there is a regression.
+    """
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    with open(args.candidate, 'r') as file:
+        candidate = json.load(file)
+
+    def key(result):
+        return result["scenario"], result["scale"], result["concurrency"]
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    regressions = 0
+    print(f"{'scenario':<17} {'scale':>5} {'conc':>4} {'req/s':>18} {'p95 ms':>20}")
+    for result in candidate["results"]:
+        before = baseline_results.get(key(result))
+        if before is None:
+            continue
+        throughput_ratio = result["throughput_rps"] / before["throughput_rps"] if before["throughput_rps"] else 1.0
+        p95_before = (before["latency_ms"] or {}).get("p95")
+        p95_after = (result["latency_ms"] or {}).get("p95")
+        p95_ratio = p95_after / p95_before if p95_before and p95_after else 1.0
+        regressed = throughput_ratio < 1 - args.threshold or p95_ratio > 1 + args.threshold
+        regressions += regressed
+        print(f"{result['scenario']:<17} {str(result['scale']):>5} {result['concurrency']:>4} "
+              f"{before['throughput_rps']:>8}->{result['throughput_rps']:<8} {p95_before}->{p95_after} "
+              f"{'REGRESSION' if regressed else ''}")
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}: {regressions} regressions "
+          f"(threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the catalog API and compare results between commits.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--backend", choices=("local", "mongo"), default="local",
+                            help="Serve the catalog from data files (local) or from a local mongod (mongo)")
+    run_parser.add_argument("--mongo-uri", default="mongodb://localhost:27017",
+                            help="Connection string of the mongod used by the mongo backend")
+    run_parser.add_argument("--url", default=None,
+                            help="Benchmark an already running server instead of starting create_app")
+    run_parser.add_argument("--config", default=DATA_FILES_CONFIG,
+                            help="Data files configuration of the catalog, e.g. from db/generate_synthetic_catalog.py")
+    run_parser.add_argument("--scales", default="1,4",
+                            help="Comma separated catalog sizes, as multiples of the documents in backend/data")
+    run_parser.add_argument("--concurrency", default="1,4,16", help="Comma separated numbers of concurrent clients")
+    run_parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                            help=f"Comma separated scenarios among {', '.join(SCENARIOS)}")
+    run_parser.add_argument("--duration", type=float, default=5.0, help="Seconds measured per scenario and concurrency")
+    run_parser.add_argument("--log-level", default="WARNING", help="Log level of the app under test")
+    run_parser.add_argument("--output", default="benchmark-results.json", help="Path of the JSON results file")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline", help="Results of the reference commit")
+    compare_parser.add_argument("candidate", help="Results of the commit under review")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative change in throughput or p95 latency reported as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+
+    report = run(args)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    logger.info(f"Wrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
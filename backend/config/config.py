@@ -1,7 +1,15 @@
 # backend/config/config.py
 
+import os
+
 class Config:
     SWAGGER = {
         'title': 'EduPathFinder API',
         'uiversion': 3
     }
+
+    # How the database handle is created: 'background' (default), 'lazy' or 'eager'
+    DB_INIT_MODE = os.getenv('db_init_mode', 'background')
+
+    # Set 'enable_swagger' to 'false' to leave the API docs (/apidocs, /apispec_1.json) out of production workers
+    ENABLE_SWAGGER = os.getenv('enable_swagger', 'true').lower() == 'true'
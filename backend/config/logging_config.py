@@ -0,0 +1,184 @@
+# backend/config/logging_config.py
+
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed with extra={...} and is added to the JSON output
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+# Libraries that are chatty at DEBUG (pymongo logs every command) stay at WARNING unless 'log_levels' says otherwise
+DEFAULT_MODULE_LEVELS = {"pymongo": "WARNING", "urllib3": "WARNING", "azure": "WARNING"}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_listener = None
+_configured_pid = None
+_lock = threading.Lock()
+
+
+def parse_mapping(value):
+    """
+    Parse a 'name=value,name=value' setting, e.g. 'db.cosmos_mongo_db=DEBUG,werkzeug=WARNING'.
+
+    :return: A dictionary; malformed entries are ignored.
+    """
+    mapping = {}
+    for item in (value or "").split(","):
+        name, separator, setting = item.partition("=")
+        if separator and name.strip() and setting.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+def truncate(text, max_chars):
+    if max_chars and len(text) > max_chars:
+        return f"{text[:max_chars]}... ({len(text) - max_chars} more characters)"
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, max_chars=0):
+        """
+        One JSON object per line with the time, level, logger, message, process and any extra fields.
+
+        :param max_chars: Messages and tracebacks longer than this are truncated (0 keeps them whole).
+        """
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage(), self.max_chars),
+            "pid": record.process
+        }
+        for name, value in vars(record).items():
+            if name not in STANDARD_ATTRIBUTES and not name.startswith("_"):
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = truncate(self.formatException(record.exc_info), self.max_chars)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, max_chars=0):
+        super().__init__(TEXT_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
+        self.max_chars = max_chars
+
+    def formatMessage(self, record):
+        record.message = truncate(record.message, self.max_chars)
+        return super().formatMessage(record)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates):
+        """
+        Keep only a fraction of the records of high-volume events. A record belongs to an event when it is
+        logged with extra={"event": "<name>"}; records without an event, or of an event without a rate, pass.
+
+        :param rates: Mapping of event name -> fraction kept, between 0 and 1.
+        """
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(getattr(record, "event", None))
+        if rate is None or rate >= 1:
+            return True
+        record.sampleRate = rate
+        return random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hand records to the listener thread without formatting them, and drop them rather than wait when the
+    queue is full, so request threads never block on log I/O. The number of records dropped is added to
+    the next record that fits.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record is queued as is and formatted on the listener thread.
+        # A shallow copy keeps handlers from seeing each other's changes; arguments are still formatted later,
+        # so objects passed as arguments should not be mutated right after logging them.
+        return copy.copy(record)
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.droppedRecords = self.dropped
+        try:
+            self.queue.put_nowait(record)
+            self.dropped = 0
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    """
+    Route all logging through a bounded queue to a stdout handler on a background thread, configured by:
+
+    - 'log_level': level of the root logger (INFO by default).
+    - 'log_levels': per-module levels, e.g. 'db.cosmos_mongo_db=DEBUG,services=WARNING'.
+    - 'log_format': 'json' (the default, one object per line) or 'text'.
+    - 'log_max_message_chars': longer messages are truncated (2000 by default, 0 to disable).
+    - 'log_sample_rates': fraction kept per event, e.g. 'catalog_read=0.01,cache_hit=0'.
+    - 'log_queue_size': records waiting for the listener before new ones are dropped (10000 by default).
+
+    Calling it again in the same process does nothing; a forked worker gets its own listener thread.
+    """
+    global _listener, _configured_pid
+    with _lock:
+        if _configured_pid == os.getpid():
+            return
+
+        max_chars = int(os.getenv('log_max_message_chars', 2000))
+        if os.getenv('log_format', 'json').lower() == 'text':
+            formatter = TextFormatter(max_chars)
+        else:
+            formatter = JsonFormatter(max_chars)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(int(os.getenv('log_queue_size', 10000))))
+        rates = {event: float(rate) for event, rate in parse_mapping(os.getenv('log_sample_rates')).items()}
+        if rates:
+            queue_handler.addFilter(SamplingFilter(rates))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(os.getenv('log_level', 'INFO').upper())
+        for name, level in dict(DEFAULT_MODULE_LEVELS, **parse_mapping(os.getenv('log_levels'))).items():
+            logging.getLogger(name).setLevel(level.upper())
+
+        # A listener inherited through fork has no thread in this process; its queue is simply abandoned
+        _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        _configured_pid = os.getpid()
+
+
+def stop_logging():
+    """
+    Flush the records still queued and stop the listener thread.
+    """
+    global _configured_pid
+    with _lock:
+        if _listener is not None and _configured_pid == os.getpid():
+            _listener.stop()
+            _configured_pid = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,158 @@
+# backend/db/async_catalog.py
+
+import os
+import time
+import asyncio
+import logging
+from motor.motor_asyncio import AsyncIOMotorClient
+from db.cosmos_mongo_db import CosmosDB
+from db.catalog_cache import CatalogCache, CachedCollection
+from db.revision_store import REVISIONS_COLLECTION, RevisionStore
+from db.degree_summary import SUMMARY_COLLECTION, compute_summary
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCatalog:
+    def __init__(self, connection_string, db_name, cache=None, max_pool_size=None):
+        """
+        Read-only, non-blocking access to the catalog collections through motor, for the ASGI serving mode.
+        A single client (and its connection pool) is shared by every coroutine of the process. Revisions are
+        read from the same collection the sync CosmosDB bumps, so writes made through the Flask routes are seen here.
+
+        :param connection_string: The connection string for MongoDB.
+        :param db_name: The name of the database to connect to.
+        :param cache: Optional CatalogCache of the collections read. Configured from the environment if omitted.
+        :param max_pool_size: Maximum connections of the pool; 'mongo_max_pool_size' from the environment by default (100).
+        """
+        if max_pool_size is None:
+            max_pool_size = int(os.getenv('mongo_max_pool_size', 100))
+        self.client = AsyncIOMotorClient(connection_string, maxPoolSize=max_pool_size, serverSelectionTimeoutMS=20000)
+        self.database = self.client[db_name]
+        self.cache = cache if cache is not None else CatalogCache.from_env()
+        self.memo_ttl_seconds = float(os.getenv('revision_memo_ttl_seconds', 2))
+        self._revisions = {}  # collection name -> (revision dictionary, expiry)
+        self._loading = {}  # collection name -> future of the read in progress
+        self._summaries = {}  # collection name -> (revision, summaries)
+
+    @staticmethod
+    async def from_environment():
+        """
+        Factory method using the same settings as CosmosDB.from_environment; Key Vault is queried in a thread.
+
+        :return: Instance of AsyncCatalog.
+        """
+        settings = CosmosDB.environment_settings()
+        if settings is None:
+            settings = await asyncio.to_thread(CosmosDB.key_vault_settings)
+        connection_string, db_name = settings
+        catalog = AsyncCatalog(connection_string, db_name)
+        await catalog.client.admin.command('ping')
+        logger.info("Async catalog connected to database: %s", db_name)
+        return catalog
+
+    async def ping(self):
+        try:
+            await self.client.admin.command('ping')
+            return True
+        except Exception as e:
+            logger.warning("Database ping failed: %s", e)
+            return False
+
+    async def get_revision(self, collection_name):
+        """
+        Get the revision token of a collection, memoized like RevisionStore.get.
+
+        :param collection_name: The name of the collection.
+        :return: A dictionary with 'revision' and 'updated_at'.
+        """
+        memo = self._revisions.get(collection_name)
+        if memo is not None and memo[1] > time.monotonic():
+            return memo[0]
+
+        document = await self.database[REVISIONS_COLLECTION].find_one({"_id": collection_name})
+        if document:
+            revision = {"revision": document["revision"], "updated_at": RevisionStore._as_utc(document.get("updated_at"))}
+        else:
+            revision = {"revision": 0, "updated_at": None}
+        self._revisions[collection_name] = (revision, time.monotonic() + self.memo_ttl_seconds)
+        return revision
+
+    async def get_collection(self, collection_name, revision=None):
+        """
+        Get the documents of a collection for the given revision, from the cache when possible.
+        Concurrent misses for the same collection share a single database read.
+
+        :param collection_name: The name of the collection.
+        :param revision: The current revision, if already known.
+        :return: The CachedCollection.
+        """
+        if revision is None:
+            revision = (await self.get_revision(collection_name))["revision"]
+        entry = self.cache.get(collection_name)
+        if entry is not None and entry.revision == revision:
+            return entry
+
+        loading = self._loading.get(collection_name)
+        if loading is not None and loading[0] == revision:
+            return await asyncio.shield(loading[1])
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[collection_name] = (revision, future)
+        try:
+            documents = await self.database[collection_name].find().to_list(None)
+            for document in documents:
+                if '_id' in document:
+                    document['_id'] = str(document['_id'])  # Convert ObjectId to string for JSON serialization
+            entry = CachedCollection(revision, documents)
+            self.cache.set(collection_name, entry)
+            future.set_result(entry)
+            logger.info("Successfully retrieved data from %s", collection_name, extra={"event": "catalog_read"})
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when no other coroutine was waiting
+            raise
+        finally:
+            if self._loading.get(collection_name, (None, None))[1] is future:
+                del self._loading[collection_name]
+
+    async def get_summary(self, collection_name, revision=None):
+        """
+        Get the degree summaries of the roadmaps in a collection from the summaries collection DegreeSummaryStore
+        keeps current, once per revision: summaries are stored before the revision of a write is bumped.
+        Summaries it does not hold yet (roadmaps loaded before summaries existed) are computed from the cached
+        documents; storing them is left to the sync routes.
+
+        :return: A list of summaries, like CosmosDB.get_summary.
+        """
+        if revision is None:
+            revision = (await self.get_revision(collection_name))["revision"]
+        memo = self._summaries.get(collection_name)
+        if memo is not None and memo[0] == revision:
+            return memo[1]
+
+        stored = {}
+        async for summary in self.database[SUMMARY_COLLECTION].find({"collection": collection_name}):
+            stored[str(summary["_id"])] = summary
+        roadmaps = await self.database[collection_name].find({"years": {"$exists": True}}, {"_id": 1}).to_list(None)
+        document_ids = [str(document["_id"]) for document in roadmaps]
+
+        missing = {document_id for document_id in document_ids if document_id not in stored}
+        if missing:
+            entry = await self.get_collection(collection_name, revision)
+            for document in entry.documents:
+                if document["_id"] in missing:
+                    stored[document["_id"]] = dict(compute_summary(document), collection=collection_name)
+
+        summaries = []
+        for document_id in document_ids:
+            if document_id in stored:
+                summary = dict(stored[document_id], _id=document_id)
+                summary.pop("updated_at", None)
+                summaries.append(summary)
+        self._summaries[collection_name] = (revision, summaries)
+        return summaries
+
+    def close(self):
+        self.client.close()
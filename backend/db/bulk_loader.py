@@ -0,0 +1,216 @@
+# backend/db/bulk_loader.py
+
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pymongo import errors as pymongo_errors
+
+logger = logging.getLogger(__name__)
+
+# Cosmos DB reports request-rate throttling as error 16500 with an optional "RetryAfterMs=<n>" hint
+THROTTLE_CODES = {16500, 429}
+RETRY_AFTER_PATTERN = re.compile(r"RetryAfterMs=(\d+)")
+
+
+def throttle_delay(code, message):
+    """
+    Tell whether a write error is Cosmos throttling and extract the retry-after hint.
+
+    :param code: The error code reported by the server.
+    :param message: The error message reported by the server.
+    :return: None if the error is not throttling, otherwise the hinted delay in seconds (0 when there is no hint).
+    """
+    message = message or ""
+    if code not in THROTTLE_CODES and "TooManyRequests" not in message:
+        return None
+    match = RETRY_AFTER_PATTERN.search(message)
+    return int(match.group(1)) / 1000 if match else 0.0
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, initial_rate=200.0, min_rate=5.0, max_rate=5000.0, increase=20.0, decrease_factor=0.5):
+        """
+        Token bucket shared by all loader workers whose rate adapts to throttling (additive increase, multiplicative decrease).
+
+        :param initial_rate: Documents per second allowed at start.
+        :param min_rate: Lower bound of the rate.
+        :param max_rate: Upper bound of the rate.
+        :param increase: Documents per second added after every successful batch.
+        :param decrease_factor: Factor applied to the rate after every throttled batch.
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self._tokens = 0.0
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount):
+        """
+        Block until the given number of documents may be written.
+
+        :param amount: The number of documents about to be written.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # Never accumulate more than one second of burst; a large batch runs the bucket into debt instead
+                self._tokens = min(self.rate, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 0:
+                        self._tokens -= amount
+                        return
+                    wait = -self._tokens / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        """
+        Speed up after a batch went through without throttling.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=0.0):
+        """
+        Slow down after a throttled batch and honour the server's retry-after hint for every worker.
+
+        :param retry_after: Seconds the server asked to wait, if any.
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.warning("Throttled by the database, rate lowered to %.0f docs/s (retry after %.2fs)", self.rate, retry_after)
+
+
+class BulkLoader:
+    def __init__(self, cosmos_db, key_for, prepare=None, batch_size=100, workers=4, max_retries=10, rate_limiter=None):
+        """
+        Load JSON data files into collections with unordered bulk upserts, several collections at a time.
+
+        :param cosmos_db: Instance of the CosmosDB class.
+        :param key_for: Callable (collection_name, document) -> query identifying an existing document.
+        :param prepare: Optional callable (document) -> None applied to every document before it is written.
+        :param batch_size: Number of documents per bulk_write.
+        :param workers: Number of collections loaded concurrently.
+        :param max_retries: Number of times a throttled batch is retried before giving up on it.
+        :param rate_limiter: AdaptiveRateLimiter shared by the workers; a default one is created if omitted.
+        """
+        self.cosmos_db = cosmos_db
+        self.key_for = key_for
+        self.prepare = prepare
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self._lock = threading.Lock()
+        self.stats = {"collections": 0, "documents": 0, "inserted": 0, "existing": 0, "failed": 0, "throttled": 0}
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def load_batch(self, collection_name, batch):
+        """
+        Write one batch, retrying only the documents that were throttled.
+
+        :param collection_name: The name of the collection to write to.
+        :param batch: The documents to write.
+        """
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(len(pending))
+            try:
+                result = self.cosmos_db.bulk_insert_missing(
+                    collection_name, pending, lambda document: self.key_for(collection_name, document))
+            except pymongo_errors.OperationFailure as e:
+                delay = throttle_delay(e.code, str(e))
+                if delay is None:
+                    raise
+                self._count(throttled=len(pending))
+                self.rate_limiter.on_throttle(delay)
+                continue
+
+            self._count(inserted=result["inserted"], existing=result["existing"])
+            throttled = []
+            retry_after = 0.0
+            for error in result["errors"]:
+                delay = throttle_delay(error.get("code"), error.get("errmsg"))
+                if delay is None:
+                    logger.error("Failed to write document to %s: %s", collection_name, error.get('errmsg'))
+                    self._count(failed=1)
+                else:
+                    throttled.append(pending[error["index"]])
+                    retry_after = max(retry_after, delay)
+
+            if not throttled:
+                self.rate_limiter.on_success()
+                return
+            self._count(throttled=len(throttled))
+            self.rate_limiter.on_throttle(retry_after)
+            pending = throttled
+
+        logger.error("Giving up on %s throttled documents in %s after %s retries",
+                     len(pending), collection_name, self.max_retries)
+        self._count(failed=len(pending))
+
+    def load_collection(self, collection_name, json_file_path):
+        """
+        Load one JSON data file into a collection in batches.
+
+        :param collection_name: The name of the collection to load.
+        :param json_file_path: Path to the JSON file, holding a document or a list of documents.
+        :return: The number of documents read from the file.
+        """
+        with open(json_file_path, 'r') as file:
+            data = json.load(file)
+        documents = data if isinstance(data, list) else [data]
+        if self.prepare:
+            for document in documents:
+                self.prepare(document)
+
+        self.cosmos_db.create_collection(collection_name)
+        for i in range(0, len(documents), self.batch_size):
+            self.load_batch(collection_name, documents[i:i + self.batch_size])
+
+        self._count(collections=1, documents=len(documents))
+        return len(documents)
+
+    def load(self, data_files):
+        """
+        Load every configured data file, running collections concurrently and reporting progress.
+
+        :param data_files: List of {"collection_name", "json_file_path"} entries, as in config/data_files_config.json.
+        :return: A dictionary of load statistics, including elapsed time and throughput.
+        """
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.load_collection, data_file["collection_name"], data_file["json_file_path"]): data_file["collection_name"]
+                for data_file in data_files
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                collection_name = futures[future]
+                try:
+                    count = future.result()
+                    elapsed = time.monotonic() - started
+                    logger.info("[%s/%s] Loaded %s documents into %s (%.1f docs/s overall, rate limit %.0f docs/s)",
+                                done, len(futures), count, collection_name,
+                                self.stats['documents'] / elapsed, self.rate_limiter.rate)
+                except Exception as e:
+                    logger.error("[%s/%s] Failed to load %s: %s", done, len(futures), collection_name, e)
+
+        elapsed = time.monotonic() - started
+        report = dict(self.stats, elapsed_seconds=round(elapsed, 3),
+                      documents_per_second=round(self.stats["documents"] / elapsed, 1) if elapsed else 0.0)
+        logger.info("Bulk load finished: %s", report)
+        return report
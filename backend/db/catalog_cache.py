@@ -0,0 +1,164 @@
+# backend/db/catalog_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from db.encoded_body import EncodedBody
+from db.compact_catalog import CompactDocument, compact_enabled
+
+
+class CatalogCache:
+    def __init__(self, max_entries=256, ttl_seconds=300):
+        """
+        In-process, thread-safe LRU cache with a per-entry TTL for catalog reads.
+        Entries are keyed by collection name and dropped whenever that collection is written.
+
+        :param max_entries: Maximum number of collections kept in memory before the least recently used is evicted.
+        :param ttl_seconds: Number of seconds an entry stays valid. Use 0 or a negative value to disable expiry.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def from_env():
+        """
+        Factory method to create a CatalogCache configured from environment variables.
+
+        :return: Instance of CatalogCache.
+        """
+        max_entries = int(os.getenv('catalog_cache_max_entries', 256))
+        ttl_seconds = float(os.getenv('catalog_cache_ttl_seconds', 300))
+        return CatalogCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key, default=None):
+        """
+        Look up a cached value and mark it as most recently used.
+
+        :param key: The cache key, usually a collection name.
+        :param default: Value returned when the key is missing or expired.
+        :return: The cached value or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                # Expired entries count as a miss and are dropped straight away
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        :param key: The cache key, usually a collection name.
+        :param value: The value to store.
+        """
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Drop a single entry, typically after its collection has been written.
+
+        :param key: The cache key to drop.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """
+        Drop every entry without resetting the counters.
+        """
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return the cache counters so the hit ratio can be checked in production.
+
+        :return: A dictionary of cache statistics.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+class CachedCollection:
+    __slots__ = ("revision", "_documents", "_compact", "_body")
+
+    def __init__(self, revision, documents, compact=None):
+        """
+        The documents of a collection at a given revision, plus their encoded response body once built.
+        Unless disabled with 'compact_catalog', the documents are held as CompactDocument records with
+        deduplicated strings and are rebuilt as dictionaries whenever they are read.
+
+        :param revision: The revision the documents were read at.
+        :param documents: The documents with '_id' already converted to strings.
+        :param compact: Whether to hold the documents in the compact form; defaults to the 'compact_catalog' setting.
+        """
+        self.revision = revision
+        self._body = None
+        if compact if compact is not None else compact_enabled():
+            self._documents = None
+            self._compact = tuple(CompactDocument(document) for document in documents)
+        else:
+            self._documents = documents
+            self._compact = None
+
+    @property
+    def documents(self):
+        """
+        :return: The list of documents. In the compact form, every access builds new dictionaries.
+        """
+        if self._compact is None:
+            return self._documents
+        return [document.to_document() for document in self._compact]
+
+    def body(self, compress=True):
+        """
+        Return the pre-serialized, pre-compressed body, encoding it on first use.
+
+        :param compress: Whether the compressed variants are built; a process uses one setting for every entry.
+        :return: Instance of EncodedBody.
+        """
+        if self._body is None:
+            self._body = EncodedBody.from_documents(self.documents, compress=compress)
+        return self._body
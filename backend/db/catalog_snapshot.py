@@ -0,0 +1,306 @@
+# backend/db/catalog_snapshot.py
+
+import os
+import glob
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+from datetime import datetime
+from flask import Response, request
+from db.encoded_body import EncodedBody
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; concurrent builds are then only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC, then the offset and length of the JSON index, then the encoded bodies, then the index.
+# The index maps each collection name to its revision and the (offset, length) of every encoded variant.
+MAGIC = b"EPFSNAP1"
+HEADER = struct.Struct("<8sQQ")
+
+# Variant names in the index, in the order EncodedBody.select prefers them
+VARIANTS = (("br", "brotlied"), ("gzip", "gzipped"), ("identity", "identity"))
+
+
+class SnapshotEntry:
+    __slots__ = ("collection_name", "revision", "updated_at", "_generation", "_variants")
+
+    def __init__(self, collection_name, generation, item):
+        """
+        One collection of a snapshot: its revision and where its encoded bodies are in the mapped file.
+
+        :param collection_name: The name of the collection.
+        :param generation: The _Generation (mapped snapshot file) holding the bodies.
+        :param item: The collection's entry of the snapshot index.
+        """
+        self.collection_name = collection_name
+        self.revision = item["revision"]
+        self.updated_at = datetime.fromisoformat(item["updated_at"]) if item.get("updated_at") else None
+        self._generation = generation
+        self._variants = item["variants"]
+
+    def revision_info(self):
+        """
+        :return: The revision in the form returned by CosmosDB.get_revision.
+        """
+        return {"revision": self.revision, "updated_at": self.updated_at}
+
+    def variant(self, name):
+        """
+        :param name: 'identity', 'gzip' or 'br'.
+        :return: A memoryview of the encoded body in the mapped file, or None if the snapshot does not have it.
+        """
+        location = self._variants.get(name)
+        if location is None:
+            return None
+        offset, length = location
+        return self._generation.view[offset:offset + length]
+
+    def select(self, accept_encodings):
+        """
+        Pick the smallest variant the client accepts, like EncodedBody.select.
+
+        :return: A tuple of (content encoding or None, offset, length).
+        """
+        for encoding, _ in VARIANTS:
+            if encoding in self._variants and (encoding == "identity" or accept_encodings[encoding]):
+                offset, length = self._variants[encoding]
+                return (None if encoding == "identity" else encoding), offset, length
+        raise KeyError(f"No encoded body for {self.collection_name}")
+
+    def to_response(self):
+        """
+        Build the response for the current request straight from the snapshot file. Servers offering
+        wsgi.file_wrapper (gunicorn, waitress) send the slice with sendfile; otherwise it is copied once
+        from the mapped file.
+
+        :return: A Flask Response.
+        """
+        encoding, offset, length = self.select(request.accept_encodings)
+        body = None
+        file_wrapper = request.environ.get("wsgi.file_wrapper")
+        if file_wrapper is not None and request.method != "HEAD":
+            try:
+                # Each response needs its own file position; the servers stop at Content-Length
+                file = open(self._generation.path, "rb")
+                file.seek(offset)
+                body = file_wrapper(file)
+            except OSError:
+                body = None  # The generation was already cleaned up; the mapping is still valid
+        if body is None:
+            body = [self._generation.view[offset:offset + length].tobytes()]
+
+        response = Response(body, mimetype="application/json", direct_passthrough=True)
+        response.content_length = length
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+class _Generation:
+    def __init__(self, path):
+        """
+        A snapshot file mapped read-only. The mapping is shared through the page cache by every process
+        mapping the same file, and stays valid after the file is replaced or deleted.
+
+        :param path: The path of the snapshot file (not the link pointing to it).
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mapping)
+        magic, index_offset, index_length = HEADER.unpack_from(self.mapping, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        index = json.loads(bytes(self.view[index_offset:index_offset + index_length]))
+        self.built_at = index["built_at"]
+        self.items = index["collections"]
+        self.entries = {name: SnapshotEntry(name, self, item) for name, item in self.items.items()}
+
+
+class CatalogSnapshot:
+    def __init__(self, path, cosmos_db=None, collection_names=(), build_delay_seconds=2):
+        """
+        Pre-encoded bodies of the catalog collections in one file that every worker maps, so the catalog is
+        held once per host instead of once per worker, and can be served before the database is reachable.
+
+        The file is written as a new generation next to 'path' and published by atomically replacing
+        the symbolic link at 'path'. Readers pick up a new generation on their next lookup.
+
+        :param path: The path of the link to the current snapshot file.
+        :param cosmos_db: The storage the snapshot is built from (not needed to only read it).
+        :param collection_names: The collections included in the snapshot.
+        :param build_delay_seconds: How long a scheduled build waits, so a burst of writes is built once.
+        """
+        self.path = path
+        self.cosmos_db = cosmos_db
+        self.collection_names = list(collection_names)
+        self.build_delay_seconds = build_delay_seconds
+        self._generation = None
+        self._target = None
+        self._lock = threading.Lock()
+        self._build_requested = threading.Event()
+        self._build_thread = None
+
+    @staticmethod
+    def from_environment(cosmos_db, collection_names):
+        """
+        Factory method to create a CatalogSnapshot from 'catalog_snapshot_path' and
+        'catalog_snapshot_delay_seconds' (2 by default).
+
+        :return: Instance of CatalogSnapshot, or None when 'catalog_snapshot_path' is not set.
+        """
+        path = os.getenv('catalog_snapshot_path')
+        if not path:
+            return None
+        delay = float(os.getenv('catalog_snapshot_delay_seconds', 2))
+        return CatalogSnapshot(path, cosmos_db, collection_names, build_delay_seconds=delay)
+
+    def _current(self):
+        """
+        Map the generation the link points to, if it changed since the last lookup.
+
+        :return: The current _Generation, or None if there is no snapshot yet.
+        """
+        try:
+            target = os.readlink(self.path)
+        except OSError:
+            return self._generation
+        if target != self._target:
+            with self._lock:
+                if target != self._target:
+                    try:
+                        self._generation = _Generation(os.path.join(os.path.dirname(self.path), target))
+                        logger.info("Mapped catalog snapshot %s", target)
+                    except (OSError, ValueError) as e:
+                        logger.error("Failed to map catalog snapshot %s: %s", target, e)
+                    self._target = target
+        return self._generation
+
+    def get(self, collection_name):
+        """
+        :param collection_name: The name of the collection.
+        :return: The SnapshotEntry of the collection, or None if it is not in the snapshot.
+        """
+        generation = self._current()
+        if generation is None:
+            return None
+        return generation.entries.get(collection_name)
+
+    def build(self):
+        """
+        Write a new generation if any collection changed since the current one. Bodies of collections whose
+        revision did not change are copied from the current generation rather than encoded again.
+        Builds from several workers are serialized with a lock file; the ones that follow find nothing to do.
+
+        :return: Whether a new generation was published.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return self._build(directory)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _build(self, directory):
+        previous = self._current()
+        revisions = self.cosmos_db.get_revisions(self.collection_names)
+        if previous is not None and set(previous.items) == set(self.collection_names) and all(
+                previous.items[name]["revision"] == revisions[name]["revision"] for name in self.collection_names):
+            return False
+
+        started = time.perf_counter()
+        name = f"{os.path.basename(self.path)}.g{time.time_ns()}"
+        path = os.path.join(directory, name)
+        index = {}
+        reused = 0
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, 0, 0))
+            for collection_name in self.collection_names:
+                revision = revisions[collection_name]
+                item = previous.items.get(collection_name) if previous is not None else None
+                if item is not None and item["revision"] == revision["revision"]:
+                    entry = previous.entries[collection_name]
+                    bodies = {variant: entry.variant(variant) for variant, _ in VARIANTS}
+                    reused += 1
+                else:
+                    body = EncodedBody.from_documents(self.cosmos_db.get_documents(collection_name))
+                    bodies = {variant: getattr(body, attribute) for variant, attribute in VARIANTS}
+                variants = {}
+                for variant, data in bodies.items():
+                    if data is not None:
+                        variants[variant] = (file.tell(), len(data))
+                        file.write(data)
+                updated_at = revision["updated_at"]
+                index[collection_name] = {
+                    "revision": revision["revision"],
+                    "updated_at": updated_at.isoformat() if updated_at is not None else None,
+                    "variants": variants
+                }
+            encoded_index = json.dumps({"built_at": time.time(), "collections": index}).encode("utf-8")
+            index_offset = file.tell()
+            file.write(encoded_index)
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, index_offset, len(encoded_index)))
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Replacing the link is atomic: readers see either the previous generation or the new one
+        link = f"{self.path}.link{os.getpid()}"
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(name, link)
+        os.replace(link, self.path)
+        keep = {name}
+        if previous is not None:
+            keep.add(os.path.basename(previous.path))
+        self._remove_old_generations(keep)
+        logger.info("Built catalog snapshot %s: %s collections, %s reused, %.2f s",
+                    name, len(index), reused, time.perf_counter() - started)
+        return True
+
+    def _remove_old_generations(self, keep):
+        """
+        Delete generations other than the new and the previous one; processes still mapping them keep their
+        mapping, and responses already being sent from them keep their open file.
+        """
+        for path in glob.glob(f"{glob.escape(self.path)}.g*"):
+            if os.path.basename(path) not in keep:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("Failed to remove old catalog snapshot %s: %s", path, e)
+
+    def schedule_build(self):
+        """
+        Build the snapshot in a background thread after build_delay_seconds, e.g. after a write or when a read
+        found the snapshot behind the database. Requests made while a build is pending are merged.
+        """
+        if self.cosmos_db is None:
+            return
+        self._build_requested.set()
+        with self._lock:
+            if self._build_thread is None:
+                self._build_thread = threading.Thread(target=self._build_loop, name="catalog-snapshot", daemon=True)
+                self._build_thread.start()
+
+    def _build_loop(self):
+        while True:
+            self._build_requested.wait()
+            time.sleep(self.build_delay_seconds)
+            self._build_requested.clear()
+            try:
+                self.build()
+            except Exception as e:
+                logger.error("Failed to build the catalog snapshot: %s", e)
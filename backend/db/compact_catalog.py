@@ -0,0 +1,255 @@
+# backend/db/compact_catalog.py
+
+import os
+import sys
+import threading
+from array import array
+
+# Course fields kept as columns of string ids ('gec' included: "010" and "10" are different codes)
+COURSE_STRING_FIELDS = ("important", "courseNumber", "title", "minGrade", "gec", "prerequisite", "notes", "courseId")
+
+# Hours are kept in a signed 32-bit column; other values (floats, strings, None, booleans) are kept as is
+HOURS_RANGE = range(-2 ** 31, 2 ** 31)
+
+
+def compact_enabled():
+    """
+    :return: Whether cached collections are held in the compact form ('compact_catalog', true by default).
+    """
+    return os.getenv('compact_catalog', 'true').lower() == 'true'
+
+
+class StringTable:
+    def __init__(self):
+        """
+        Process-wide dictionary encoding of the catalog strings: each distinct string is stored once
+        and referred to by its index. Id 0 is never assigned, so columns use it for 'not a string'.
+        The table only grows; the catalog has a few thousand distinct strings whatever the number of programs.
+        """
+        self._strings = [None]
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def id_of(self, value):
+        """
+        :param value: A string.
+        :return: Its id, assigning one if it is new.
+        """
+        string_id = self._ids.get(value)
+        if string_id is None:
+            with self._lock:
+                string_id = self._ids.get(value)
+                if string_id is None:
+                    string_id = len(self._strings)
+                    self._strings.append(sys.intern(value))
+                    self._ids[value] = string_id
+        return string_id
+
+    def intern(self, value):
+        """
+        :return: The table's copy of a string, so equal strings share one object; other values are returned as is.
+        """
+        if isinstance(value, str):
+            return self._strings[self.id_of(value)]
+        return value
+
+    def string(self, string_id):
+        return self._strings[string_id]
+
+    def __len__(self):
+        return len(self._strings) - 1
+
+
+STRINGS = StringTable()
+
+
+class ShapeTable:
+    def __init__(self):
+        """
+        Process-wide table of the key tuples of records, so every record with the same fields in the same
+        order shares one tuple of keys.
+        """
+        self.keys = []
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def id_of(self, keys):
+        """
+        :param keys: A tuple of field names.
+        :return: Its id, assigning one if it is new.
+        """
+        shape_id = self._ids.get(keys)
+        if shape_id is None:
+            with self._lock:
+                shape_id = self._ids.get(keys)
+                if shape_id is None:
+                    shape_id = len(self.keys)
+                    self.keys.append(tuple(STRINGS.intern(key) for key in keys))
+                    self._ids[keys] = shape_id
+        return shape_id
+
+
+SHAPES = ShapeTable()
+
+
+class Record:
+    """
+    The fields of a document, year or semester: a shared key tuple and a tuple of values.
+    The value of the nested list ('years', 'semesters' or 'courses') is left out and inserted back by to_dict.
+    """
+    __slots__ = ("keys", "values")
+
+    def __init__(self, fields, nested):
+        self.keys = SHAPES.keys[SHAPES.id_of(tuple(fields))]
+        self.values = tuple(None if key == nested else STRINGS.intern(value) for key, value in fields.items())
+
+    def has(self, key):
+        return key in self.keys
+
+    def to_dict(self, nested=None, value=None):
+        fields = dict(zip(self.keys, self.values))
+        if nested is not None:
+            fields[nested] = value  # Replacing the placeholder keeps the original field order
+        return fields
+
+
+class CourseColumns:
+    """
+    The courses of a roadmap, column by column: a shape id per course, a column of string ids per known field,
+    an 'hours' column, and the rare values that fit no column kept as is per course index.
+    """
+    __slots__ = ("shapes", "columns", "hours", "extras")
+
+    def __init__(self):
+        self.shapes = array("I")
+        self.columns = {field: array("I") for field in COURSE_STRING_FIELDS}
+        self.hours = array("i")
+        self.extras = {}
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def append(self, course):
+        """
+        :param course: A course dictionary.
+        """
+        extras = {}
+        self.shapes.append(SHAPES.id_of(tuple(course)))
+        for field, column in self.columns.items():
+            value = course.get(field)
+            if isinstance(value, str):
+                column.append(STRINGS.id_of(value))
+            else:
+                column.append(0)
+                if field in course:
+                    extras[field] = value
+        hours = course.get("hours")
+        if type(hours) is int and hours in HOURS_RANGE:
+            self.hours.append(hours)
+        else:
+            self.hours.append(0)
+            if "hours" in course:
+                extras["hours"] = hours
+        for field, value in course.items():
+            if field != "hours" and field not in self.columns:
+                extras[field] = value
+        if extras:
+            self.extras[len(self.shapes) - 1] = extras
+
+    def trim(self):
+        """
+        Drop the columns no course has a string for (like 'courseId' on most roadmaps) once every course is appended.
+        """
+        for field in COURSE_STRING_FIELDS:
+            if not any(self.columns[field]):
+                del self.columns[field]
+
+    def course(self, index):
+        """
+        :return: The course at the given index as a new dictionary, with its fields in their original order.
+        """
+        extras = self.extras.get(index)
+        course = {}
+        for field in SHAPES.keys[self.shapes[index]]:
+            if extras is not None and field in extras:
+                course[field] = extras[field]
+            elif field == "hours":
+                course[field] = self.hours[index]
+            else:
+                course[field] = STRINGS.string(self.columns[field][index])
+        return course
+
+
+class Semester:
+    __slots__ = ("fields", "start", "end")
+
+    def __init__(self, semester, courses):
+        self.fields = Record(semester, "courses")
+        self.start = len(courses)
+        for course in semester.get("courses", []):
+            courses.append(course)
+        self.end = len(courses)
+
+    def to_dict(self, courses):
+        if not self.fields.has("courses"):
+            return self.fields.to_dict()
+        return self.fields.to_dict("courses", [courses.course(index) for index in range(self.start, self.end)])
+
+
+class Year:
+    __slots__ = ("fields", "semesters")
+
+    def __init__(self, year, courses):
+        self.fields = Record(year, "semesters")
+        self.semesters = tuple(Semester(semester, courses) for semester in year.get("semesters", []))
+
+    def to_dict(self, courses):
+        if not self.fields.has("semesters"):
+            return self.fields.to_dict()
+        return self.fields.to_dict("semesters", [semester.to_dict(courses) for semester in self.semesters])
+
+
+class CompactDocument:
+    """
+    A catalog document held in the compact form. Roadmaps keep their years and semesters as slotted records
+    and their courses as columns; other documents (the colleges and degrees) are a single Record.
+    """
+    __slots__ = ("fields", "years", "courses")
+
+    def __init__(self, document):
+        if is_roadmap(document):
+            self.fields = Record(document, "years")
+            self.courses = CourseColumns()
+            self.years = tuple(Year(year, self.courses) for year in document["years"])
+            self.courses.trim()
+        else:
+            # Anything not shaped like a roadmap, including an unexpected 'years' value, is kept field by field
+            self.fields = Record(document, None)
+            self.courses = None
+            self.years = None
+
+    def to_document(self):
+        """
+        :return: The document as new dictionaries and lists, equal to the one it was built from.
+        """
+        if self.years is None:
+            return self.fields.to_dict()
+        return self.fields.to_dict("years", [year.to_dict(self.courses) for year in self.years])
+
+
+def is_roadmap(document):
+    """
+    :return: Whether the document has years of semesters of courses that can be held as CourseColumns.
+    """
+    years = document.get("years")
+    if not isinstance(years, list):
+        return False
+    for year in years:
+        if not isinstance(year, dict) or not isinstance(year.get("semesters", []), list):
+            return False
+        for semester in year.get("semesters", []):
+            if not isinstance(semester, dict) or not isinstance(semester.get("courses", []), list):
+                return False
+            if not all(isinstance(course, dict) for course in semester.get("courses", [])):
+                return False
+    return True
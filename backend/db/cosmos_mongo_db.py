@@ -4,39 +4,104 @@ import os
 import json
 import logging
 import time
-from flask import jsonify
-from pymongo import MongoClient, errors as pymongo_errors
-from azure.keyvault.secrets import SecretClient
-from azure.identity import DefaultAzureCredential
+from collections import defaultdict
+from flask import Response, jsonify, request
+from pymongo import MongoClient, UpdateOne, errors as pymongo_errors
+from bson import ObjectId
+from bson.errors import InvalidId
 from dotenv import load_dotenv
+from db.repository import CatalogRepository
+from db.catalog_cache import CatalogCache, CachedCollection
+from db.revision_store import RevisionStore
+from db.degree_summary import DegreeSummaryStore, SUMMARY_FIELDS
+from db.course_index import CourseIndex, assign_course_ids, course_path, iter_courses
+from metrics import instrumented, record_documents
+from db.pool_metrics import pool_listeners
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
-
-class CosmosDB:
-    def __init__(self, connection_string, db_name):
+class CosmosDB(CatalogRepository):
+    def __init__(self, connection_string, db_name, cache=None):
         """
         Initialize a connection to the CosmosDB using MongoDB API.
         This method attempts to connect to the specified database using the provided connection string.
 
         :param connection_string: The connection string for MongoDB.
         :param db_name: The name of the database to connect to.
+        :param cache: Optional CatalogCache used for read-through caching of get_data. Configured from the environment if omitted.
         """
+        # Read-through cache for catalog collections, invalidated on every write
+        self.cache = cache if cache is not None else CatalogCache.from_env()
+        # Serve get_data from bytes encoded once per revision; whether they are also compressed once (true by default)
+        self.precompressed_responses = os.getenv('precompressed_responses', 'true').lower() == 'true'
+
         try:
             # Establish MongoDB client with a timeout to avoid hanging
-            self.client = MongoClient(connection_string, serverSelectionTimeoutMS=20000)
+            self.client = MongoClient(connection_string, serverSelectionTimeoutMS=20000, event_listeners=pool_listeners())
             self.database = self.client[db_name]
+            self.revisions = RevisionStore(self.database)
+            self.course_index = CourseIndex(self.database)
+            self.summaries = DegreeSummaryStore(self.database)
             
             # Test the connection immediately to ensure validity
             self.client.admin.command('ping')
-            logging.info(f"Successfully connected to database: {db_name}")
+            logger.info("Successfully connected to database: %s", db_name)
         except Exception as e:
-            logging.error(f"Failed to connect to MongoDB: {e}")
+            logger.error("Failed to connect to MongoDB: %s", e)
             raise
 
+    @staticmethod
+    def key_vault_settings():
+        """
+        Retrieve the connection string from Azure Key Vault and the database name from the environment.
+
+        :return: A tuple of (connection string, database name).
+        """
+        # Imported here so workers that get their connection string elsewhere never load the Azure SDK
+        from azure.keyvault.secrets import SecretClient
+        from azure.identity import DefaultAzureCredential
+
+        # Retrieve necessary configuration from environment variables
+        keyvault_name = os.getenv('keyvault_name')
+        secret_name = "cosmosconnectionstring"  # This is the name of the secret storing the connection string
+        db_name = os.getenv('cosmosdb_account_name')
+
+        if not keyvault_name or not secret_name or not db_name:
+            raise ValueError("Missing required environment variables")
+
+        # Construct the Key Vault endpoint and authenticate
+        keyvault_endpoint = f"https://{keyvault_name}.vault.azure.net/"
+        credential = DefaultAzureCredential()
+        secret_client = SecretClient(vault_url=keyvault_endpoint, credential=credential)
+
+        # Retrieve the connection string from Key Vault
+        return secret_client.get_secret(secret_name).value, db_name
+
+    @staticmethod
+    def environment_settings():
+        """
+        Read the connection string from the 'cosmos_connection_string' environment variable or from the file
+        named by 'cosmos_connection_string_file'.
+
+        :return: A tuple of (connection string, database name), or None when neither is set.
+        """
+        connection_string = os.getenv('cosmos_connection_string')
+        connection_string_file = os.getenv('cosmos_connection_string_file')
+        if not connection_string and connection_string_file:
+            with open(connection_string_file, 'r') as file:
+                connection_string = file.read().strip()
+
+        if not connection_string:
+            return None
+
+        db_name = os.getenv('cosmosdb_account_name')
+        if not db_name:
+            raise ValueError("Missing required environment variables")
+        return connection_string, db_name
+
     @staticmethod
     def from_key_vault():
         """
@@ -45,28 +110,114 @@ class CosmosDB:
         :return: Instance of CosmosDB connected to the specified database.
         """
         try:
-            # Retrieve necessary configuration from environment variables
-            keyvault_name = os.getenv('keyvault_name')
-            secret_name = "cosmosconnectionstring"  # This is the name of the secret storing the connection string
-            db_name = os.getenv('cosmosdb_account_name')
-
-            if not keyvault_name or not secret_name or not db_name:
-                raise ValueError("Missing required environment variables")
-
-            # Construct the Key Vault endpoint and authenticate
-            keyvault_endpoint = f"https://{keyvault_name}.vault.azure.net/"
-            credential = DefaultAzureCredential()
-            secret_client = SecretClient(vault_url=keyvault_endpoint, credential=credential)
-
-            # Retrieve the connection string from Key Vault
-            connection_string = secret_client.get_secret(secret_name).value
+            connection_string, db_name = CosmosDB.key_vault_settings()
 
             # Return an initialized CosmosDB instance
             return CosmosDB(connection_string=connection_string, db_name=db_name)
         except Exception as e:
-            logging.error(f"Failed to initialize CosmosDB from Key Vault: {e}")
+            logger.error("Failed to initialize CosmosDB from Key Vault: %s", e)
             raise
         
+    @staticmethod
+    def from_environment():
+        """
+        Factory method that reads the connection string from the 'cosmos_connection_string' environment variable
+        or from the file named by 'cosmos_connection_string_file', and only falls back to Key Vault when neither is set.
+
+        :return: Instance of CosmosDB connected to the specified database.
+        """
+        settings = CosmosDB.environment_settings()
+        if settings is None:
+            return CosmosDB.from_key_vault()
+
+        connection_string, db_name = settings
+        return CosmosDB(connection_string=connection_string, db_name=db_name)
+
+    def ping(self):
+        """
+        Check that the database answers.
+
+        :return: True if the server answered a ping, False otherwise.
+        """
+        try:
+            self.client.admin.command('ping')
+            return True
+        except pymongo_errors.PyMongoError as e:
+            logger.warning("Database ping failed: %s", e)
+            return False
+
+    def _record_write(self, collection_name):
+        """
+        Bump the revision of a collection and drop its cached copy after a write.
+
+        :param collection_name: The name of the collection that was written.
+        """
+        self.cache.invalidate(collection_name)
+        try:
+            self.revisions.bump(collection_name)
+        except pymongo_errors.PyMongoError as e:
+            # The write itself succeeded, so only log the failed bump
+            logger.error("Failed to bump revision for %s: %s", collection_name, e)
+
+    def _index_courses(self, collection_name, documents):
+        """
+        Add roadmap documents that were just written to the course index and store their degree summaries.
+
+        :param collection_name: The name of the collection the documents were written to.
+        :param documents: The written documents, including their '_id'.
+        """
+        try:
+            for document in documents:
+                if "years" in document:
+                    self.course_index.index_document(collection_name, document)
+                    self.summaries.save(collection_name, document)
+        except pymongo_errors.PyMongoError as e:
+            # update_course reindexes and get_summary recomputes on demand, so only log the failure
+            logger.error("Failed to index courses of %s: %s", collection_name, e)
+
+    def _refresh_summary(self, collection_name, document_id, fields):
+        """
+        Recompute a roadmap's degree summary after an edit touched hours, course numbers or GEC codes.
+
+        :param collection_name: The name of the collection holding the roadmap.
+        :param document_id: The '_id' of the edited roadmap.
+        :param fields: The course fields that were edited.
+        """
+        if SUMMARY_FIELDS.isdisjoint(fields):
+            return
+        try:
+            self.summaries.refresh(collection_name, document_id)
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to refresh degree summary of %s in %s: %s", document_id, collection_name, e)
+
+    @instrumented("get_summary")
+    def get_summary(self, collection_name):
+        """
+        Retrieve the degree summaries of the roadmaps in a collection.
+
+        :param collection_name: The name of the roadmap collection.
+        :return: A tuple containing the summaries and HTTP status code.
+        """
+        try:
+            summaries = self.summaries.get(collection_name)
+            if not summaries:
+                return {"error": "No roadmap found"}, 404
+            return jsonify(summaries), 200
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to retrieve degree summary: %s", e)
+            return {"error": str(e)}, 500
+
+    @instrumented("get_revision")
+    def get_revision(self, collection_name):
+        """
+        Get the revision token of a collection without reading any of its documents.
+
+        :param collection_name: The name of the collection.
+        :return: A dictionary with 'revision' and 'updated_at'.
+        """
+        return self.revisions.get(collection_name)
+        
+    @instrumented("collection_exists")
     def collection_exists(self, collection_name):
         """
         Check if a collection exists in the database.
@@ -77,10 +228,11 @@ class CosmosDB:
         try:
             return collection_name in self.database.list_collection_names()
         except pymongo_errors.PyMongoError as e:
-            logging.error(f"Failed to check if collection exists: {e}")
+            logger.error("Failed to check if collection exists: %s", e)
             return False
 
 
+    @instrumented("create_collection")
     def create_collection(self, collection_name):
         """
         Create a collection in the database if it does not already exist.
@@ -91,15 +243,16 @@ class CosmosDB:
         try:
             if collection_name not in self.database.list_collection_names():
                 self.database.create_collection(collection_name)
-                logging.info(f"Collection created: {collection_name}")
+                logger.info("Collection created: %s", collection_name)
                 return {"status": "Collection created", "collection_name": collection_name}, 201
             else:
-                logging.info(f"Collection already exists: {collection_name}")
+                logger.info("Collection already exists: %s", collection_name)
                 return {"status": "Collection already exists", "collection_name": collection_name}, 200
         except Exception as e:
-            logging.error(f"Failed to create collection: {e}")
+            logger.error("Failed to create collection: %s", e)
             return {"error": str(e)}, 400
 
+    @instrumented("add_data_from_json")
     def add_data_from_json(self, collection_name, json_file_path):
         """
         Insert multiple documents from a JSON file into a specified collection.
@@ -118,23 +271,29 @@ class CosmosDB:
             if not isinstance(data, list) or not data:
                 raise ValueError("The JSON file must contain a non-empty list of documents")
 
+            for document in data:
+                assign_course_ids(document)
+
             collection = self.database[collection_name]
             max_retries = 5
             for attempt in range(max_retries):
                 try:
                     # Attempt to insert documents in bulk
                     result = collection.insert_many(data)
-                    logging.info(f"Successfully added data to {collection_name}. Inserted IDs: {result.inserted_ids}")
+                    record_documents("add_data_from_json", collection_name, len(result.inserted_ids))
+                    self._index_courses(collection_name, data)
+                    self._record_write(collection_name)
+                    logger.info("Successfully added data to %s. Inserted IDs: %s", collection_name, result.inserted_ids)
                     return {"status": "Data added", "inserted_ids": result.inserted_ids}, 201
                 except pymongo_errors.BulkWriteError as bwe:
                     first_error = bwe.details['writeErrors'][0]
                     if first_error['code'] == 16500:  # Handle TooManyRequests error with retry
-                        logging.warning(f"TooManyRequests error, retrying... (attempt {attempt + 1}/{max_retries})")
+                        logger.warning("TooManyRequests error, retrying... (attempt %s/%s)", attempt + 1, max_retries)
                         time.sleep(2 ** attempt)  # Exponential backoff
                     else:
                         raise
                 except pymongo_errors.PyMongoError as e:
-                    logging.error(f"PyMongoError encountered: {e}")
+                    logger.error("PyMongoError encountered: %s", e)
                     raise
             # Handle failure after all retries
             if 'bwe' in locals():
@@ -143,9 +302,10 @@ class CosmosDB:
                 return {"error": "Failed after retries"}, 400
 
         except Exception as e:
-            logging.error(f"Failed to add data from JSON: {e}")
+            logger.error("Failed to add data from JSON: %s", e)
             return {"error": str(e)}, 400
 
+    @instrumented("add_single_data")
     def add_single_data(self, collection_name, document):
         """
         Insert a single document into a specified collection.
@@ -156,13 +316,133 @@ class CosmosDB:
         """
         try:
             collection = self.database[collection_name]
+            assign_course_ids(document)
             result = collection.insert_one(document)
-            logging.info(f"Successfully added a document to {collection_name}. Inserted ID: {result.inserted_id}")
+            record_documents("add_single_data", collection_name, 1)
+            self._index_courses(collection_name, [document])
+            self._record_write(collection_name)
+            logger.info("Successfully added a document to %s. Inserted ID: %s", collection_name, result.inserted_id)
             return {"status": "Data added", "inserted_id": str(result.inserted_id)}, 201
         except pymongo_errors.PyMongoError as e:
-            logging.error(f"Failed to add document: {e}")
+            logger.error("Failed to add document: %s", e)
+            return {"error": str(e)}, 400
+
+    @instrumented("add_data")
+    def add_data(self, collection_name, data):
+        """
+        Insert a single document or a list of documents into a specified collection.
+
+        :param collection_name: The name of the collection to insert data into.
+        :param data: A document or a non-empty list of documents to insert.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        if isinstance(data, dict):
+            return self.add_single_data(collection_name, data)
+
+        try:
+            if not isinstance(data, list) or not data:
+                raise ValueError("The request body must be a document or a non-empty list of documents")
+
+            for document in data:
+                assign_course_ids(document)
+
+            collection = self.database[collection_name]
+            result = collection.insert_many(data)
+            record_documents("add_data", collection_name, len(result.inserted_ids))
+            self._index_courses(collection_name, data)
+            self._record_write(collection_name)
+            logger.info("Successfully added %s documents to %s", len(result.inserted_ids), collection_name)
+            return {"status": "Data added", "inserted_ids": [str(_id) for _id in result.inserted_ids]}, 201
+        except (ValueError, pymongo_errors.PyMongoError) as e:
+            logger.error("Failed to add data: %s", e)
             return {"error": str(e)}, 400
 
+    @instrumented("bulk_insert_missing")
+    def bulk_insert_missing(self, collection_name, documents, key_for):
+        """
+        Insert the documents whose key does not match an existing document, in a single unordered bulk_write.
+        Each document becomes an upsert with $setOnInsert, so existing documents (and their course ids) are left untouched.
+        Unlike the other methods, per-document write errors are returned so bulk loaders can retry throttled writes.
+
+        :param collection_name: The name of the collection to insert data into.
+        :param documents: The documents to insert.
+        :param key_for: Callable returning the query identifying a document.
+        :return: A dictionary with 'inserted' and 'existing' counts and the raw 'errors' (each with 'index', 'code' and 'errmsg').
+        :raises pymongo.errors.PyMongoError: For failures other than per-document write errors.
+        """
+        for document in documents:
+            assign_course_ids(document)
+
+        collection = self.database[collection_name]
+        operations = [UpdateOne(key_for(document), {"$setOnInsert": document}, upsert=True) for document in documents]
+        try:
+            details = collection.bulk_write(operations, ordered=False).bulk_api_result
+        except pymongo_errors.BulkWriteError as bwe:
+            details = bwe.details
+
+        inserted = []
+        for upserted in details.get("upserted", []):
+            document = documents[upserted["index"]]
+            document["_id"] = upserted["_id"]
+            inserted.append(document)
+        record_documents("bulk_insert_missing", collection_name, len(inserted))
+        if inserted:
+            self._index_courses(collection_name, inserted)
+            self._record_write(collection_name)
+
+        return {
+            "inserted": len(inserted),
+            "existing": details.get("nMatched", 0),
+            "errors": details.get("writeErrors", [])
+        }
+
+    @instrumented("replace_document")
+    def replace_document(self, collection_name, document_id, document):
+        """
+        Replace a whole document, keeping its '_id', and reindex its courses.
+
+        :param collection_name: The name of the collection containing the document.
+        :param document_id: The '_id' of the document to replace.
+        :param document: The new content of the document.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        try:
+            assign_course_ids(document)
+            document["_id"] = document_id
+            result = self.database[collection_name].replace_one({"_id": document_id}, document)
+            if result.matched_count == 0:
+                return {"error": "Document not found"}, 404
+            self._index_courses(collection_name, [document])
+            self._record_write(collection_name)
+            logger.info("Successfully replaced document %s in %s", document_id, collection_name)
+            return {"status": "Document replaced", "id": str(document_id)}, 200
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to replace document: %s", e)
+            return {"error": str(e)}, 400
+
+    @instrumented("delete_document")
+    def delete_document(self, collection_name, document_id):
+        """
+        Delete a single document and its course index entries.
+
+        :param collection_name: The name of the collection containing the document.
+        :param document_id: The '_id' of the document to delete.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        try:
+            result = self.database[collection_name].delete_one({"_id": document_id})
+            if result.deleted_count == 0:
+                return {"error": "Document not found"}, 404
+            self.course_index.remove_document(document_id)
+            self.summaries.remove(document_id)
+            self._record_write(collection_name)
+            logger.info("Successfully deleted document %s from %s", document_id, collection_name)
+            return {"status": "Document deleted", "id": str(document_id)}, 200
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to delete document: %s", e)
+            return {"error": str(e)}, 400
+
+    @instrumented("find_document")
     def find_document(self, collection_name, query):
         """
         Find a single document in a collection based on a query.
@@ -174,34 +454,158 @@ class CosmosDB:
         try:
             collection = self.database[collection_name]
             document = collection.find_one(query)
+            record_documents("find_document", collection_name, 1 if document else 0)
             if document:
-                logging.info(f"Document found in {collection_name} with query {query}")
+                logger.info("Document found in %s with query %s", collection_name, query,
+                            extra={"event": "document_lookup"})
             else:
-                logging.info(f"No document found in {collection_name} with query {query}")
+                logger.info("No document found in %s with query %s", collection_name, query,
+                            extra={"event": "document_lookup"})
             return document
         except pymongo_errors.PyMongoError as e:
-            logging.error(f"Failed to find document: {e}")
+            logger.error("Failed to find document: %s", e)
             return None
 
-    def get_data(self, collection_name):
+    @instrumented("get_data")
+    def get_data(self, collection_name, fields=None, after=None, limit=None, stream=False):
         """
         Retrieve all documents from a specified collection.
+        Plain reads are served from the catalog cache; projected, paginated or streamed reads go to the database.
 
         :param collection_name: The name of the collection to retrieve data from.
+        :param fields: Optional list of fields (dotted paths allowed) to project in the database.
+        :param after: Optional cursor (the last '_id' of the previous page) to resume from.
+        :param limit: Optional page size. When a full page is returned, the next cursor is sent in X-Next-Cursor.
+        :param stream: Whether to stream the documents as NDJSON while the database cursor yields them.
+        :return: A tuple containing the data and HTTP status code.
+        """
+        if fields or after or limit or stream:
+            return self._query_data(collection_name, fields, after, limit, stream)
+
+        try:
+            entry = self._cached_collection(collection_name)
+            # Without precompression the JSON body is still encoded once per revision, just not compressed
+            return entry.body(compress=self.precompressed_responses).to_response(request.accept_encodings), 200
+        except Exception as e:
+            logger.error("Failed to retrieve data: %s", e)
+            return {"error": str(e)}, 500
+
+    def _cached_collection(self, collection_name):
+        """
+        Get the documents of a collection from the in-process cache when possible to avoid a Cosmos round trip.
+        Entries written by another worker are detected through the shared revision.
+
+        :return: The CachedCollection for the current revision.
+        """
+        revision = self.get_revision(collection_name)["revision"]
+        entry = self.cache.get(collection_name)
+        if entry is not None and entry.revision == revision:
+            logger.debug("Cache hit for %s", collection_name, extra={"event": "cache_hit"})
+            return entry
+
+        collection = self.database[collection_name]
+        data = list(collection.find())
+        for item in data:
+            if '_id' in item:
+                item['_id'] = str(item['_id'])  # Convert ObjectId to string for JSON serialization
+        record_documents("get_data", collection_name, len(data))
+        entry = CachedCollection(revision, data)
+        self.cache.set(collection_name, entry)
+        logger.info("Successfully retrieved data from %s", collection_name, extra={"event": "catalog_read"})
+        return entry
+
+    @instrumented("get_documents")
+    def get_documents(self, collection_name):
+        """
+        Get the documents of a collection as Python objects, through the same cache as get_data.
+        The cache holds them in the compact form, so callers that read them often should keep what they need
+        (like CatalogIndex does) rather than call this per request. Nested values may be shared with the cache
+        and must not be modified.
+
+        :param collection_name: The name of the collection.
+        :return: A list of documents with string ids.
+        """
+        return self._cached_collection(collection_name).documents
+
+    def get_revisions(self, collection_names):
+        """
+        Get the revision tokens of several collections with a single query.
+
+        :param collection_names: The names of the collections.
+        :return: A dictionary of collection name -> revision dictionary.
+        """
+        return self.revisions.get_many(collection_names)
+
+    @instrumented("get_changes")
+    def get_changes(self, since=None, timeout=0):
+        """
+        Get the collections written after a sequence number of the change log, so consumers can tell what changed
+        without reading any collection. Waits up to timeout seconds for a change (long polling).
+
+        :param since: The 'sequence' returned by the previous call, or None to only get the current sequence number.
+        :param timeout: Maximum number of seconds to wait when nothing changed yet.
+        :return: A dictionary with the 'changes' (latest 'collection', 'revision', 'updated_at' and 'sequence' of each
+                 collection written) and the 'sequence' to pass next time.
+        """
+        if since is None:
+            return {"changes": [], "sequence": self.revisions.latest_sequence()}
+        changes, sequence = self.revisions.wait_for_changes(since, timeout)
+        return {"changes": changes, "sequence": sequence}
+
+    @staticmethod
+    def _stringify_id(document):
+        if '_id' in document:
+            document['_id'] = str(document['_id'])  # Convert ObjectId to string for JSON serialization
+        return document
+
+    def _query_data(self, collection_name, fields, after, limit, stream):
+        """
+        Read a projected and/or paginated slice of a collection in '_id' order, bypassing the cache.
+
         :return: A tuple containing the data and HTTP status code.
         """
         try:
             collection = self.database[collection_name]
-            data = list(collection.find())
-            for item in data:
-                if '_id' in item:
-                    item['_id'] = str(item['_id'])  # Convert ObjectId to string for JSON serialization
-            logging.info(f"Successfully retrieved data from {collection_name}")
-            return jsonify(data), 200
+
+            query = {}
+            if after:
+                try:
+                    query["_id"] = {"$gt": ObjectId(after)}
+                except InvalidId:
+                    query["_id"] = {"$gt": after}  # Documents inserted with non-ObjectId keys
+            projection = {field: 1 for field in fields} if fields else None
+
+            cursor = collection.find(query, projection).sort("_id", 1).batch_size(100)
+            if limit:
+                cursor = cursor.limit(limit)
+
+            if stream:
+                # Documents are written out as the cursor yields them; the last line's _id is the next cursor
+                def generate():
+                    try:
+                        for document in cursor:
+                            yield json.dumps(self._stringify_id(document), separators=(",", ":")) + "\n"
+                    finally:
+                        cursor.close()
+                return Response(generate(), mimetype='application/x-ndjson'), 200
+
+            data = [self._stringify_id(document) for document in cursor]
+            record_documents("get_data", collection_name, len(data))
+            response = jsonify(data)
+            if limit and len(data) == limit:
+                response.headers['X-Next-Cursor'] = data[-1]['_id']
+            logger.info("Successfully retrieved %s documents from %s", len(data), collection_name,
+                        extra={"event": "catalog_read"})
+            return response, 200
+        except pymongo_errors.OperationFailure as e:
+            # Typically an invalid projection such as overlapping paths
+            logger.warning("Rejected query on %s: %s", collection_name, e)
+            return {"error": str(e)}, 400
         except Exception as e:
-            logging.error(f"Failed to retrieve data: {e}")
+            logger.error("Failed to retrieve data: %s", e)
             return {"error": str(e)}, 500
 
+    @instrumented("list_collections")
     def list_collections(self):
         """
         List all collections in the database.
@@ -210,58 +614,218 @@ class CosmosDB:
         """
         try:
             collections = self.database.list_collection_names()
-            logging.info("Successfully listed collections")
+            logger.info("Successfully listed collections")
             return {"collections": collections}, 200
         except Exception as e:
-            logging.error(f"Failed to list collections: {e}")
+            logger.error("Failed to list collections: %s", e)
             return {"error": str(e)}, 400
 
-    def update_course(self, collection_name, course_title, field, value):
+    @instrumented("update_course")
+    def update_course(self, collection_name, course_title, field, value, course_id=None):
         """
-        Update a specific field in a course document identified by the course title within a nested structure.
+        Update a specific field of a single course entry within a roadmap document.
+        The course is located through the course index when its stable id is given, otherwise by title
+        (the first course with that title wins). Only the changed field is written, with a positional $set.
 
         :param collection_name: The name of the collection containing the course.
-        :param course_title: The course title identifying the document to update.
-        :param field: The field to update within the course document.
+        :param course_title: The course title identifying the course, used when no course id is given.
+        :param field: The field to update within the course entry.
         :param value: The new value to set for the field.
+        :param course_id: The stable 'courseId' of the course entry.
         :return: A dictionary containing the update status.
         """
+        if not self._is_updatable_field(field):
+            logger.warning("Rejected update of field %r in %s", field, collection_name)
+            return {"error": f"Field {field!r} cannot be updated"}, 400
+
         try:
             collection = self.database[collection_name]
-
-            # Find the document containing the course
-            document = collection.find_one({"years.semesters.courses.title": course_title})
-            if not document:
-                logging.warning(f"Course with title {course_title} not found in {collection_name}")
+            course_ref = course_id or course_title
+
+            if course_id:
+                location = self.course_index.locate(collection_name, course_id)
+                result = self._set_course_field(collection, location, course_id, field, value)
+                if result is None or result.matched_count == 0:
+                    # Missing or stale index entry: find the course the slow way and reindex its document
+                    location = self.course_index.reindex_containing(collection, collection_name, course_id)
+                    result = self._set_course_field(collection, location, course_id, field, value)
+            else:
+                location = self._locate_by_title(collection, course_title)
+                result = self._set_course_field(collection, location, None, field, value, course_title)
+                if result is not None and result.matched_count == 0:
+                    # The document changed between the read and the write: look the title up again
+                    location = self._locate_by_title(collection, course_title)
+                    result = self._set_course_field(collection, location, None, field, value, course_title)
+
+            if result is None or result.matched_count == 0:
+                logger.warning("Course %s not found in %s", course_ref, collection_name)
                 return {"error": "Course not found"}, 404
 
-            # Traverse the document to find and update the course
-            updated = False
-            for year in document['years']:
-                for semester in year['semesters']:
-                    for course in semester['courses']:
-                        if course['title'] == course_title:
-                            course[field] = value  # Update the specific field
-                            updated = True
-                            break
-                    if updated:
-                        break
-                if updated:
-                    break
-
-            if updated:
-                # Perform the update in the database
-                result = collection.replace_one({"_id": document["_id"]}, document)
-                if result.modified_count > 0:
-                    logging.info(f"Successfully updated course {course_title} in {collection_name}")
-                    return {"status": "success", "updated": True}
-                else:
-                    logging.warning(f"No modification made for course {course_title} in {collection_name}")
-                    return {"status": "not modified"}, 200
+            if result.modified_count > 0:
+                self._refresh_summary(collection_name, location[0], {field})
+                self._record_write(collection_name)
+                logger.info("Successfully updated course %s in %s", course_ref, collection_name)
+                return {"status": "success", "updated": True}
             else:
-                logging.warning(f"Course with title {course_title} was not found in {collection_name}")
-                return {"error": "Course not found"}, 404
+                logger.warning("No modification made for course %s in %s", course_ref, collection_name)
+                return {"status": "not modified"}, 200
 
         except Exception as e:
-            logging.error(f"Failed to update course: {e}")
+            logger.error("Failed to update course: %s", e)
+            return {"error": str(e)}, 500
+
+    @instrumented("update_courses")
+    def update_courses(self, edits):
+        """
+        Apply a batch of course edits, writing each touched document once.
+        Edits are grouped by collection and document; all fields of a group are set by a single update.
+        Each edit uses the keys of update_course: collectionName, courseId or courseTitle, field and value.
+
+        :param edits: A list of edit dictionaries.
+        :return: A list with one result dictionary per edit, in the order of the edits.
+        """
+        results = [None] * len(edits)
+        by_collection = defaultdict(list)
+
+        # Validate every edit up front so a bad one never blocks the rest
+        for index, edit in enumerate(edits):
+            error = self._edit_error(edit)
+            if error is not None:
+                results[index] = {"index": index, "error": error, "status_code": 400}
+                continue
+            by_collection[edit["collectionName"]].append(index)
+
+        for collection_name, indexes in by_collection.items():
+            try:
+                collection = self.database[collection_name]
+                course_ids = {edits[index]["courseId"] for index in indexes if edits[index].get("courseId")}
+                locations = self.course_index.locate_many(collection_name, course_ids) if course_ids else {}
+
+                # Group the edits by the document holding their course
+                groups = defaultdict(list)
+                for index in indexes:
+                    edit = edits[index]
+                    course_id = edit.get("courseId")
+                    location = locations.get(course_id) if course_id else self._locate_by_title(collection, edit["courseTitle"])
+                    if location is None and course_id:
+                        # Unknown to the index: let the single-edit path find and reindex it
+                        results[index] = self._apply_single_edit(index, edit)
+                    elif location is None:
+                        results[index] = {"index": index, "error": "Course not found", "status_code": 404}
+                    else:
+                        groups[location[0]].append((index, location[1]))
+
+                modified = False
+                for document_id, group in groups.items():
+                    query = {"_id": document_id}
+                    updates = {}
+                    for index, path in group:
+                        edit = edits[index]
+                        # Like _set_course_field, the entry at the path must still be the course that was located
+                        if edit.get("courseId"):
+                            query[f"{path}.courseId"] = edit["courseId"]
+                        else:
+                            query[f"{path}.title"] = edit["courseTitle"]
+                        updates[f"{path}.{edit['field']}"] = edit.get("value")
+
+                    result = collection.update_one(query, {"$set": updates})
+                    if result.matched_count == 0:
+                        # A stale index entry in this group; fall back to one edit at a time
+                        for index, _ in group:
+                            results[index] = self._apply_single_edit(index, edits[index])
+                        continue
+
+                    modified = modified or result.modified_count > 0
+                    if result.modified_count > 0:
+                        self._refresh_summary(collection_name, document_id, {edits[index]["field"] for index, _ in group})
+                    status = "success" if result.modified_count > 0 else "not modified"
+                    for index, _ in group:
+                        results[index] = {"index": index, "status": status}
+
+                if modified:
+                    self._record_write(collection_name)
+                logger.info("Applied %s edits to %s documents in %s", len(indexes), len(groups), collection_name)
+            except Exception as e:
+                logger.error("Failed to apply edits to %s: %s", collection_name, e)
+                for index in indexes:
+                    if results[index] is None:
+                        results[index] = {"index": index, "error": str(e), "status_code": 500}
+
+        return results
+
+    def _apply_single_edit(self, index, edit):
+        """
+        Apply one edit of a batch through update_course and convert its outcome into a batch result.
+        """
+        outcome = self.update_course(edit["collectionName"], edit.get("courseTitle"), edit["field"],
+                                     edit.get("value"), course_id=edit.get("courseId"))
+        if isinstance(outcome, tuple):
+            body, status_code = outcome
+            if "error" in body:
+                return {"index": index, "error": body["error"], "status_code": status_code}
+            return {"index": index, "status": body.get("status")}
+        return {"index": index, "status": outcome.get("status")}
+
+    @staticmethod
+    def _locate_by_title(collection, course_title):
+        """
+        Find the first course with the given title, reading only the course titles of the matching document.
+
+        :return: A tuple of (document '_id', course path) or None.
+        """
+        document = collection.find_one(
+            {"years.semesters.courses.title": course_title},
+            {"years.semesters.courses.title": 1}
+        )
+        if not document:
+            return None
+        for y, s, c, course in iter_courses(document):
+            if course.get("title") == course_title:
+                return document["_id"], course_path(y, s, c)
+        return None
+
+    @staticmethod
+    def _set_course_field(collection, location, course_id, field, value, course_title=None):
+        """
+        Set one field of a course entry in place. The filter also checks that the entry at that position still
+        carries the course id, or the title when there is no id, so a stale position never updates the wrong row.
+
+        :return: The pymongo UpdateResult, or None if there is no location.
+        """
+        if location is None:
+            return None
+        document_id, path = location
+        query = {"_id": document_id}
+        if course_id:
+            query[f"{path}.courseId"] = course_id
+        else:
+            query[f"{path}.title"] = course_title
+        return collection.update_one(query, {"$set": {f"{path}.{field}": value}})
+
+    @instrumented("backfill_course_ids")
+    def backfill_course_ids(self, collection_name):
+        """
+        Give stable ids to the courses of documents stored before ids existed and index every document.
+
+        :param collection_name: The name of the collection to backfill.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        try:
+            collection = self.database[collection_name]
+            assigned = 0
+            indexed = 0
+            for document in collection.find({"years": {"$exists": True}}):
+                new_ids = assign_course_ids(document)
+                if new_ids:
+                    collection.update_one({"_id": document["_id"]}, {"$set": {"years": document["years"]}})
+                    assigned += new_ids
+                indexed += self.course_index.index_document(collection_name, document)
+                self.summaries.save(collection_name, document)
+
+            if assigned:
+                self._record_write(collection_name)
+            logger.info("Assigned %s course ids and indexed %s courses in %s", assigned, indexed, collection_name)
+            return {"status": "Course ids backfilled", "assigned": assigned, "indexed": indexed}, 200
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to backfill course ids: %s", e)
             return {"error": str(e)}, 500
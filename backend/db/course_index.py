@@ -0,0 +1,177 @@
+# backend/db/course_index.py
+
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Collection mapping every courseId to the document and position of its course entry
+COURSE_INDEX_COLLECTION = "course_index"
+
+
+def course_path(year, semester, course):
+    """
+    Build the dotted path of a course entry inside a roadmap document.
+
+    :return: A path such as 'years.0.semesters.1.courses.3'.
+    """
+    return f"years.{year}.semesters.{semester}.courses.{course}"
+
+
+def iter_courses(document):
+    """
+    Walk the courses of a roadmap document together with their positions.
+
+    :param document: A roadmap document with years -> semesters -> courses.
+    :return: A generator of (year index, semester index, course index, course) tuples.
+    """
+    for y, year in enumerate(document.get("years", [])):
+        for s, semester in enumerate(year.get("semesters", [])):
+            for c, course in enumerate(semester.get("courses", [])):
+                yield y, s, c, course
+
+
+def assign_course_ids(document):
+    """
+    Give every course entry of a roadmap document a stable 'courseId' if it does not have one yet.
+
+    :param document: A roadmap document, modified in place.
+    :return: The number of ids assigned.
+    """
+    assigned = 0
+    for _, _, _, course in iter_courses(document):
+        if not course.get("courseId"):
+            course["courseId"] = uuid.uuid4().hex
+            assigned += 1
+    return assigned
+
+
+class CourseIndex:
+    def __init__(self, database):
+        """
+        Maintain an index from courseId to the owning document '_id' and the year/semester/course position,
+        so a course can be updated with a single positional $set without reading its document.
+
+        :param database: The pymongo database holding the index collection.
+        """
+        self.collection = database[COURSE_INDEX_COLLECTION]
+
+    def index_document(self, collection_name, document):
+        """
+        (Re)index every course of a stored roadmap document and drop entries for courses it no longer has.
+
+        :param collection_name: The name of the collection holding the document.
+        :param document: The roadmap document, including its '_id'.
+        :return: The number of index entries written.
+        """
+        from pymongo import ReplaceOne  # Imported here so the pure helpers above do not load pymongo
+
+        operations = []
+        course_ids = []
+        for y, s, c, course in iter_courses(document):
+            course_id = course.get("courseId")
+            if not course_id:
+                continue
+            course_ids.append(course_id)
+            operations.append(ReplaceOne(
+                {"_id": course_id},
+                {
+                    "_id": course_id,
+                    "collection": collection_name,
+                    "document_id": document["_id"],
+                    "year": y,
+                    "semester": s,
+                    "course": c
+                },
+                upsert=True
+            ))
+
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        self.collection.delete_many({
+            "document_id": document["_id"],
+            "_id": {"$nin": course_ids}
+        })
+        return len(operations)
+
+    def remove_document(self, document_id):
+        """
+        Drop the index entries of a deleted document.
+
+        :param document_id: The '_id' of the deleted document.
+        """
+        self.collection.delete_many({"document_id": document_id})
+
+    def locate(self, collection_name, course_id):
+        """
+        Look up the position of a course by its id.
+
+        :param collection_name: The collection the course is expected to be in.
+        :param course_id: The stable course id.
+        :return: A tuple of (document '_id', course path) or None if the id is unknown.
+        """
+        entry = self.collection.find_one({"_id": course_id})
+        if not entry or entry["collection"] != collection_name:
+            return None
+        return entry["document_id"], course_path(entry["year"], entry["semester"], entry["course"])
+
+    def locate_many(self, collection_name, course_ids):
+        """
+        Look up the positions of several courses with a single query.
+
+        :param collection_name: The collection the courses are expected to be in.
+        :param course_ids: The stable course ids.
+        :return: A dictionary of course id -> (document '_id', course path) for the ids that were found.
+        """
+        locations = {}
+        for entry in self.collection.find({"_id": {"$in": list(course_ids)}, "collection": collection_name}):
+            locations[entry["_id"]] = entry["document_id"], course_path(entry["year"], entry["semester"], entry["course"])
+        return locations
+
+    def reindex_containing(self, collection, collection_name, course_id):
+        """
+        Slow path used when an index entry is missing or stale: find the document holding the course and reindex it.
+
+        :param collection: The pymongo collection holding the roadmap documents.
+        :param collection_name: The name of that collection.
+        :param course_id: The stable course id.
+        :return: A tuple of (document '_id', course path) or None if no document holds the course.
+        """
+        document = collection.find_one({"years.semesters.courses.courseId": course_id})
+        if not document:
+            return None
+
+        logger.info("Reindexing courses of document %s in %s", document['_id'], collection_name)
+        self.index_document(collection_name, document)
+        for y, s, c, course in iter_courses(document):
+            if course.get("courseId") == course_id:
+                return document["_id"], course_path(y, s, c)
+        return None
+
+
+def carry_over_course_ids(old_document, new_document):
+    """
+    Reuse the course ids of a stored roadmap for the matching courses of its replacement,
+    so edits keep addressing the same courses after a data refresh.
+    Courses are matched on year, semester, course number and title (and their order among equal entries).
+
+    :param old_document: The stored roadmap document.
+    :param new_document: The replacement roadmap document, modified in place.
+    :return: The number of ids carried over.
+    """
+    def course_keys(document):
+        seen = {}
+        for y, s, _, course in iter_courses(document):
+            year = document["years"][y].get("year")
+            semester = document["years"][y]["semesters"][s].get("semester")
+            key = (year, semester, course.get("courseNumber"), course.get("title"))
+            seen[key] = seen.get(key, 0) + 1
+            yield key + (seen[key],), course
+
+    old_ids = {key: course["courseId"] for key, course in course_keys(old_document) if course.get("courseId")}
+    carried = 0
+    for key, course in course_keys(new_document):
+        if key in old_ids:
+            course["courseId"] = old_ids[key]
+            carried += 1
+    return carried
@@ -0,0 +1,251 @@
+# backend/db/data_sync.py
+
+import os
+import sys
+import argparse
+import copy
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+# Make the backend packages importable when running this script directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db.cosmos_mongo_db import CosmosDB
+from db.course_index import carry_over_course_ids, iter_courses
+from db.degree_summary import add_degree_summary
+from db.insert_data import load_config, dedup_query
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Collection holding one manifest per synced collection: file hash plus key -> content hash of every document
+MANIFEST_COLLECTION = "sync_manifest"
+
+
+def canonical_json(value):
+    """
+    Serialize a value deterministically so equal content always hashes the same.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def content_hash(document):
+    """
+    Hash the content of a document, ignoring its '_id' and the generated course ids.
+
+    :param document: The document to hash.
+    :return: A hex SHA-256 digest.
+    """
+    stripped = copy.deepcopy(document)
+    stripped.pop("_id", None)
+    for _, _, _, course in iter_courses(stripped):
+        course.pop("courseId", None)
+    return hashlib.sha256(canonical_json(stripped).encode("utf-8")).hexdigest()
+
+
+def read_data_file(json_file_path):
+    """
+    Read a data file and compute its hash.
+
+    :param json_file_path: Path to the JSON file, holding a document or a list of documents.
+    :return: A tuple of (file hash, list of prepared documents).
+    """
+    with open(json_file_path, 'rb') as file:
+        raw = file.read()
+    data = json.loads(raw)
+    documents = data if isinstance(data, list) else [data]
+    for document in documents:
+        add_degree_summary(document)
+    return hashlib.sha256(raw).hexdigest(), documents
+
+
+def plan_collection(cosmos_mongo_db, collection_name, json_file_path):
+    """
+    Compare a data file with the manifest and the database and work out what has to be written.
+
+    :param cosmos_mongo_db: Instance of the CosmosDB class
+    :param collection_name: Name of the collection in the database
+    :param json_file_path: Path to the JSON file with the source data
+    :return: A plan dictionary with the added, changed, removed and unchanged documents
+    """
+    manifest = cosmos_mongo_db.database[MANIFEST_COLLECTION].find_one({"_id": collection_name}) or {}
+    file_hash, documents = read_data_file(json_file_path)
+
+    plan = {
+        "collection_name": collection_name,
+        "json_file_path": json_file_path,
+        "file_hash": file_hash,
+        "file_unchanged": manifest.get("file_hash") == file_hash,
+        "added": [], "changed": [], "removed": [], "unchanged": []
+    }
+    if plan["file_unchanged"]:
+        # Nothing to read from the database at all
+        plan["unchanged"] = [entry["key"] for entry in manifest.get("documents", [])]
+        plan["manifest_documents"] = manifest.get("documents", [])
+        return plan
+
+    known = {entry["key"]: entry for entry in manifest.get("documents", [])}
+    seen = set()
+    for document in documents:
+        query = dedup_query(collection_name, document)
+        key = canonical_json(query)
+        if key in seen:
+            logging.warning(f"Duplicate document {key} in {json_file_path}. Keeping the first one.")
+            continue
+        seen.add(key)
+        digest = content_hash(document)
+
+        entry = known.get(key)
+        if entry is None:
+            # Not in the manifest yet: it may still be in the database from an earlier, manifest-less load
+            existing = cosmos_mongo_db.find_document(collection_name, query)
+            if existing is None:
+                plan["added"].append({"key": key, "hash": digest, "document": document})
+            elif content_hash(existing) != digest:
+                plan["changed"].append({"key": key, "hash": digest, "document": document, "document_id": existing["_id"]})
+            else:
+                plan["unchanged"].append(key)
+                known[key] = {"key": key, "hash": digest, "document_id": existing["_id"]}
+        elif entry["hash"] != digest:
+            plan["changed"].append({"key": key, "hash": digest, "document": document, "document_id": entry["document_id"]})
+        else:
+            plan["unchanged"].append(key)
+
+    plan["removed"] = [entry for key, entry in known.items() if key not in seen]
+    plan["manifest_documents"] = [known[key] for key in plan["unchanged"] if key in known]
+    return plan
+
+
+def apply_plan(cosmos_mongo_db, plan):
+    """
+    Write only the added, changed and removed documents of a plan, then store the new manifest.
+
+    :param cosmos_mongo_db: Instance of the CosmosDB class
+    :param plan: A plan returned by plan_collection
+    """
+    collection_name = plan["collection_name"]
+    manifest_documents = list(plan["manifest_documents"])
+    failures = 0
+
+    if plan["added"]:
+        cosmos_mongo_db.create_collection(collection_name)
+        documents = [item["document"] for item in plan["added"]]
+        result = cosmos_mongo_db.bulk_insert_missing(
+            collection_name, documents, lambda document: dedup_query(collection_name, document))
+        for error in result["errors"]:
+            logging.error(f"Failed to add document to {collection_name}: {error.get('errmsg')}")
+        for item in plan["added"]:
+            if "_id" in item["document"]:
+                manifest_documents.append({"key": item["key"], "hash": item["hash"], "document_id": item["document"]["_id"]})
+            else:
+                failures += 1
+
+    for item in plan["changed"]:
+        existing = cosmos_mongo_db.find_document(collection_name, {"_id": item["document_id"]})
+        if existing:
+            carry_over_course_ids(existing, item["document"])
+        _, status_code = cosmos_mongo_db.replace_document(collection_name, item["document_id"], item["document"])
+        if status_code == 200:
+            manifest_documents.append({"key": item["key"], "hash": item["hash"], "document_id": item["document_id"]})
+        else:
+            failures += 1
+
+    for item in plan["removed"]:
+        _, status_code = cosmos_mongo_db.delete_document(collection_name, item["document_id"])
+        if status_code not in [200, 404]:
+            manifest_documents.append(item)
+            failures += 1
+
+    # A failed write keeps the file hash out of the manifest, so the next sync looks at the file again
+    cosmos_mongo_db.database[MANIFEST_COLLECTION].replace_one(
+        {"_id": collection_name},
+        {
+            "_id": collection_name,
+            "json_file_path": plan["json_file_path"],
+            "file_hash": plan["file_hash"] if failures == 0 else None,
+            "documents": manifest_documents,
+            "synced_at": datetime.now(timezone.utc)
+        },
+        upsert=True
+    )
+
+
+def summarize_plan(plan):
+    """
+    Reduce a plan to its JSON-friendly dry-run output.
+    """
+    return {
+        "collection_name": plan["collection_name"],
+        "file_unchanged": plan["file_unchanged"],
+        "added": [item["key"] for item in plan["added"]],
+        "changed": [item["key"] for item in plan["changed"]],
+        "removed": [item["key"] for item in plan["removed"]],
+        "unchanged": len(plan["unchanged"])
+    }
+
+
+def sync(cosmos_mongo_db, data_files, dry_run=False):
+    """
+    Synchronize every configured data file with the database.
+
+    :param cosmos_mongo_db: Instance of the CosmosDB class
+    :param data_files: List of data files configuration entries
+    :param dry_run: Only compute and return the plan without writing anything
+    :return: List of plan summaries, one per collection
+    """
+    summaries = []
+    for data_file in data_files:
+        collection_name = data_file.get("collection_name")
+        json_file_path = data_file.get("json_file_path")
+        if not os.path.exists(json_file_path):
+            logging.warning(f"JSON file {json_file_path} does not exist. Skipping...")
+            continue
+
+        plan = plan_collection(cosmos_mongo_db, collection_name, json_file_path)
+        summary = summarize_plan(plan)
+        summaries.append(summary)
+        if plan["file_unchanged"]:
+            logging.info(f"{collection_name}: file unchanged, nothing to do.")
+            continue
+
+        logging.info(f"{collection_name}: {len(summary['added'])} added, {len(summary['changed'])} changed, "
+                     f"{len(summary['removed'])} removed, {summary['unchanged']} unchanged.")
+        if not dry_run:
+            apply_plan(cosmos_mongo_db, plan)
+    return summaries
+
+
+def main():
+    """
+    Main entry point for the script. Syncs the data files listed in the configuration with the database.
+    """
+    parser = argparse.ArgumentParser(description="Write only the documents that changed in the configured JSON data files.")
+    parser.add_argument("--config", default="config/data_files_config.json",
+                        help="Path to the data files configuration")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the plan as JSON without writing anything")
+    parser.add_argument("--connection-string", default=None,
+                        help="Connect with this connection string (e.g. a local mongod) instead of the environment or Key Vault")
+    parser.add_argument("--db-name", default=os.getenv("cosmosdb_account_name"),
+                        help="Database name used with --connection-string")
+    args = parser.parse_args()
+
+    try:
+        if args.connection_string:
+            cosmos_mongo_db = CosmosDB(connection_string=args.connection_string, db_name=args.db_name or "edupathfinder")
+        else:
+            cosmos_mongo_db = CosmosDB.from_environment()
+
+        summaries = sync(cosmos_mongo_db, load_config(args.config), dry_run=args.dry_run)
+        if args.dry_run:
+            print(json.dumps(summaries, indent=2))
+    except Exception as e:
+        logging.exception(f"An error occurred in the sync process: {str(e)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# backend/db/degree_summary.py
+
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Collection holding one compact summary per roadmap document
+SUMMARY_COLLECTION = "degree_summaries"
+
+# Course fields whose edits change a summary
+SUMMARY_FIELDS = {"hours", "courseNumber", "gec"}
+
+# Only the parts of a roadmap needed to compute its summary
+SUMMARY_PROJECTION = {
+    "department": 1,
+    "program": 1,
+    "years.year": 1,
+    "years.semesters.semester": 1,
+    "years.semesters.courses.hours": 1,
+    "years.semesters.courses.courseNumber": 1,
+    "years.semesters.courses.gec": 1
+}
+
+# Document fields set by add_degree_summary, besides 'totalSemesterHours' on each semester
+DERIVED_DOCUMENT_FIELDS = ("totalDegreeHours", "advancedMinimumCreditHours", "approved", "revised",
+                           "aboveYearOne", "belowYearTwo", "aboveYearThree", "aboveYearFour")
+
+# Advanced minimum credit hours shown on a roadmap are capped at this value
+ADVANCED_HOURS_CAP = 42
+
+# General Education Core sections, as listed on the roadmap symbols key
+GEC_SECTIONS = {
+    "010": "Communication",
+    "020": "Mathematics",
+    "030": "Life and Physical Sciences",
+    "040": "Language, Philosophy & Culture",
+    "050": "Creative Arts",
+    "060": "American History",
+    "070": "Government/Political Science",
+    "080": "Social and Behavioral Sciences",
+    "090": "Component Area Option"
+}
+
+
+def course_hours(course):
+    """
+    Read the hours of a course as a number; edits made in the roadmap editor may store them as strings.
+    """
+    try:
+        hours = float(course.get("hours") or 0)
+    except (TypeError, ValueError):
+        return 0
+    return int(hours) if hours.is_integer() else hours
+
+
+def is_advanced(course):
+    """
+    Advanced courses are numbered 3xxx or 4xxx, e.g. 'ECON 3301'.
+    """
+    course_number = (course.get("courseNumber") or "").strip()
+    return len(course_number) >= 6 and course_number[5] in ['3', '4']
+
+
+def gec_section(course):
+    """
+    The GEC section code of a course as a GEC_SECTIONS key. Some roadmaps store '10' rather than '010';
+    the stored value is left as is.
+    """
+    gec = str(course.get("gec") or "").strip()
+    return gec.zfill(3) if gec.isdigit() else gec
+
+
+def compute_summary(document):
+    """
+    Compute the hours per semester, year and degree, the advanced hours and the GEC core coverage of a roadmap.
+
+    :param document: A roadmap document with years -> semesters -> courses.
+    :return: A dictionary summary of the roadmap.
+    """
+    years = []
+    semesters = []
+    advanced_hours = 0
+    gec_hours = {code: 0 for code in GEC_SECTIONS}
+    gec_courses = {code: 0 for code in GEC_SECTIONS}
+
+    for year in document.get("years", []):
+        year_hours = 0
+        for semester in year.get("semesters", []):
+            semester_hours = 0
+            for course in semester.get("courses", []):
+                hours = course_hours(course)
+                semester_hours += hours
+                if is_advanced(course):
+                    advanced_hours += hours
+                gec = gec_section(course)
+                if gec in GEC_SECTIONS:
+                    gec_hours[gec] += hours
+                    gec_courses[gec] += 1
+            semesters.append({"year": year.get("year"), "semester": semester.get("semester"), "hours": semester_hours})
+            year_hours += semester_hours
+        years.append({"year": year.get("year"), "hours": year_hours})
+
+    return {
+        "department": document.get("department"),
+        "program": document.get("program"),
+        "semesters": semesters,
+        "years": years,
+        "totalDegreeHours": sum(year["hours"] for year in years),
+        "advancedHours": advanced_hours,
+        "advancedMinimumCreditHours": min(advanced_hours, ADVANCED_HOURS_CAP),
+        "gecCoverage": {
+            code: {"name": name, "hours": gec_hours[code], "courses": gec_courses[code]}
+            for code, name in GEC_SECTIONS.items()
+        },
+        "missingGecSections": [code for code in GEC_SECTIONS if gec_courses[code] == 0]
+    }
+
+
+def document_totals(document, summary):
+    """
+    The summary fields embedded in the roadmap document itself, as dotted paths, for the frontend table.
+
+    :param document: The roadmap document the summary was computed from.
+    :param summary: The summary returned by compute_summary.
+    :return: A dictionary of dotted path -> value.
+    """
+    totals = {
+        "totalDegreeHours": summary["totalDegreeHours"],
+        "advancedMinimumCreditHours": summary["advancedMinimumCreditHours"]
+    }
+    index = 0
+    for y, year in enumerate(document.get("years", [])):
+        for s, _ in enumerate(year.get("semesters", [])):
+            totals[f"years.{y}.semesters.{s}.totalSemesterHours"] = summary["semesters"][index]["hours"]
+            index += 1
+    return totals
+
+
+def add_degree_summary(document):
+    """
+    Add 'totalSemesterHours' to each semester, 'totalDegreeHours' and 'advancedMinimumCreditHours'
+    at the document level, summing the hours of all courses within each semester and
+    calculating advanced hours for courses starting with '3' or '4' across all years.
+    DegreeSummaryStore keeps the numbers current after edits.
+
+    :param document: The roadmap document, modified in place
+    """
+    # Calculate the total semester hours for each semester and advanced minimum credit hours
+    if "years" in document:  # Ensure the data structure includes 'years'
+        summary = compute_summary(document)
+        semester_summaries = iter(summary["semesters"])
+        for year in document["years"]:
+            for semester in year["semesters"]:
+                semester["totalSemesterHours"] = next(semester_summaries)["hours"]  # Add the total hours to the semester data
+
+        # Set advanced credit hours and total degree hours for the document
+        document["totalDegreeHours"] = summary["totalDegreeHours"]
+        document["advancedMinimumCreditHours"] = summary["advancedMinimumCreditHours"]
+        document["approved"] = "Approved: "
+        document["revised"] = "Revised: Tuesday, August 20th, 2024"
+        document["aboveYearOne"] = "Important Notice: Register in the Business Foundation Courses listed below in thier posted sequence or sooner! Business Foundation courses are listed in BOLD and an * next to thier name."
+        document["belowYearTwo"] = "Students must be admitted into RCVCoBE to be able to register for the Advanced Business Courses as shown on the next page. ** Apply to be admitted into RCVCoBE at https://www.utrgv.edu/cobe/undergrauate/apply-for-admission **"
+        document["aboveYearThree"] = "Students must be admitted into RCVCoBE to be able to register for the Advanced Business Courses as shown on this page. For questions contact the RCVCoBE Coordinators at: business.advising@utrgv.edu"
+        document["aboveYearFour"] = "Students needs to review all pending course prerequisites for thier major using the Roadmap and Degree Works. Students will need to request approval for MGMT 4389 three weeks before registration begins by emailing business.advising@utrgv.edu"
+
+
+class DegreeSummaryStore:
+    def __init__(self, database):
+        """
+        Keep a compact summary per roadmap document up to date as roadmaps are written.
+
+        :param database: The pymongo database holding the roadmaps and the summaries collection.
+        """
+        self.database = database
+        self.collection = database[SUMMARY_COLLECTION]
+
+    def save(self, collection_name, document):
+        """
+        Compute and store the summary of a roadmap document that is already in memory.
+
+        :param collection_name: The name of the collection holding the document.
+        :param document: The roadmap document, including its '_id'.
+        :return: The stored summary.
+        """
+        summary = compute_summary(document)
+        summary.update({
+            "_id": document["_id"],
+            "collection": collection_name,
+            "updated_at": datetime.now(timezone.utc)
+        })
+        self.collection.replace_one({"_id": document["_id"]}, summary, upsert=True)
+        return summary
+
+    def refresh(self, collection_name, document_id):
+        """
+        Recompute the summary of a stored roadmap after one of its courses changed, reading only the fields
+        the summary needs, and bring the totals embedded in the roadmap document back in line.
+
+        :param collection_name: The name of the collection holding the document.
+        :param document_id: The '_id' of the roadmap document.
+        :return: The stored summary, or None if the document no longer exists.
+        """
+        roadmaps = self.database[collection_name]
+        document = roadmaps.find_one({"_id": document_id}, SUMMARY_PROJECTION)
+        if not document:
+            self.remove(document_id)
+            return None
+
+        summary = self.save(collection_name, document)
+        roadmaps.update_one({"_id": document_id}, {"$set": document_totals(document, summary)})
+        return summary
+
+    def remove(self, document_id):
+        """
+        Drop the summary of a deleted roadmap.
+
+        :param document_id: The '_id' of the deleted document.
+        """
+        self.collection.delete_one({"_id": document_id})
+
+    def get(self, collection_name):
+        """
+        Get the summaries of every roadmap in a collection, computing any that are missing (e.g. data loaded
+        before summaries existed).
+
+        :param collection_name: The name of the roadmap collection.
+        :return: A list of summaries with string ids.
+        """
+        summaries = {summary["_id"]: summary for summary in self.collection.find({"collection": collection_name})}
+
+        roadmaps = self.database[collection_name]
+        document_ids = [document["_id"] for document in roadmaps.find({"years": {"$exists": True}}, {"_id": 1})]
+        for document_id in document_ids:
+            if document_id not in summaries:
+                document = roadmaps.find_one({"_id": document_id}, SUMMARY_PROJECTION)
+                if document:
+                    logger.info("Computing missing summary for %s in %s", document_id, collection_name)
+                    summaries[document_id] = self.save(collection_name, document)
+
+        result = []
+        for document_id in document_ids:
+            if document_id in summaries:
+                summary = dict(summaries[document_id])
+                summary["_id"] = str(summary["_id"])
+                summary.pop("updated_at", None)
+                result.append(summary)
+        return result
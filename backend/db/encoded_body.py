@@ -0,0 +1,68 @@
+# backend/db/encoded_body.py
+
+import gzip
+import json
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+class EncodedBody:
+    def __init__(self, identity, gzipped, brotlied=None):
+        """
+        A JSON response body encoded once into bytes, with its compressed variants.
+
+        :param identity: The uncompressed JSON bytes.
+        :param gzipped: The gzip-compressed JSON bytes, or None when the body is not compressed.
+        :param brotlied: The brotli-compressed JSON bytes, or None when brotli is not installed.
+        """
+        self.identity = identity
+        self.gzipped = gzipped
+        self.brotlied = brotlied
+
+    @staticmethod
+    def from_documents(documents, compress=True):
+        """
+        Serialize documents exactly like jsonify does outside debug mode and precompute the compressed variants.
+
+        :param documents: The JSON-serializable documents to encode.
+        :param compress: Whether to precompute the compressed variants; otherwise only the JSON bytes are kept.
+        :return: Instance of EncodedBody.
+        """
+        identity = (json.dumps(documents, separators=(",", ":"), sort_keys=True) + "\n").encode("utf-8")
+        if not compress:
+            return EncodedBody(identity, None)
+        # mtime=0 keeps the gzip bytes identical across workers and rebuilds
+        gzipped = gzip.compress(identity, compresslevel=9, mtime=0)
+        brotlied = brotli.compress(identity, quality=11) if brotli is not None else None
+        return EncodedBody(identity, gzipped, brotlied)
+
+    def select(self, accept_encodings):
+        """
+        Pick the smallest variant the client accepts.
+
+        :param accept_encodings: The request's parsed Accept-Encoding header.
+        :return: A tuple of (content encoding or None, body bytes).
+        """
+        if self.brotlied is not None and accept_encodings["br"]:
+            return "br", self.brotlied
+        if self.gzipped is not None and accept_encodings["gzip"]:
+            return "gzip", self.gzipped
+        return None, self.identity
+
+    def to_response(self, accept_encodings):
+        """
+        Build a response directly from the precomputed bytes.
+
+        :param accept_encodings: The request's parsed Accept-Encoding header.
+        :return: A Flask Response.
+        """
+        encoding, body = self.select(accept_encodings)
+        response = Response(body, mimetype="application/json")
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
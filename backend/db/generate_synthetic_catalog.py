@@ -0,0 +1,381 @@
+# backend/db/generate_synthetic_catalog.py
+import os
+import re
+import sys
+import json
+import random
+import argparse
+import logging
+from collections import Counter
+
+# Make the backend packages importable when running this script directly
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from services.prerequisite_graph import COURSE_CODE_PATTERN, course_codes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+# Course levels by year of study: first year courses are numbered 1xxx, second year 2xxx, and so on
+LEVEL_BY_YEAR = (1, 2, 3, 4, 4)
+
+# Titles for department courses, alongside the titles found in the real roadmaps
+TITLE_TEMPLATES = (
+    "Introduction to {name}", "Foundations of {name}", "Topics in {name}", "Research Methods in {name}",
+    "Seminar in {name}", "Advanced {name}", "Senior Capstone in {name}", "Internship in {name}",
+    "Applied {name}", "Special Topics in {name}", "Theory and Practice of {name}", "Independent Study in {name}"
+)
+
+ABBREVIATION_PATTERN = re.compile(r"\s*\(([^)]*)\)\s*$")
+
+
+def read_documents(path):
+    with open(path, 'r') as file:
+        data = json.load(file)
+    return data if isinstance(data, list) else [data]
+
+
+class CatalogModel:
+    def __init__(self):
+        """
+        The shape of the real catalog: which course entries, strings and prerequisite phrasings occur and how often,
+        learned from the roadmaps and colleges_degrees.json of a data directory.
+        """
+        self.year_names = []
+        self.semester_names = Counter()
+        self.years_per_roadmap = Counter()
+        self.courses_per_semester = Counter()
+        self.placeholders = []  # Course entries without a course number ('Choose 1', 'Free Elective', ...)
+        self.core_courses = []  # Lower-division course entries with a course number, shared between programs
+        self.titles = []
+        self.notes = Counter()
+        self.hours = Counter()
+        self.min_grades = Counter()
+        self.important = Counter()
+        self.gec_codes = Counter()
+        self.templates = []  # (prerequisite text with {0}, {1}... in place of course codes, number of codes)
+        self.prerequisite_rate = 0.0
+        self.degrees = []  # Entries of colleges_degrees.json
+
+    @staticmethod
+    def learn(data_dir):
+        """
+        Read every roadmap and colleges_degrees.json in a data directory.
+
+        :param data_dir: Directory holding the data files, e.g. backend/data.
+        :return: Instance of CatalogModel.
+        """
+        model = CatalogModel()
+        coded = 0
+        with_prerequisite = 0
+        seen_titles = set()
+        seen_core = set()
+        seen_placeholders = set()
+        seen_templates = set()
+
+        for file_name in sorted(os.listdir(data_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(data_dir, file_name)
+            if file_name == "colleges_degrees.json":
+                model.degrees = [entry for entry in read_documents(path) if entry.get("courseType")]
+                continue
+
+            for document in read_documents(path):
+                if not isinstance(document, dict) or "years" not in document:
+                    continue
+                model.years_per_roadmap[len(document["years"])] += 1
+                for year in document["years"]:
+                    if year.get("year") and year["year"] not in model.year_names:
+                        model.year_names.append(year["year"])
+                    for semester in year.get("semesters", []):
+                        model.semester_names[semester.get("semester")] += 1
+                        model.courses_per_semester[len(semester.get("courses", []))] += 1
+                        for course in semester.get("courses", []):
+                            model._learn_course(course)
+                            codes = course_codes(course.get("courseNumber"))
+                            if not codes:
+                                key = (course.get("courseNumber"), course.get("title"))
+                                if key not in seen_placeholders:
+                                    seen_placeholders.add(key)
+                                    model.placeholders.append(model._entry(course))
+                                continue
+
+                            coded += 1
+                            # Core slots ('Communication (Core)') only make sense as shared courses
+                            if course.get("title") and "(Core)" not in course["title"] and course["title"] not in seen_titles:
+                                seen_titles.add(course["title"])
+                                model.titles.append(course["title"])
+                            if codes[0][-4] in "12" and codes[0] not in seen_core:
+                                seen_core.add(codes[0])
+                                model.core_courses.append(model._entry(course))
+                            prerequisite = course.get("prerequisite") or ""
+                            if prerequisite:
+                                template, slots = model._template(prerequisite)
+                                with_prerequisite += 1
+                                if template not in seen_templates:
+                                    seen_templates.add(template)
+                                    model.templates.append((template, slots))
+
+        model.prerequisite_rate = with_prerequisite / coded if coded else 0.0
+        if not model.year_names or not model.degrees:
+            raise ValueError(f"No roadmaps or colleges_degrees.json found in {data_dir}")
+        return model
+
+    @staticmethod
+    def _template(text):
+        """
+        Turn a prerequisite text into a template by numbering the course codes it mentions,
+        e.g. "ECON 2301 and ECON 2302." -> ("{0} and {1}.", 2).
+        """
+        slots = 0
+        parts = []
+        position = 0
+        for match in COURSE_CODE_PATTERN.finditer(text):
+            parts.append(text[position:match.start()].replace("{", "{{").replace("}", "}}"))
+            parts.append("{%d}" % slots)
+            slots += 1
+            position = match.end()
+        parts.append(text[position:].replace("{", "{{").replace("}", "}}"))
+        return "".join(parts), slots
+
+    def _learn_course(self, course):
+        self.hours[course.get("hours")] += 1
+        self.min_grades[course.get("minGrade", "")] += 1
+        self.important[course.get("important", "")] += 1
+        self.notes[course.get("notes", "")] += 1
+        if course.get("gec"):
+            self.gec_codes[course["gec"]] += 1
+
+    @staticmethod
+    def _entry(course):
+        return {key: value for key, value in course.items() if key not in ("courseId", "_id")}
+
+
+def weighted_choice(rng, counter):
+    """
+    Pick a key of a Counter with probability proportional to its count, deterministically for a seeded rng.
+    """
+    keys = sorted(counter, key=repr)
+    return rng.choices(keys, weights=[counter[key] for key in keys])[0]
+
+
+class CatalogGenerator:
+    def __init__(self, model, seed=0, courses_per_department=40):
+        """
+        Generate roadmaps shaped like the real ones. Programs are grouped into departments; each department
+        has a subject code and a course list numbered by level, and its programs draw from that list, the shared
+        lower-division courses and the placeholder entries of the real catalog, so strings repeat across programs
+        as they do in production. Prerequisites reuse the real phrasings and point at lower-level courses.
+
+        :param model: The CatalogModel learned from the real data.
+        :param seed: Seed of the random generators; the same seed and sizes give the same catalog. Each department
+            and program has its own generator, so a larger catalog extends a smaller one instead of reshuffling it.
+        :param courses_per_department: Size of each department's course list.
+        """
+        self.model = model
+        self.seed = seed
+        self.courses_per_department = courses_per_department
+
+    def _subject_code(self, name, used):
+        letters = re.sub(r"[^A-Z]", "", name.upper()) or "SUBJ"
+        candidates = [letters[:4].ljust(4, "X")]
+        candidates += [letters[:3].ljust(3, "X") + chr(ord("A") + i) for i in range(26)]
+        for candidate in candidates:
+            if candidate not in used:
+                used.add(candidate)
+                return candidate
+        code = f"S{len(used):03d}"[:4]
+        used.add(code)
+        return code
+
+    def _prerequisite(self, rng, candidates):
+        model = self.model
+        if not model.templates or rng.random() >= model.prerequisite_rate:
+            return ""
+        usable = [(template, slots) for template, slots in model.templates if slots <= len(candidates)]
+        if not usable:
+            return ""
+        template, slots = rng.choice(usable)
+        return template.format(*rng.sample(candidates, slots))
+
+    def _department_courses(self, rng, name, subject):
+        model = self.model
+        courses = []
+        by_level = {}
+        per_level = max(1, self.courses_per_department // 4)
+        for level in range(1, 5):
+            numbers = sorted(rng.sample(range(level * 1000 + 300, level * 1000 + 400), per_level))
+            for number in numbers:
+                code = f"{subject} {number}"
+                if rng.random() < 0.5 and model.titles:
+                    title = rng.choice(model.titles)
+                else:
+                    title = rng.choice(TITLE_TEMPLATES).format(name=name)
+                lower = [course["courseNumber"] for lower_level in range(1, level) for course in by_level[lower_level]]
+                courses.append({
+                    "important": weighted_choice(rng, model.important),
+                    "hours": weighted_choice(rng, model.hours),
+                    "courseNumber": code,
+                    "title": title,
+                    "minGrade": weighted_choice(rng, model.min_grades),
+                    "gec": weighted_choice(rng, model.gec_codes) if level <= 2 and rng.random() < 0.2 else "",
+                    "prerequisite": self._prerequisite(rng, lower) if lower else "",
+                    "notes": weighted_choice(rng, model.notes)
+                })
+                by_level.setdefault(level, []).append(courses[-1])
+        return by_level
+
+    def _roadmap(self, rng, department, program, by_level):
+        model = self.model
+        semester_names = [name for name, _ in model.semester_names.most_common(2)]
+        years = []
+        used = set()
+        for y in range(weighted_choice(rng, model.years_per_roadmap)):
+            level = LEVEL_BY_YEAR[min(y, len(LEVEL_BY_YEAR) - 1)]
+            semesters = []
+            for semester_name in semester_names:
+                courses = []
+                for _ in range(weighted_choice(rng, model.courses_per_semester)):
+                    roll = rng.random()
+                    if level <= 2 and roll < 0.35 and model.placeholders:
+                        course = rng.choice(model.placeholders)
+                    elif level <= 2 and roll < 0.55 and model.core_courses:
+                        course = rng.choice(model.core_courses)
+                    else:
+                        pool = [course for course in by_level.get(level, []) if course["courseNumber"] not in used]
+                        if not pool:
+                            pool = model.placeholders or by_level[level]
+                        course = rng.choice(pool)
+                    if course_codes(course.get("courseNumber")):
+                        if course["courseNumber"] in used:
+                            course = rng.choice(model.placeholders) if model.placeholders else course
+                        used.add(course["courseNumber"])
+                    courses.append(dict(course))
+                semesters.append({"semester": semester_name, "courses": courses})
+            years.append({"year": model.year_names[min(y, len(model.year_names) - 1)], "semesters": semesters})
+        return {"department": department, "program": program, "years": years}
+
+    def generate(self, programs):
+        """
+        Generate a catalog.
+
+        :param programs: Number of program roadmaps.
+        :return: A tuple of (colleges_degrees entries, {collection name: documents}).
+        """
+        degrees = self.model.degrees
+        used_subjects = set()
+        used_slugs = set()
+        departments = {}
+        entries = []
+        collections = {}
+
+        for index in range(programs):
+            base = degrees[index % len(degrees)]
+            variant = index // len(degrees)
+            match = ABBREVIATION_PATTERN.search(base["course"])
+            abbreviation = match.group(1) if match else ""
+            name = ABBREVIATION_PATTERN.sub("", base["course"])
+            department = name.split(" - ")[0]
+            program = name if variant == 0 else f"{name} - Track {variant}"
+            level = base["courseType"].split("-", 1)[0]
+
+            slug = re.sub(r"[^a-z0-9]+", "-", program.lower()).strip("-")
+            course_type = f"{level}-{slug}-courses"
+            suffix = 2
+            while course_type in used_slugs:
+                course_type = f"{level}-{slug}-{suffix}-courses"
+                suffix += 1
+            used_slugs.add(course_type)
+
+            if department not in departments:
+                department_rng = random.Random(f"{self.seed}:{department}")
+                subject = self._subject_code(department, used_subjects)
+                departments[department] = self._department_courses(department_rng, department, subject)
+
+            entries.append({
+                "course": f"{program} ({abbreviation})" if abbreviation else program,
+                "degree": base["degree"] if variant == 0 else f"{base['degree']} - Track {variant}",
+                "college": base["college"],
+                "courseType": course_type
+            })
+            program_rng = random.Random(f"{self.seed}:{course_type}")
+            collections[course_type.replace("-", "_")] = [
+                self._roadmap(program_rng, department, program, departments[department])
+            ]
+
+        return entries, collections
+
+
+def write_catalog(entries, collections, output_dir, config_path):
+    """
+    Write the roadmaps, colleges_degrees.json and a data_files_config.json listing all of them.
+    Paths in the configuration are relative to the backend directory when the output is inside it,
+    as in config/data_files_config.json, and absolute otherwise.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def config_path_of(path):
+        relative = os.path.relpath(os.path.abspath(path), BACKEND_DIR)
+        return os.path.abspath(path) if relative.startswith("..") else relative
+
+    colleges_degrees_path = os.path.join(output_dir, "colleges_degrees.json")
+    with open(colleges_degrees_path, 'w') as file:
+        json.dump(entries, file, indent=4)
+    data_files = [{"collection_name": "colleges_degrees", "json_file_path": config_path_of(colleges_degrees_path),
+                   "bulk_insert": True}]
+
+    for collection_name in sorted(collections):
+        path = os.path.join(output_dir, f"{collection_name}.json")
+        with open(path, 'w') as file:
+            json.dump(collections[collection_name], file, indent=4)
+        data_files.append({"collection_name": collection_name, "json_file_path": config_path_of(path),
+                           "bulk_insert": False})
+
+    with open(config_path, 'w') as file:
+        json.dump(data_files, file, indent=4)
+    return data_files
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line options of the script.
+
+    :param argv: Optional list of arguments, defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog shaped like the data files, at any size.")
+    parser.add_argument("--programs", type=int, default=1000, help="Number of program roadmaps to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Seed; the same seed and sizes give identical files")
+    parser.add_argument("--courses-per-department", type=int, default=40,
+                        help="Courses in each department's list, spread over four levels")
+    parser.add_argument("--source-dir", default=DEFAULT_DATA_DIR, help="Data directory the shape is learned from")
+    parser.add_argument("--output-dir", default=os.path.join(BACKEND_DIR, "data_synthetic"),
+                        help="Directory receiving the generated data files")
+    parser.add_argument("--config-output", default=None,
+                        help="Path of the generated data files configuration (default: <output-dir>/data_files_config.json)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """
+    Generate the catalog. Serve it with storage_backend=local, local_data_dir=<output-dir>,
+    colleges_degrees_file=<output-dir>/colleges_degrees.json and data_files_config=<config-output>,
+    or load it with insert_data.py --config <config-output>.
+    """
+    args = parse_args()
+    model = CatalogModel.learn(args.source_dir)
+    logging.info(f"Learned {len(model.core_courses)} shared courses, {len(model.placeholders)} placeholders, "
+                 f"{len(model.templates)} prerequisite phrasings and {len(model.degrees)} degrees from {args.source_dir}")
+
+    entries, collections = CatalogGenerator(model, args.seed, args.courses_per_department).generate(args.programs)
+    config_path = args.config_output or os.path.join(args.output_dir, "data_files_config.json")
+    data_files = write_catalog(entries, collections, args.output_dir, config_path)
+    logging.info(f"Wrote {len(collections)} roadmaps and {len(entries)} degrees to {args.output_dir}; "
+                 f"{len(data_files)} data files listed in {config_path}")
+
+
+if __name__ == "__main__":
+    main()
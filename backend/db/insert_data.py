@@ -1,10 +1,17 @@
 # backend/db/insert.py 
 import os
+import sys
+import argparse
 import logging
 import time
 import json
 from dotenv import load_dotenv
-from cosmos_mongo_db import CosmosDB
+
+# Make the backend packages importable when running this script directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db.cosmos_mongo_db import CosmosDB
+from db.degree_summary import add_degree_summary
+from db.bulk_loader import AdaptiveRateLimiter, BulkLoader
 
 # Load environment variables from .env file
 load_dotenv()
@@ -30,6 +37,21 @@ def load_config(config_file):
         logging.error(f"Error decoding JSON from the configuration file '{config_file}'.")
         return []
 
+def dedup_query(collection_name, document):
+    """
+    Build the query used to detect documents that were already inserted.
+    Roadmaps are matched on department and program, because stored copies carry generated course ids.
+
+    :param collection_name: Name of the collection in the database
+    :param document: The document about to be inserted
+    :return: The query to pass to find_document
+    """
+    if collection_name == "colleges_degrees":
+        return {"course": document["course"]}
+    if "years" in document:
+        return {"department": document.get("department"), "program": document.get("program")}
+    return document
+
 def insert_json_data(cosmos_mongo_db, collection_name, json_file_path, bulk_insert=False, batch_size=100):
     """
     Insert JSON data into the specified CosmosDB collection. If bulk_insert is True, the data will be inserted in batches.
@@ -81,14 +103,14 @@ def process_batches(cosmos_mongo_db, collection_name, data, batch_size):
         batch = data[i:i + batch_size]
 
         for document in batch:
-            query = {"course": document["course"]} if collection_name == "colleges_degrees" else document
+            query = dedup_query(collection_name, document)
             existing_document = cosmos_mongo_db.find_document(collection_name, query)
 
             if existing_document:
-                logging.info(f"Document with course '{document['course']}' already exists in {collection_name}. Skipping...")
+                logging.info(f"Document matching {query} already exists in {collection_name}. Skipping...")
             else:
                 cosmos_mongo_db.add_single_data(collection_name, document)
-                logging.info(f"Inserted new document into {collection_name}: {document}")
+                logging.info(f"Inserted new document into {collection_name}: {query}")
 
         logging.info(f"Batch {i//batch_size + 1}: Processed {len(batch)} documents in {collection_name}.")
 
@@ -99,84 +121,92 @@ def process_batches(cosmos_mongo_db, collection_name, data, batch_size):
 def process_single_documents(cosmos_mongo_db, collection_name, data):
     """
     Process and insert each document individually without splitting.
-    Adds 'totalSemesterHours' to each semester, 'totalDegreeHours' and 'advancedMinimumCreditHours' 
-    at the document level, summing the hours of all courses within each semester and 
-    calculating advanced hours for courses starting with '3' or '4' across all years.
+    Degree summary fields are added with add_degree_summary before inserting.
 
     :param cosmos_mongo_db: Instance of the CosmosDB class
     :param collection_name: Name of the collection in the database
     :param data: The data to be inserted
     """
     for document in data:
-        # Initialize total degree hours counter and advanced credit hours
-        total_degree_hours = 0
-        advanced_minimum_credit_hours = 0  # Initialize at document level
-
-        # Calculate the total semester hours for each semester and advanced minimum credit hours
-        if "years" in document:  # Ensure the data structure includes 'years'
-            for year in document["years"]:
-                year_total_hours = 0  # Initialize total hours for the year
-
-                for semester in year["semesters"]:
-                    total_hours = sum(course["hours"] for course in semester["courses"])
-                    semester["totalSemesterHours"] = total_hours  # Add the total hours to the semester data
-                    year_total_hours += total_hours  # Accumulate yearly total
-
-                    # Calculate advanced minimum credit hours across all semesters
-                    for course in semester["courses"]:
-                        course_number = course["courseNumber"].strip()
-                        # Check if course number has sufficient length and starts with '3' or '4'
-                        if len(course_number) >= 6 and course_number[5] in ['3', '4']:
-                            advanced_minimum_credit_hours += course["hours"]
-
-                # year["totalYearHours"] = year_total_hours
-                total_degree_hours += year_total_hours
-
-            # Set advanced credit hours and total degree hours for the document
-            document["totalDegreeHours"] = total_degree_hours
-            document["advancedMinimumCreditHours"] = 42 if advanced_minimum_credit_hours > 42 else advanced_minimum_credit_hours
-            document["approved"] = "Approved: "
-            document["revised"] = "Revised: Tuesday, August 20th, 2024"
-            document["aboveYearOne"] = "Important Notice: Register in the Business Foundation Courses listed below in thier posted sequence or sooner! Business Foundation courses are listed in BOLD and an * next to thier name."
-            document["belowYearTwo"] = "Students must be admitted into RCVCoBE to be able to register for the Advanced Business Courses as shown on the next page. ** Apply to be admitted into RCVCoBE at https://www.utrgv.edu/cobe/undergrauate/apply-for-admission **"
-            document["aboveYearThree"] = "Students must be admitted into RCVCoBE to be able to register for the Advanced Business Courses as shown on this page. For questions contact the RCVCoBE Coordinators at: business.advising@utrgv.edu"
-            document["aboveYearFour"] = "Students needs to review all pending course prerequisites for thier major using the Roadmap and Degree Works. Students will need to request approval for MGMT 4389 three weeks before registration begins by emailing business.advising@utrgv.edu"
-            
-        query = {"course": document["course"]} if collection_name == "colleges_degrees" else document
+        add_degree_summary(document)
+
+        query = dedup_query(collection_name, document)
         existing_document = cosmos_mongo_db.find_document(collection_name, query)
 
         if existing_document:
-            logging.info(f"Document with course '{document['course']}' already exists in {collection_name}. Skipping...")
+            logging.info(f"Document matching {query} already exists in {collection_name}. Skipping...")
         else:
             cosmos_mongo_db.add_single_data(collection_name, document)
-            logging.info(f"Inserted new document into {collection_name}: {document}")
+            logging.info(f"Inserted new document into {collection_name}: {query}")
 
         # Pause for 10 seconds to reduce load on the database
         logging.info("Pausing for 10 seconds to reduce load on the database...")
         time.sleep(10)
 
+def parse_args(argv=None):
+    """
+    Parse the command line options of the script.
+
+    :param argv: Optional list of arguments, defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Load the configured JSON data files into the database.")
+    parser.add_argument("--config", default="config/data_files_config.json",
+                        help="Path to the data files configuration")
+    parser.add_argument("--bulk-loader", action="store_true",
+                        help="Use concurrent bulk upserts with adaptive rate limiting instead of one document at a time")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Collections loaded concurrently by the bulk loader")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="Documents per bulk_write in the bulk loader")
+    parser.add_argument("--initial-rate", type=float, default=200.0,
+                        help="Documents per second the bulk loader starts at before adapting")
+    parser.add_argument("--connection-string", default=None,
+                        help="Connect with this connection string (e.g. a local mongod) instead of the environment or Key Vault")
+    parser.add_argument("--db-name", default=os.getenv("cosmosdb_account_name"),
+                        help="Database name used with --connection-string")
+    return parser.parse_args(argv)
+
 def main():
     """
     Main entry point for the script. Initializes CosmosDB connection and inserts data from JSON files.
     """
+    args = parse_args()
     try:
-        # Initialize the CosmosDB class using the connection string from Key Vault
-        cosmos_mongo_db = CosmosDB.from_key_vault()
+        if args.connection_string:
+            cosmos_mongo_db = CosmosDB(connection_string=args.connection_string, db_name=args.db_name or "edupathfinder")
+        else:
+            # Initialize the CosmosDB class using the connection string from the environment or Key Vault
+            cosmos_mongo_db = CosmosDB.from_environment()
 
-       # Load the data files configuration from JSON
-        config_file = "config/data_files_config.json"
-        data_files = load_config(config_file)
+        # Load the data files configuration from JSON
+        data_files = load_config(args.config)
 
-        # Insert data for each collection
+        existing_files = []
         for data_file in data_files:
+            if not os.path.exists(data_file.get("json_file_path")):
+                logging.warning(f"JSON file {data_file.get('json_file_path')} does not exist. Skipping...")
+                continue
+            existing_files.append(data_file)
+
+        if args.bulk_loader:
+            loader = BulkLoader(
+                cosmos_mongo_db,
+                key_for=dedup_query,
+                prepare=add_degree_summary,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                rate_limiter=AdaptiveRateLimiter(initial_rate=args.initial_rate)
+            )
+            loader.load(existing_files)
+            return
+
+        # Insert data for each collection
+        for data_file in existing_files:
             collection_name = data_file.get("collection_name")
             json_file_path = data_file.get("json_file_path")
             bulk_insert = data_file.get("bulk_insert", False)
 
-            if not os.path.exists(json_file_path):
-                logging.warning(f"JSON file {json_file_path} does not exist. Skipping...")
-                continue
-
             insert_json_data(cosmos_mongo_db, collection_name, json_file_path, bulk_insert)
 
 
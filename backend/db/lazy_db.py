@@ -0,0 +1,83 @@
+# backend/db/lazy_db.py
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LazyCosmosDB:
+    def __init__(self, factory):
+        """
+        Stand-in for a CosmosDB instance that is only created when first needed, or in a background thread,
+        so the app can start serving (e.g. /health) before Key Vault and Mongo have answered.
+        Attribute access is forwarded to the real instance, blocking until it exists.
+
+        :param factory: Callable returning a connected CosmosDB instance.
+        """
+        self._factory = factory
+        self._instance = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def get(self):
+        """
+        Return the real CosmosDB instance, creating it on first use. A failed creation is retried on the next call.
+
+        :return: Instance of CosmosDB.
+        """
+        instance = self._instance
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if self._instance is None:
+                try:
+                    self._instance = self._factory()
+                    self._error = None
+                except Exception as e:
+                    self._error = e
+                    raise
+        return self._instance
+
+    def start_background(self):
+        """
+        Start creating the real instance in a daemon thread, if that is not already done or underway.
+        """
+        if self._instance is not None or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        def initialize():
+            try:
+                self.get()
+                logger.info("Database initialized in the background")
+            except Exception as e:
+                logger.error("Background database initialization failed: %s", e)
+
+        self._thread = threading.Thread(target=initialize, name="cosmosdb-init", daemon=True)
+        self._thread.start()
+
+    @property
+    def initialized(self):
+        """
+        :return: Whether the real instance exists, i.e. using it will not block on its creation.
+        """
+        return self._instance is not None
+
+    def readiness(self):
+        """
+        Report whether the database can serve requests, without blocking on its creation.
+
+        :return: A tuple of (ready flag, status dictionary).
+        """
+        if self._instance is None:
+            if self._error is not None:
+                return False, {"status": "unavailable", "error": str(self._error)}
+            return False, {"status": "starting"}
+        if not self._instance.ping():
+            return False, {"status": "unavailable", "error": "Database did not answer ping"}
+        return True, {"status": "ready"}
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -0,0 +1,710 @@
+# backend/db/local_store.py
+
+import os
+import copy
+import json
+import hashlib
+import logging
+import stat
+import time
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from flask import Response, jsonify, request
+from db.repository import CatalogRepository
+from db.catalog_cache import CatalogCache, CachedCollection
+from db.course_index import iter_courses
+from db.degree_summary import DERIVED_DOCUMENT_FIELDS, SUMMARY_FIELDS, add_degree_summary, compute_summary, document_totals
+from metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+# Default location of the JSON files, relative to the backend directory
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def local_id(*parts):
+    """
+    Derive a stable identifier from the position of an entry, so every worker (and every restart)
+    hands out the same '_id' and 'courseId' for the same file.
+
+    :param parts: The collection name and the indexes locating the entry.
+    :return: A 24 character hex string, shaped like an ObjectId.
+    """
+    return hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:24]
+
+
+class LocalCollection:
+    def __init__(self, name, path, documents, single, mtime_ns):
+        """
+        One data/*.json file held in memory, with its course lookups.
+
+        :param name: The collection name (the file name without '.json').
+        :param path: The path of the file.
+        :param documents: The documents of the file, each with an '_id'.
+        :param single: Whether the file holds a single document rather than a list, so it is written back the same way.
+        :param mtime_ns: The modification time of the file when it was read; used as the revision.
+        """
+        self.name = name
+        self.path = path
+        self.documents = documents
+        self.single = single
+        self.mtime_ns = mtime_ns
+        self.courses = {}  # courseId -> (document index, year, semester, course)
+        self.titles = {}  # title -> position of the first course with that title
+        # What was derived in memory rather than read from the file, and is left out when the file is written
+        self.derived_summaries = set()  # '_id' of the documents whose summary fields were added on read
+        self.generated_ids = set()  # courseIds assigned with local_id
+        self.reindex()
+
+    def reindex(self):
+        """
+        Rebuild the course lookups from the documents.
+        """
+        self.courses.clear()
+        self.titles.clear()
+        for d, document in enumerate(self.documents):
+            for y, s, c, course in iter_courses(document):
+                position = (d, y, s, c)
+                if course.get("courseId"):
+                    self.courses[course["courseId"]] = position
+                self.titles.setdefault(course.get("title"), position)
+
+    def course_at(self, position):
+        d, y, s, c = position
+        return self.documents[d]["years"][y]["semesters"][s]["courses"][c]
+
+    def revision(self):
+        return {
+            "revision": self.mtime_ns,
+            # HTTP dates have second precision
+            "updated_at": datetime.fromtimestamp(self.mtime_ns // 1_000_000_000, timezone.utc)
+        }
+
+
+class LocalStore(CatalogRepository):
+    def __init__(self, data_dir, cache=None):
+        """
+        Serve the catalog from the JSON files of a directory instead of Cosmos DB, one collection per file.
+        Files are read once into memory with a course id and title index; edits are written back atomically.
+        The modification time of a file is its revision, so workers sharing the directory notice each other's writes.
+
+        :param data_dir: The directory holding the <collection name>.json files.
+        :param cache: Optional CatalogCache used for the encoded responses of get_data. Configured from the environment if omitted.
+        """
+        if not os.path.isdir(data_dir):
+            raise ValueError(f"Data directory {data_dir} does not exist")
+
+        self.data_dir = os.path.abspath(data_dir)
+        self.cache = cache if cache is not None else CatalogCache.from_env()
+        self.precompressed_responses = os.getenv('precompressed_responses', 'true').lower() == 'true'
+        # Reading the umask means setting it, which is only safe before request threads create files
+        umask = os.umask(0o022)
+        os.umask(umask)
+        self.new_file_mode = 0o666 & ~umask
+        self._collections = {}
+        self._lock = threading.RLock()
+
+        for file_name in sorted(os.listdir(self.data_dir)):
+            if file_name.endswith(".json"):
+                self._collection(file_name[:-len(".json")])
+        logger.info("Loaded %s collections from %s", len(self._collections), self.data_dir)
+
+    @staticmethod
+    def from_environment():
+        """
+        Factory method reading the data directory from the 'local_data_dir' environment variable, defaulting to backend/data.
+
+        :return: Instance of LocalStore.
+        """
+        return LocalStore(os.getenv('local_data_dir', DEFAULT_DATA_DIR))
+
+    def _path(self, collection_name):
+        return os.path.join(self.data_dir, f"{collection_name}.json")
+
+    def _collection(self, collection_name):
+        """
+        Get a collection, (re)reading its file when it is new or was changed by another process.
+
+        :return: The LocalCollection, or None if there is no such file.
+        """
+        if not collection_name or os.sep in collection_name or collection_name.startswith("."):
+            return None
+        path = self._path(collection_name)
+        with self._lock:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._collections.pop(collection_name, None)
+                return None
+
+            collection = self._collections.get(collection_name)
+            if collection is not None and collection.mtime_ns == mtime_ns:
+                return collection
+
+            with open(path, 'r') as file:
+                data = json.load(file)
+            single = isinstance(data, dict)
+            documents = [data] if single else data
+            derived_summaries = set()
+            generated_ids = set()
+            for d, document in enumerate(documents):
+                document.setdefault("_id", local_id(collection_name, d))
+                if "years" in document:
+                    if "totalDegreeHours" not in document:
+                        add_degree_summary(document)
+                        derived_summaries.add(document["_id"])
+                    for y, s, c, course in iter_courses(document):
+                        if not course.get("courseId"):
+                            course["courseId"] = local_id(collection_name, d, y, s, c)
+                            generated_ids.add(course["courseId"])
+
+            collection = LocalCollection(collection_name, path, documents, single, mtime_ns)
+            collection.derived_summaries = derived_summaries
+            collection.generated_ids = generated_ids
+            self._collections[collection_name] = collection
+            self.cache.invalidate(collection_name)
+            logger.debug("Read %s documents from %s", len(documents), path)
+            return collection
+
+    @staticmethod
+    def _stored_form(collection, document):
+        """
+        The document as written to its file: without '_id', and without the summary fields and course ids
+        derived when the file was read, which are derived the same way the next time it is read.
+        """
+        derived = document["_id"] in collection.derived_summaries
+        stored = {key: value for key, value in document.items()
+                  if key != "_id" and not (derived and key in DERIVED_DOCUMENT_FIELDS)}
+        if "years" not in stored or not (derived or collection.generated_ids):
+            return stored
+
+        years = []
+        for year in stored["years"]:
+            year = dict(year)
+            if "semesters" in year:
+                semesters = []
+                for semester in year["semesters"]:
+                    semester = {key: value for key, value in semester.items()
+                                if not (derived and key == "totalSemesterHours")}
+                    if "courses" in semester:
+                        semester["courses"] = [
+                            {key: value for key, value in course.items()
+                             if not (key == "courseId" and value in collection.generated_ids)}
+                            for course in semester["courses"]
+                        ]
+                    semesters.append(semester)
+                year["semesters"] = semesters
+            years.append(year)
+        stored["years"] = years
+        return stored
+
+    def _file_mode(self, path):
+        """
+        :return: The permission bits of an existing file, or those a new file gets under the process umask.
+        """
+        try:
+            return stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            return self.new_file_mode
+
+    def _persist(self, collection):
+        """
+        Write a collection back to its file through a temporary file and an atomic rename,
+        so readers never see a partially written file. The new modification time becomes the revision.
+        """
+        documents = [self._stored_form(collection, document) for document in collection.documents]
+        data = documents[0] if collection.single and len(documents) == 1 else documents
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.data_dir, prefix=f".{collection.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, 'w') as file:
+                # mkstemp creates the file readable by its owner only; keep the mode of the file it replaces
+                os.chmod(temp_path, self._file_mode(collection.path))
+                json.dump(data, file, indent=2)  # The layout of the checked-in files
+                file.write("\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, collection.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        mtime_ns = os.stat(collection.path).st_mtime_ns
+        # Guarantee a new revision even on file systems with coarse timestamps
+        collection.mtime_ns = max(mtime_ns, collection.mtime_ns + 1)
+        if collection.mtime_ns != mtime_ns:
+            os.utime(collection.path, ns=(collection.mtime_ns, collection.mtime_ns))
+        collection.single = collection.single and len(documents) == 1
+        self.cache.invalidate(collection.name)
+
+    @staticmethod
+    def _checkpoint(collection, document_indexes=()):
+        """
+        Record what an in-memory change is about to modify, so it can be undone if the file cannot be written.
+
+        :param collection: The LocalCollection about to change.
+        :param document_indexes: The indexes of the documents about to be edited; appended documents need none.
+        :return: The checkpoint to pass to _persist_or_rollback.
+        """
+        return len(collection.documents), {d: copy.deepcopy(collection.documents[d]) for d in set(document_indexes)}
+
+    def _persist_or_rollback(self, collection, checkpoint):
+        """
+        Persist a collection after an in-memory change; if that fails, put the documents back as they were at the
+        checkpoint, so memory keeps matching the file and a retry applies the change again.
+        """
+        try:
+            self._persist(collection)
+        except Exception:
+            count, documents = checkpoint
+            del collection.documents[count:]
+            for d, document in documents.items():
+                collection.documents[d] = document
+            collection.reindex()
+            self.cache.invalidate(collection.name)
+            raise
+
+    def ping(self):
+        return os.path.isdir(self.data_dir)
+
+    @instrumented("get_revision")
+    def get_revision(self, collection_name):
+        """
+        Get the revision token of a collection: the modification time of its file.
+
+        :param collection_name: The name of the collection.
+        :return: A dictionary with 'revision' (0 if there is no file) and 'updated_at'.
+        """
+        collection = self._collection(collection_name)
+        if collection is None:
+            return {"revision": 0, "updated_at": None}
+        return collection.revision()
+
+    @instrumented("get_changes")
+    def get_changes(self, since=None, timeout=0):
+        """
+        Get the collections written after a point in time, like CosmosDB.get_changes. The sequence number is the
+        latest modification time of the files, so the directory is checked every 'change_feed_poll_seconds' (1).
+
+        :param since: The 'sequence' returned by the previous call, or None to only get the current sequence number.
+        :param timeout: Maximum number of seconds to wait when nothing changed yet.
+        :return: A dictionary with the 'changes' and the 'sequence' to pass next time.
+        """
+        poll_seconds = float(os.getenv('change_feed_poll_seconds', 1))
+        deadline = time.monotonic() + timeout
+        while True:
+            revisions = {}
+            with os.scandir(self.data_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and not entry.name.startswith("."):
+                        revisions[entry.name[:-len(".json")]] = entry.stat().st_mtime_ns
+            latest = max(revisions.values(), default=0)
+            if since is None:
+                return {"changes": [], "sequence": latest}
+
+            changes = [{
+                "collection": collection_name,
+                "revision": mtime_ns,
+                "updated_at": datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc),
+                "sequence": mtime_ns
+            } for collection_name, mtime_ns in revisions.items() if mtime_ns > since]
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                changes.sort(key=lambda change: change["sequence"])
+                return {"changes": changes, "sequence": max(since, latest)}
+            time.sleep(min(poll_seconds, remaining))
+
+    @instrumented("get_documents")
+    def get_documents(self, collection_name):
+        """
+        Get the documents of a collection. The documents are the ones held in memory and must not be modified.
+
+        :param collection_name: The name of the collection.
+        :return: A list of documents, empty if there is no such file.
+        """
+        collection = self._collection(collection_name)
+        return list(collection.documents) if collection is not None else []
+
+    @instrumented("collection_exists")
+    def collection_exists(self, collection_name):
+        return self._collection(collection_name) is not None
+
+    @instrumented("create_collection")
+    def create_collection(self, collection_name):
+        """
+        Create an empty collection file if it does not already exist.
+
+        :param collection_name: The name of the collection to create.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        try:
+            with self._lock:
+                if self._collection(collection_name) is not None:
+                    logger.info("Collection already exists: %s", collection_name)
+                    return {"status": "Collection already exists", "collection_name": collection_name}, 200
+                if not collection_name or os.sep in collection_name or collection_name.startswith("."):
+                    raise ValueError(f"Invalid collection name {collection_name!r}")
+                collection = LocalCollection(collection_name, self._path(collection_name), [], False, 0)
+                self._persist(collection)
+                self._collections[collection_name] = collection
+            logger.info("Collection created: %s", collection_name)
+            return {"status": "Collection created", "collection_name": collection_name}, 201
+        except Exception as e:
+            logger.error("Failed to create collection: %s", e)
+            return {"error": str(e)}, 400
+
+    @instrumented("list_collections")
+    def list_collections(self):
+        try:
+            collections = [file_name[:-len(".json")] for file_name in sorted(os.listdir(self.data_dir))
+                           if file_name.endswith(".json") and not file_name.startswith(".")]
+            return {"collections": collections}, 200
+        except OSError as e:
+            logger.error("Failed to list collections: %s", e)
+            return {"error": str(e)}, 400
+
+    def add_single_data(self, collection_name, document):
+        return self.add_data(collection_name, document)
+
+    @instrumented("add_data")
+    def add_data(self, collection_name, data):
+        """
+        Append a single document or a list of documents to a collection file, creating it if needed.
+
+        :param collection_name: The name of the collection to insert data into.
+        :param data: A document or a non-empty list of documents to insert.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        single = isinstance(data, dict)
+        documents = [data] if single else data
+        try:
+            if not isinstance(documents, list) or not documents or not all(isinstance(document, dict) for document in documents):
+                raise ValueError("The request body must be a document or a non-empty list of documents")
+
+            with self._lock:
+                collection = self._collection(collection_name)
+                if collection is None:
+                    body, status_code = self.create_collection(collection_name)
+                    if status_code >= 300:
+                        return body, status_code
+                    collection = self._collections[collection_name]
+                checkpoint = self._checkpoint(collection)
+                for document in documents:
+                    d = len(collection.documents)
+                    document.setdefault("_id", local_id(collection_name, d))
+                    for y, s, c, course in iter_courses(document):
+                        if not course.get("courseId"):
+                            course["courseId"] = local_id(collection_name, d, y, s, c)
+                            collection.generated_ids.add(course["courseId"])
+                    collection.documents.append(document)
+                collection.reindex()
+                self._persist_or_rollback(collection, checkpoint)
+
+            inserted_ids = [str(document["_id"]) for document in documents]
+            logger.info("Successfully added %s documents to %s", len(inserted_ids), collection_name)
+            if single:
+                return {"status": "Data added", "inserted_id": inserted_ids[0]}, 201
+            return {"status": "Data added", "inserted_ids": inserted_ids}, 201
+        except (ValueError, OSError) as e:
+            logger.error("Failed to add data: %s", e)
+            return {"error": str(e)}, 400
+
+    @instrumented("add_data_from_json")
+    def add_data_from_json(self, collection_name, json_file_path):
+        try:
+            with open(json_file_path, 'r') as file:
+                data = json.load(file)
+            if not isinstance(data, list) or not data:
+                raise ValueError("The JSON file must contain a non-empty list of documents")
+        except (ValueError, OSError) as e:
+            logger.error("Failed to add data from JSON: %s", e)
+            return {"error": str(e)}, 400
+        return self.add_data(collection_name, data)
+
+    @staticmethod
+    def _matches(document, query):
+        """
+        Match a document against a query of plain (possibly dotted) field equalities.
+        """
+        for key, expected in query.items():
+            value = document
+            for part in key.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            if value != expected:
+                return False
+        return True
+
+    @instrumented("find_document")
+    def find_document(self, collection_name, query):
+        """
+        Find a single document in a collection based on a query of field equalities.
+
+        :param collection_name: The name of the collection to search in.
+        :param query: The query to find the document.
+        :return: The found document or None if not found.
+        """
+        collection = self._collection(collection_name)
+        if collection is None:
+            return None
+        return next((document for document in collection.documents if self._matches(document, query)), None)
+
+    @staticmethod
+    def _project(document, fields):
+        """
+        Keep only the given (dotted) fields of a document, descending into lists like a MongoDB projection.
+        """
+        if isinstance(document, list):
+            return [projected for projected in (LocalStore._project(item, fields) for item in document)
+                    if projected not in ({}, None)]
+        if not isinstance(document, dict):
+            return None
+
+        nested = defaultdict(list)
+        projected = {}
+        for field in fields:
+            head, _, rest = field.partition(".")
+            if rest:
+                nested[head].append(rest)
+            elif head in document:
+                projected[head] = document[head]
+        for head, rest in nested.items():
+            if head in document and head not in projected:
+                value = LocalStore._project(document[head], rest)
+                if value is not None:
+                    projected[head] = value
+        return projected
+
+    @instrumented("get_data")
+    def get_data(self, collection_name, fields=None, after=None, limit=None, stream=False):
+        """
+        Retrieve the documents of a collection from memory.
+        Plain reads are served from the encoded bodies cached per revision, like CosmosDB.get_data.
+
+        :param collection_name: The name of the collection to retrieve data from.
+        :param fields: Optional list of fields (dotted paths allowed) to project.
+        :param after: Optional cursor (the last '_id' of the previous page) to resume from.
+        :param limit: Optional page size. When a full page is returned, the next cursor is sent in X-Next-Cursor.
+        :param stream: Whether to stream the documents as NDJSON.
+        :return: A tuple containing the data and HTTP status code.
+        """
+        try:
+            with self._lock:
+                collection = self._collection(collection_name)
+                documents = list(collection.documents) if collection is not None else []
+                revision = collection.mtime_ns if collection is not None else 0
+
+            if fields or after or limit or stream:
+                return self._query_data(collection_name, documents, fields, after, limit, stream)
+
+            entry = self.cache.get(collection_name)
+            if entry is None or entry.revision != revision:
+                # The store already holds these documents, so a compact copy would only add to them
+                entry = CachedCollection(revision, documents, compact=False)
+                self.cache.set(collection_name, entry)
+
+            # Without precompression the JSON body is still encoded once per revision, just not compressed
+            return entry.body(compress=self.precompressed_responses).to_response(request.accept_encodings), 200
+        except Exception as e:
+            logger.error("Failed to retrieve data: %s", e)
+            return {"error": str(e)}, 500
+
+    def _query_data(self, collection_name, documents, fields, after, limit, stream):
+        """
+        Read a projected and/or paginated slice of a collection in '_id' order.
+
+        :return: A tuple containing the data and HTTP status code.
+        """
+        documents = sorted(documents, key=lambda document: str(document["_id"]))
+        if after:
+            documents = [document for document in documents if str(document["_id"]) > after]
+        if limit:
+            documents = documents[:limit]
+        if fields:
+            # Like a MongoDB projection, '_id' is always included
+            documents = [dict(self._project(document, fields), _id=document["_id"]) for document in documents]
+
+        if stream:
+            def generate():
+                for document in documents:
+                    yield json.dumps(document, separators=(",", ":")) + "\n"
+            return Response(generate(), mimetype='application/x-ndjson'), 200
+
+        response = jsonify(documents)
+        if limit and len(documents) == limit:
+            response.headers['X-Next-Cursor'] = str(documents[-1]['_id'])
+        logger.info("Successfully retrieved %s documents from %s", len(documents), collection_name,
+                    extra={"event": "catalog_read"})
+        return response, 200
+
+    def _apply_edits(self, collection, edits):
+        """
+        Set the fields of course entries in memory and recompute the totals of the touched roadmaps.
+
+        :param collection: The LocalCollection holding the courses.
+        :param edits: A list of (position, field, value) tuples.
+        :return: True if anything changed.
+        """
+        touched = defaultdict(set)
+        for position, field, value in edits:
+            course = collection.course_at(position)
+            if field in course and course[field] == value:
+                continue
+            course[field] = value
+            touched[position[0]].add(field)
+
+        for d, fields in touched.items():
+            if SUMMARY_FIELDS.isdisjoint(fields):
+                continue
+            document = collection.documents[d]
+            for path, value in document_totals(document, compute_summary(document)).items():
+                target = document
+                *parents, leaf = path.split(".")
+                for part in parents:
+                    target = target[int(part)] if isinstance(target, list) else target[part]
+                target[leaf] = value
+        return bool(touched)
+
+    def _locate(self, collection, course_title, course_id):
+        if course_id:
+            return collection.courses.get(course_id)
+        return collection.titles.get(course_title)
+
+    @instrumented("update_course")
+    def update_course(self, collection_name, course_title, field, value, course_id=None):
+        """
+        Update a specific field of a single course entry and write the collection file back.
+        The course is found by its stable id, otherwise by title (the first course with that title wins).
+
+        :param collection_name: The name of the collection containing the course.
+        :param course_title: The course title identifying the course, used when no course id is given.
+        :param field: The field to update within the course entry.
+        :param value: The new value to set for the field.
+        :param course_id: The stable 'courseId' of the course entry.
+        :return: A dictionary containing the update status.
+        """
+        if not self._is_updatable_field(field):
+            logger.warning("Rejected update of field %r in %s", field, collection_name)
+            return {"error": f"Field {field!r} cannot be updated"}, 400
+
+        course_ref = course_id or course_title
+        try:
+            with self._lock:
+                collection = self._collection(collection_name)
+                position = self._locate(collection, course_title, course_id) if collection is not None else None
+                if position is None:
+                    logger.warning("Course %s not found in %s", course_ref, collection_name)
+                    return {"error": "Course not found"}, 404
+
+                checkpoint = self._checkpoint(collection, [position[0]])
+                if not self._apply_edits(collection, [(position, field, value)]):
+                    logger.warning("No modification made for course %s in %s", course_ref, collection_name)
+                    return {"status": "not modified"}, 200
+                self._persist_or_rollback(collection, checkpoint)
+
+            logger.info("Successfully updated course %s in %s", course_ref, collection_name)
+            return {"status": "success", "updated": True}
+        except Exception as e:
+            logger.error("Failed to update course: %s", e)
+            return {"error": str(e)}, 500
+
+    @instrumented("update_courses")
+    def update_courses(self, edits):
+        """
+        Apply a batch of course edits, writing each touched collection file once.
+        Each edit uses the keys of update_course: collectionName, courseId or courseTitle, field and value.
+
+        :param edits: A list of edit dictionaries.
+        :return: A list with one result dictionary per edit, in the order of the edits.
+        """
+        results = [None] * len(edits)
+        by_collection = defaultdict(list)
+
+        for index, edit in enumerate(edits):
+            error = self._edit_error(edit)
+            if error is not None:
+                results[index] = {"index": index, "error": error, "status_code": 400}
+                continue
+            by_collection[edit["collectionName"]].append(index)
+
+        for collection_name, indexes in by_collection.items():
+            try:
+                with self._lock:
+                    collection = self._collection(collection_name)
+                    positions = {}
+                    for index in indexes:
+                        edit = edits[index]
+                        position = self._locate(collection, edit.get("courseTitle"), edit.get("courseId")) if collection is not None else None
+                        if position is None:
+                            results[index] = {"index": index, "error": "Course not found", "status_code": 404}
+                        else:
+                            positions[index] = position
+
+                    if positions:
+                        checkpoint = self._checkpoint(collection, [position[0] for position in positions.values()])
+                        for index, position in positions.items():
+                            edit = edits[index]
+                            changed = self._apply_edits(collection, [(position, edit["field"], edit.get("value"))])
+                            results[index] = {"index": index, "status": "success" if changed else "not modified"}
+                        if any(results[index]["status"] == "success" for index in positions):
+                            self._persist_or_rollback(collection, checkpoint)
+                logger.info("Applied %s edits to %s", len(indexes), collection_name)
+            except Exception as e:
+                logger.error("Failed to apply edits to %s: %s", collection_name, e)
+                for index in indexes:
+                    results[index] = {"index": index, "error": str(e), "status_code": 500}
+
+        return results
+
+    @instrumented("backfill_course_ids")
+    def backfill_course_ids(self, collection_name):
+        """
+        Write the course ids derived when the file was read back into the file.
+
+        :param collection_name: The name of the collection to backfill.
+        :return: A tuple containing a status message and HTTP status code.
+        """
+        try:
+            with self._lock:
+                collection = self._collection(collection_name)
+                if collection is None:
+                    return {"error": "Collection not found"}, 404
+                with open(collection.path, 'r') as file:
+                    stored = json.load(file)
+                stored = [stored] if isinstance(stored, dict) else stored
+                assigned = sum(1 for document in stored for _, _, _, course in iter_courses(document) if not course.get("courseId"))
+                if assigned:
+                    # The derived ids become stored ones
+                    generated_ids, collection.generated_ids = collection.generated_ids, set()
+                    try:
+                        self._persist(collection)
+                    except Exception:
+                        collection.generated_ids = generated_ids
+                        raise
+                indexed = len(collection.courses)
+            logger.info("Assigned %s course ids and indexed %s courses in %s", assigned, indexed, collection_name)
+            return {"status": "Course ids backfilled", "assigned": assigned, "indexed": indexed}, 200
+        except (ValueError, OSError) as e:
+            logger.error("Failed to backfill course ids: %s", e)
+            return {"error": str(e)}, 500
+
+    @instrumented("get_summary")
+    def get_summary(self, collection_name):
+        """
+        Compute the degree summaries of the roadmaps in a collection.
+
+        :param collection_name: The name of the roadmap collection.
+        :return: A tuple containing the summaries and HTTP status code.
+        """
+        collection = self._collection(collection_name)
+        summaries = []
+        if collection is not None:
+            with self._lock:
+                for document in collection.documents:
+                    if "years" in document:
+                        summaries.append(dict(compute_summary(document), _id=document["_id"], collection=collection_name))
+        if not summaries:
+            return {"error": "No roadmap found"}, 404
+        return jsonify(summaries), 200
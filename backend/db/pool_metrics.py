@@ -0,0 +1,60 @@
+# backend/db/pool_metrics.py
+#
+# Connection pool gauges for the pymongo client. Kept apart from metrics.py so pymongo is only imported
+# with the database handle, not when the app starts.
+
+from pymongo import monitoring
+import metrics
+
+
+def pool_listeners():
+    """
+    :return: The pymongo event listeners recording connection pool statistics (none without prometheus_client).
+    """
+    if metrics.prometheus_client is None:
+        return []
+    return [PoolMetricsListener()]
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Keep gauges of the open and checked out connections of every pymongo connection pool.
+    """
+
+    @staticmethod
+    def _address(event):
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        metrics.MONGO_POOL_CONNECTIONS.labels(self._address(event)).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        metrics.MONGO_POOL_CONNECTIONS.labels(self._address(event)).dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        metrics.MONGO_POOL_CHECKOUT_FAILURES.labels(self._address(event), str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        metrics.MONGO_POOL_CHECKED_OUT.labels(self._address(event)).inc()
+
+    def connection_checked_in(self, event):
+        metrics.MONGO_POOL_CHECKED_OUT.labels(self._address(event)).dec()
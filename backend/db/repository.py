@@ -0,0 +1,108 @@
+# backend/db/repository.py
+
+from abc import ABC, abstractmethod
+
+
+class CatalogRepository(ABC):
+    """
+    Storage operations the API relies on. CosmosDB implements them on Cosmos DB (MongoDB API);
+    LocalStore implements them in memory on top of the data/*.json files.
+
+    Methods that back HTTP routes return what the route sends back: a Flask response or a
+    (body, status_code) tuple, exactly as CosmosDB always has.
+    """
+
+    @abstractmethod
+    def create_collection(self, collection_name):
+        """Create a collection if it does not already exist."""
+
+    @abstractmethod
+    def collection_exists(self, collection_name):
+        """Tell whether a collection exists."""
+
+    @abstractmethod
+    def list_collections(self):
+        """List all collections."""
+
+    @abstractmethod
+    def add_single_data(self, collection_name, document):
+        """Insert a single document."""
+
+    @abstractmethod
+    def add_data(self, collection_name, data):
+        """Insert a document or a list of documents."""
+
+    @abstractmethod
+    def add_data_from_json(self, collection_name, json_file_path):
+        """Insert the documents of a JSON file."""
+
+    @abstractmethod
+    def find_document(self, collection_name, query):
+        """Find a single document matching a query, or None."""
+
+    @abstractmethod
+    def get_data(self, collection_name, fields=None, after=None, limit=None, stream=False):
+        """Retrieve the documents of a collection, optionally projected, paginated or streamed."""
+
+    @abstractmethod
+    def get_documents(self, collection_name):
+        """Get the documents of a collection as read-only Python objects."""
+
+    @abstractmethod
+    def get_revision(self, collection_name):
+        """Get the revision token ('revision' and 'updated_at') of a collection."""
+
+    def get_revisions(self, collection_names):
+        """Get the revision tokens of several collections, as a dictionary keyed by collection name."""
+        return {collection_name: self.get_revision(collection_name) for collection_name in collection_names}
+
+    @abstractmethod
+    def get_changes(self, since=None, timeout=0):
+        """Get the collections written after a change sequence number, waiting up to timeout seconds for one."""
+
+    @abstractmethod
+    def update_course(self, collection_name, course_title, field, value, course_id=None):
+        """Update one field of one course entry."""
+
+    @abstractmethod
+    def update_courses(self, edits):
+        """Apply a batch of course edits and return one result per edit."""
+
+    @abstractmethod
+    def backfill_course_ids(self, collection_name):
+        """Give stable ids to courses that do not have one."""
+
+    @abstractmethod
+    def get_summary(self, collection_name):
+        """Retrieve the degree summaries of the roadmaps in a collection."""
+
+    @abstractmethod
+    def ping(self):
+        """Tell whether the storage can serve requests."""
+
+    @staticmethod
+    def _is_updatable_field(field):
+        """
+        Only plain course fields may be set; dotted paths and operators could reach outside the course entry.
+        """
+        return isinstance(field, str) and bool(field) and field != "courseId" and "." not in field and not field.startswith("$")
+
+    @classmethod
+    def _edit_error(cls, edit):
+        """
+        Check one edit of an update_courses batch, so a malformed edit fails on its own instead of the whole batch.
+
+        :return: The error message, or None if the edit can be applied.
+        """
+        if not isinstance(edit, dict):
+            return "Edit must be an object"
+        collection_name = edit.get("collectionName")
+        course_id = edit.get("courseId")
+        course_title = edit.get("courseTitle")
+        if not isinstance(collection_name, str) or not collection_name or not (course_id or course_title):
+            return "collectionName and courseId or courseTitle are required"
+        if not isinstance(course_id or "", str) or not isinstance(course_title or "", str):
+            return "courseId and courseTitle must be strings"
+        if not cls._is_updatable_field(edit.get("field")):
+            return f"Field {edit.get('field')!r} cannot be updated"
+        return None
@@ -0,0 +1,268 @@
+# backend/db/revision_store.py
+
+import os
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import ReturnDocument, errors as pymongo_errors
+
+logger = logging.getLogger(__name__)
+
+# Collection holding one {_id: <collection name>, revision, updated_at} document per catalog collection
+REVISIONS_COLLECTION = "catalog_revisions"
+
+# Append-only log of revision bumps, {_id: <sequence number>, collection, revision, updated_at}, plus the
+# {_id: "sequence", value} counter the sequence numbers are taken from (a string _id never matches $gt on numbers)
+CHANGES_COLLECTION = "catalog_changes"
+SEQUENCE_ID = "sequence"
+
+# How long a reader waits for a sequence number that was taken but not written yet before skipping it
+GAP_WAIT_SECONDS = 1
+
+
+class RevisionStore:
+    def __init__(self, database, memo_ttl_seconds=None, poll_seconds=None, change_streams=None):
+        """
+        Track a monotonically increasing revision per collection in the database itself,
+        so every gunicorn worker sees the same token after a write. Every bump is also appended to a
+        change log that consumers can follow (and long poll) with a sequence number.
+
+        :param database: The pymongo database holding the revisions collection.
+        :param memo_ttl_seconds: How long a revision read is reused in-process before asking the database again.
+        :param poll_seconds: How often waiting readers check the change log; 'change_feed_poll_seconds' by default (1).
+        :param change_streams: Whether to watch the change log with a Mongo change stream, waking waiting readers
+                               and refreshing the memo as soon as another worker writes; 'change_streams' by default
+                               (false). Falls back to polling if the server does not support them.
+        """
+        self.collection = database[REVISIONS_COLLECTION]
+        self.changes_collection = database[CHANGES_COLLECTION]
+        if memo_ttl_seconds is None:
+            memo_ttl_seconds = float(os.getenv('revision_memo_ttl_seconds', 2))
+        if poll_seconds is None:
+            poll_seconds = float(os.getenv('change_feed_poll_seconds', 1))
+        if change_streams is None:
+            change_streams = os.getenv('change_streams', 'false').lower() == 'true'
+        self.memo_ttl_seconds = memo_ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.change_streams = change_streams
+        self._memo = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._latest = (0, 0)  # (latest sequence number, monotonic time it was read)
+        self._gaps = {}  # sequence number of the entry following a gap -> monotonic time the gap was first seen
+        self._skipped = set()  # entries following a gap that outlasted GAP_WAIT_SECONDS
+        self._watcher = None
+
+    @staticmethod
+    def _as_utc(updated_at):
+        """
+        pymongo returns naive datetimes by default; they are stored as UTC.
+        """
+        if updated_at is not None and updated_at.tzinfo is None:
+            return updated_at.replace(tzinfo=timezone.utc)
+        return updated_at
+
+    def _remember(self, collection_name, revision, updated_at):
+        entry = {"revision": revision, "updated_at": updated_at}
+        with self._lock:
+            self._memo[collection_name] = (entry, time.monotonic() + self.memo_ttl_seconds)
+        return entry
+
+    def get(self, collection_name):
+        """
+        Get the current revision of a collection.
+
+        :param collection_name: The name of the collection.
+        :return: A dictionary with 'revision' (0 if never written) and 'updated_at' (datetime or None).
+        """
+        with self._lock:
+            memo = self._memo.get(collection_name)
+        if memo is not None and memo[1] > time.monotonic():
+            return memo[0]
+
+        try:
+            document = self.collection.find_one({"_id": collection_name})
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to read revision for %s: %s", collection_name, e)
+            raise
+
+        if not document:
+            return self._remember(collection_name, 0, None)
+        return self._remember(collection_name, document["revision"], self._as_utc(document.get("updated_at")))
+
+    def get_many(self, collection_names):
+        """
+        Get the current revisions of several collections, reading the ones not memoized with a single query.
+
+        :param collection_names: The names of the collections.
+        :return: A dictionary of collection name -> {'revision', 'updated_at'}.
+        """
+        now = time.monotonic()
+        revisions = {}
+        with self._lock:
+            for collection_name in collection_names:
+                memo = self._memo.get(collection_name)
+                if memo is not None and memo[1] > now:
+                    revisions[collection_name] = memo[0]
+
+        missing = [collection_name for collection_name in collection_names if collection_name not in revisions]
+        if missing:
+            try:
+                documents = {document["_id"]: document for document in self.collection.find({"_id": {"$in": missing}})}
+            except pymongo_errors.PyMongoError as e:
+                logger.error("Failed to read revisions: %s", e)
+                raise
+            for collection_name in missing:
+                document = documents.get(collection_name)
+                if document is None:
+                    revisions[collection_name] = self._remember(collection_name, 0, None)
+                else:
+                    revisions[collection_name] = self._remember(
+                        collection_name, document["revision"], self._as_utc(document.get("updated_at")))
+        return revisions
+
+    def bump(self, collection_name):
+        """
+        Atomically increment the revision of a collection after a write, and append the new revision to the change log.
+
+        :param collection_name: The name of the collection that was written.
+        :return: A dictionary with the new 'revision' and 'updated_at'.
+        """
+        # Mongo stores datetimes with millisecond precision, HTTP dates with second precision
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        document = self.collection.find_one_and_update(
+            {"_id": collection_name},
+            {"$inc": {"revision": 1}, "$set": {"updated_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        logger.debug("Revision of %s bumped to %s", collection_name, document['revision'])
+        revision = self._remember(collection_name, document["revision"], now)
+
+        counter = self.changes_collection.find_one_and_update(
+            {"_id": SEQUENCE_ID}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER)
+        self.changes_collection.insert_one(
+            {"_id": counter["value"], "collection": collection_name, "revision": document["revision"], "updated_at": now})
+        with self._changed:
+            self._latest = (max(counter["value"], self._latest[0]), time.monotonic())
+            self._changed.notify_all()
+        return revision
+
+    def latest_sequence(self):
+        """
+        Get the sequence number of the last change, read at most every poll_seconds however many readers wait.
+
+        :return: The sequence number, 0 if nothing was written since the change log exists.
+        """
+        with self._lock:
+            latest, read_at = self._latest
+        if read_at + self.poll_seconds > time.monotonic():
+            return latest
+
+        document = self.changes_collection.find_one({"_id": SEQUENCE_ID})
+        latest = document["value"] if document else 0
+        with self._lock:
+            self._latest = (max(latest, self._latest[0]), time.monotonic())
+            return self._latest[0]
+
+    def changes(self, since, limit=1000):
+        """
+        Read the change log after a sequence number. Only the latest change of each collection is returned.
+        A sequence number taken by a writer that has not written its change yet stops the read there, so no
+        change is ever skipped, unless it is still missing after GAP_WAIT_SECONDS (the writer failed). A gap
+        settles as a whole, however many sequence numbers it spans.
+
+        :param since: The sequence number returned by the previous call (0 for the whole log); negative values count as 0.
+        :param limit: Maximum number of log entries read.
+        :return: A tuple of (list of {'collection', 'revision', 'updated_at', 'sequence'}, next sequence number).
+        """
+        since = max(since, 0)
+        try:
+            entries = list(self.changes_collection.find({"_id": {"$gt": since}}).sort("_id", 1).limit(limit))
+        except pymongo_errors.PyMongoError as e:
+            logger.error("Failed to read the change log: %s", e)
+            raise
+
+        latest = {}
+        sequence = since
+        for entry in entries:
+            if entry["_id"] > sequence + 1 and not self._gap_settled(sequence + 1, entry["_id"]):
+                break
+            sequence = entry["_id"]
+            latest[entry["collection"]] = {
+                "collection": entry["collection"],
+                "revision": entry["revision"],
+                "updated_at": self._as_utc(entry.get("updated_at")),
+                "sequence": sequence
+            }
+        return sorted(latest.values(), key=lambda change: change["sequence"]), sequence
+
+    def _gap_settled(self, first_missing, following):
+        """
+        Tell whether the sequence numbers from first_missing up to the entry 'following' can be skipped. They were
+        taken before 'following' was, so once that entry has been visible for GAP_WAIT_SECONDS their writers failed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            first_seen = self._gaps.setdefault(following, now)
+            if now - first_seen < GAP_WAIT_SECONDS:
+                return False
+            if following in self._skipped:
+                return True
+            self._skipped.add(following)
+        logger.warning("Changes %s to %s were never written to the change log; skipping them", first_missing, following - 1)
+        return True
+
+    def wait_for_changes(self, since, timeout):
+        """
+        Long poll the change log: return as soon as there are changes after 'since', or after timeout seconds.
+
+        :param since: The sequence number returned by the previous call.
+        :param timeout: Maximum number of seconds to wait.
+        :return: A tuple of (changes, next sequence number), like changes().
+        """
+        if self.change_streams:
+            self._start_watcher()
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.latest_sequence() > since:
+                changes, sequence = self.changes(since)
+                if changes or sequence > since:
+                    return changes, sequence
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return [], since
+            with self._changed:
+                self._changed.wait(min(self.poll_seconds, remaining))
+
+    def _start_watcher(self):
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, name="revision-change-stream", daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        """
+        Follow inserts into the change log with a change stream: memoize the new revision and wake waiting readers.
+        """
+        # Cosmos DB only accepts this form of pipeline: a match on the operation types and a projection
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert"]}}},
+            {"$project": {"_id": 1, "fullDocument": 1, "ns": 1, "documentKey": 1}}
+        ]
+        try:
+            with self.changes_collection.watch(pipeline, full_document="updateLookup") as stream:
+                for event in stream:
+                    entry = event["fullDocument"]
+                    if entry["_id"] == SEQUENCE_ID:
+                        continue
+                    self._remember(entry["collection"], entry["revision"], self._as_utc(entry.get("updated_at")))
+                    with self._changed:
+                        self._latest = (max(entry["_id"], self._latest[0]), time.monotonic())
+                        self._changed.notify_all()
+        except Exception as e:  # Not supported by the server (or the account), or the stream broke
+            logger.warning("Change stream on %s unavailable, polling every %s s instead: %s",
+                           CHANGES_COLLECTION, self.poll_seconds, e)
+            self.change_streams = False
@@ -0,0 +1,24 @@
+# backend/gunicorn.conf.py
+#
+# Loaded automatically by gunicorn from the working directory. When PROMETHEUS_MULTIPROC_DIR is set, every worker
+# writes its metrics to that directory and /metrics aggregates them; the directory is emptied when the server
+# starts and the files of exited workers are marked dead so their gauges stop counting.
+
+import os
+import shutil
+
+
+def on_starting(server):
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        try:
+            from prometheus_client import multiprocess
+        except ImportError:
+            return
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,175 @@
+# backend/metrics.py
+
+import os
+import time
+import logging
+import functools
+from flask import Response, g, request
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # prometheus_client is optional; without it metrics are not recorded and /metrics answers 501
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a cache hit to a throttled Cosmos call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Response sizes in bytes, from a 304 to a full catalog
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+if prometheus_client is not None and os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    # gunicorn.conf.py empties the directory when the server starts; other entry points (python app.py, uvicorn,
+    # the db/ scripts) run with the same environment and only need it to exist before the first sample is written
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+if prometheus_client is not None:
+    DB_OPERATION_SECONDS = Histogram(
+        "edupathfinder_db_operation_seconds", "Latency of database operations",
+        ["operation", "collection"], buckets=LATENCY_BUCKETS)
+    DB_OPERATION_ERRORS = Counter(
+        "edupathfinder_db_operation_errors_total", "Database operations that raised or returned an error status",
+        ["operation", "collection"])
+    DB_DOCUMENTS = Counter(
+        "edupathfinder_db_documents_total", "Documents read or written by database operations",
+        ["operation", "collection"])
+    DB_RESPONSE_BYTES = Histogram(
+        "edupathfinder_db_response_bytes", "Size of the response bodies built by database operations",
+        ["operation", "collection"], buckets=SIZE_BUCKETS)
+    HTTP_REQUEST_SECONDS = Histogram(
+        "edupathfinder_http_request_seconds", "Latency of HTTP requests per route",
+        ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+    HTTP_RESPONSE_BYTES = Histogram(
+        "edupathfinder_http_response_bytes", "Size of HTTP response bodies per route",
+        ["method", "route"], buckets=SIZE_BUCKETS)
+    # 'livesum' adds up the values of the live gunicorn workers
+    MONGO_POOL_CONNECTIONS = Gauge(
+        "edupathfinder_mongo_pool_connections", "Open connections of the Mongo connection pools",
+        ["address"], multiprocess_mode="livesum")
+    MONGO_POOL_CHECKED_OUT = Gauge(
+        "edupathfinder_mongo_pool_checked_out", "Connections currently checked out of the Mongo connection pools",
+        ["address"], multiprocess_mode="livesum")
+    MONGO_POOL_CHECKOUT_FAILURES = Counter(
+        "edupathfinder_mongo_pool_checkout_failures_total", "Failed connection checkouts, e.g. pool wait timeouts",
+        ["address", "reason"])
+
+
+# Collections recorded under their own label; any other name (they come from URLs and request bodies)
+# is recorded as 'other', so the number of label values stays bounded
+_known_collections = set()
+
+
+def register_collections(collection_names):
+    """
+    Declare the collections whose metrics are labelled with their name, e.g. the catalog collections.
+
+    :param collection_names: The collection names.
+    """
+    _known_collections.update(collection_names)
+
+
+def collection_label(collection_name):
+    if not collection_name or collection_name in _known_collections:
+        return collection_name
+    return "other"
+
+
+def _response_bytes(result):
+    """
+    :return: The body size of a Flask response returned alone or in a (response, status_code) tuple, if known.
+    """
+    response = result[0] if isinstance(result, tuple) and result else result
+    if isinstance(response, Response):
+        return response.content_length
+    return None
+
+
+def _is_error(result):
+    """
+    CosmosDB methods report most failures as (body, status_code) tuples rather than exceptions.
+    """
+    return isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], int) and result[1] >= 400
+
+
+def instrumented(operation):
+    """
+    Decorate a storage method taking the collection name as first argument (if any) so its latency,
+    errors and response size are recorded per operation and collection.
+
+    :param operation: The operation label, e.g. 'get_data'.
+    """
+    def decorator(method):
+        if prometheus_client is None:
+            return method
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            collection_name = collection_label(
+                args[0] if args and isinstance(args[0], str) else kwargs.get("collection_name", ""))
+            started = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception:
+                DB_OPERATION_ERRORS.labels(operation, collection_name).inc()
+                raise
+            finally:
+                DB_OPERATION_SECONDS.labels(operation, collection_name).observe(time.perf_counter() - started)
+            if _is_error(result):
+                DB_OPERATION_ERRORS.labels(operation, collection_name).inc()
+            else:
+                size = _response_bytes(result)
+                if size is not None:
+                    DB_RESPONSE_BYTES.labels(operation, collection_name).observe(size)
+            return result
+        return wrapper
+    return decorator
+
+
+def record_documents(operation, collection_name, count):
+    """
+    Count documents read or written by an operation.
+    """
+    if prometheus_client is not None and count:
+        DB_DOCUMENTS.labels(operation, collection_label(collection_name)).inc(count)
+
+
+def init_request_metrics(app):
+    """
+    Record the latency and response size of every request per route, and serve them with all other metrics on /metrics.
+    With several gunicorn workers, set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py) so /metrics aggregates
+    the samples of every worker instead of only the one answering.
+
+    :param app: The Flask application.
+    """
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        if prometheus_client is None:
+            return Response("prometheus_client is not installed\n", status=501, mimetype="text/plain")
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+    if prometheus_client is None:
+        logger.warning("prometheus_client is not installed; metrics are disabled")
+        return
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("request_started", None)
+        if started is None:
+            return response
+        # The URL rule, not the path, keeps the label set small (one /api/<program_slug> for every program)
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - started)
+        if response.content_length is not None:
+            HTTP_RESPONSE_BYTES.labels(request.method, route).observe(response.content_length)
+        return response
@@ -0,0 +1,295 @@
+# backend/profiling.py
+
+import os
+import hmac
+import time
+import random
+import itertools
+import logging
+import cProfile
+import tempfile
+import threading
+import tracemalloc
+from flask import g, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+# Handlers whose requests may be profiled: the program roadmaps, colleges-degrees and single course edits
+PROFILED_ENDPOINTS = {'program_courses', 'collegedegrees', 'update_course'}
+
+# Header carrying the token that turns profiling on for one request and unlocks the /api/debug routes
+PROFILE_TOKEN_HEADER = 'X-Profile-Token'
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'edupathfinder-profiles')
+
+
+class RequestProfiler:
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, max_bytes=50 * 1024 * 1024, sample_rate=0.0, token=None):
+        """
+        Capture cProfile profiles of single requests to the PROFILED_ENDPOINTS, either when the request carries
+        the profiling token or for a random sample of requests. Each profile is written as a pstats file
+        (open it with `python -m pstats` or snakeviz); the oldest files are deleted once the directory
+        exceeds max_bytes.
+
+        cProfile cannot profile two threads at once, so a request arriving while another one is profiled
+        in the same process is served without a profile.
+
+        :param directory: Directory receiving the .prof files.
+        :param max_bytes: Maximum total size of the profiles kept in the directory.
+        :param sample_rate: Fraction of requests profiled without a token, between 0 (the default) and 1.
+        :param token: Secret expected in the X-Profile-Token header; without one, only sampling applies.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.token = token
+        self._active = threading.Lock()
+        self._sequence = itertools.count(1)  # Keeps the names of profiles taken in the same second apart
+
+    @staticmethod
+    def from_environment():
+        """
+        Factory method configured by 'profile_dir', 'profile_max_bytes', 'profile_sample_rate' and 'profile_token'.
+
+        :return: Instance of RequestProfiler.
+        """
+        return RequestProfiler(
+            directory=os.getenv('profile_dir', DEFAULT_PROFILE_DIR),
+            max_bytes=int(os.getenv('profile_max_bytes', 50 * 1024 * 1024)),
+            sample_rate=float(os.getenv('profile_sample_rate', 0)),
+            token=os.getenv('profile_token') or None
+        )
+
+    @property
+    def enabled(self):
+        return self.token is not None or self.sample_rate > 0
+
+    def authorized(self):
+        """
+        :return: Whether the current request carries the profiling token.
+        """
+        supplied = request.headers.get(PROFILE_TOKEN_HEADER)
+        return self.token is not None and supplied is not None and hmac.compare_digest(supplied, self.token)
+
+    def start(self):
+        """
+        Start profiling the current request if it is chosen by token or by sampling.
+        """
+        if request.endpoint not in PROFILED_ENDPOINTS:
+            return
+        if not self.authorized() and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return
+        if not self._active.acquire(blocking=False):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # Another profiler (e.g. a debugger) is already active
+            self._active.release()
+            logger.warning("Request profiling skipped: %s", e)
+            return
+        g.profile = (profile, time.perf_counter())
+
+    def stop(self, response):
+        """
+        Stop the profile of the current request, if any, and write it to the profile directory.
+        """
+        started = g.pop('profile', None)
+        if started is None:
+            return response
+        profile, started_at = started
+        try:
+            profile.disable()
+        finally:
+            self._active.release()
+
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        file_name = (f"{time.strftime('%Y%m%dT%H%M%S')}-{request.endpoint}-{response.status_code}"
+                     f"-{elapsed_ms:.0f}ms-{os.getpid()}-{next(self._sequence)}.prof")
+        try:
+            # Created with the first profile, so a disabled profiler never touches the file system
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, file_name))
+            self._enforce_size_limit()
+        except OSError as e:
+            logger.error("Failed to write request profile %s: %s", file_name, e)
+            return response
+        logger.info("Profiled %s %s in %.1f ms: %s", request.method, request.path, elapsed_ms, file_name)
+        response.headers['X-Profile'] = file_name
+        return response
+
+    def discard(self, exception=None):
+        """
+        Release the profiler if the request ended without reaching stop (e.g. an error in another hook).
+        """
+        started = g.pop('profile', None)
+        if started is not None:
+            started[0].disable()
+            self._active.release()
+
+    def _enforce_size_limit(self):
+        """
+        Delete the oldest profiles until the directory holds at most max_bytes of them.
+        """
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.prof') and entry.is_file():
+                stat = entry.stat()
+                profiles.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in profiles)
+        for _, size, path in sorted(profiles):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Removed by another worker
+            total -= size
+
+    def list_profiles(self):
+        """
+        :return: The profiles kept in the directory, newest first.
+        """
+        if not os.path.isdir(self.directory):
+            return []  # No profile written yet
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.prof') and entry.is_file():
+                stat = entry.stat()
+                profiles.append({"file": entry.name, "bytes": stat.st_size, "modified": stat.st_mtime})
+        return sorted(profiles, key=lambda profile: profile["modified"], reverse=True)
+
+
+class MemorySnapshots:
+    # Allocations of tracemalloc itself and of the import machinery are noise in a worker's growth
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self, frames=10):
+        """
+        tracemalloc snapshots of this process, each compared with the first one taken (the baseline)
+        and with the one before it, to find where a worker's memory grows.
+        Tracing starts with the first snapshot and slows allocations down until stop() is called.
+
+        :param frames: Number of stack frames stored per allocation ('tracemalloc_frames' from the environment).
+        """
+        self.frames = frames
+        self.baseline = None
+        self.previous = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _statistics(stats, limit):
+        return [{
+            "location": str(stat.traceback[0]) if stat.traceback else None,
+            "traceback": stat.traceback.format() if len(stat.traceback) > 1 else None,
+            "size": stat.size,
+            "count": stat.count,
+            "sizeDiff": getattr(stat, "size_diff", None),
+            "countDiff": getattr(stat, "count_diff", None)
+        } for stat in stats[:limit]]
+
+    def take(self, key_type="lineno", limit=20):
+        """
+        Take a snapshot and report the largest allocation sites and the largest growth.
+
+        :param key_type: How allocations are grouped: 'lineno', 'filename' or 'traceback'.
+        :param limit: Number of entries in each list.
+        :return: A dictionary of statistics.
+        """
+        with self._lock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(self.frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+            current, peak = tracemalloc.get_traced_memory()
+            result = {
+                "pid": os.getpid(),
+                "tracingStarted": started,
+                "tracedBytes": current,
+                "peakTracedBytes": peak,
+                "tracemallocOverheadBytes": tracemalloc.get_tracemalloc_memory(),
+                "top": self._statistics(snapshot.statistics(key_type), limit),
+                "sincePrevious": None,
+                "sinceBaseline": None
+            }
+            if self.previous is not None:
+                result["sincePrevious"] = self._statistics(snapshot.compare_to(self.previous, key_type), limit)
+            if self.baseline is not None:
+                result["sinceBaseline"] = self._statistics(snapshot.compare_to(self.baseline, key_type), limit)
+            else:
+                self.baseline = snapshot
+            self.previous = snapshot
+            return result
+
+    def stop(self):
+        """
+        Stop tracing and drop the snapshots.
+        """
+        with self._lock:
+            self.baseline = None
+            self.previous = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+def init_profiling(app):
+    """
+    Register the request profiling hooks and the /api/debug routes: listing the profiles written, and taking
+    tracemalloc snapshots of the worker answering. The debug routes require the X-Profile-Token header and
+    do not exist (404) unless 'profile_token' is set. Each gunicorn worker keeps its own snapshots; the
+    reported pid tells them apart.
+
+    :param app: The Flask application.
+    """
+    profiler = RequestProfiler.from_environment()
+    snapshots = MemorySnapshots(frames=int(os.getenv('tracemalloc_frames', 10)))
+
+    if profiler.enabled:
+        app.before_request(profiler.start)
+        app.after_request(profiler.stop)
+        app.teardown_request(profiler.discard)
+        logger.info("Request profiling enabled (sample rate %s), writing to %s", profiler.sample_rate, profiler.directory)
+
+    def forbidden():
+        if profiler.token is None:
+            return jsonify({"error": "Not Found"}), 404
+        if not profiler.authorized():
+            return jsonify({"error": f"Missing or invalid {PROFILE_TOKEN_HEADER} header"}), 403
+        return None
+
+    @app.route('/api/debug/profiles', methods=['GET'])
+    def list_profiles():
+        error = forbidden()
+        if error is not None:
+            return error
+        return jsonify({"directory": profiler.directory, "profiles": profiler.list_profiles()}), 200
+
+    # Each call takes a new snapshot; the first one starts tracing and becomes the baseline
+    @app.route('/api/debug/memory/snapshot', methods=['POST'])
+    def memory_snapshot():
+        error = forbidden()
+        if error is not None:
+            return error
+        key_type = request.args.get('group', 'lineno')
+        if key_type not in ('lineno', 'filename', 'traceback'):
+            return jsonify({"error": "group must be one of lineno, filename, traceback"}), 400
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        return jsonify(snapshots.take(key_type, limit)), 200
+
+    @app.route('/api/debug/memory', methods=['DELETE'])
+    def memory_stop():
+        error = forbidden()
+        if error is not None:
+            return error
+        snapshots.stop()
+        return jsonify({"message": "Memory tracing stopped", "pid": os.getpid()}), 200
+
+    return profiler
@@ -1,44 +1,24 @@
 # backend/resources/course_resource.py
 
+from flask import request
 from flask_restful import Resource
-from flasgger import swag_from
-from services.course_service import CourseService
+from services.read_options import parse_read_options
 
 class CourseResource(Resource):
-    def __init__(self, cosmos_db, level, course_type):
-        self.service = CourseService(cosmos_db, level, course_type)
+    def __init__(self, registry):
+        # Flask-RESTful builds a resource per request; the services themselves live in the registry
+        self.registry = registry
 
-    @swag_from({
-        'responses': {
-            200: {
-                'description': 'A list of courses',
-                'content': {
-                    'application/json': {
-                        'schema': {
-                            'type': 'array',
-                            'items': {
-                                'type': 'object',
-                                'properties': {
-                                    'important': {'type': 'string'},
-                                    'hours': {'type': 'integer'},
-                                    'course_number': {'type': 'string'},
-                                    'title': {'type': 'string'},
-                                    'min_grade': {'type': 'string'},
-                                    'gec': {'type': 'string'},
-                                    'prerequisite': {'type': 'string'},
-                                    'additional_notes': {'type': 'string'},
-                                    'department': {'type': 'string'},
-                                    'program': {'type': 'string'}
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-    })
-    def get(self):
+    def get(self, program_slug):
         """
-        Get all courses
+        Get all courses of a program
+        The API documentation for this endpoint lives in swagger_config.py.
         """
-        return self.service.get_all_courses()
+        service = self.registry.get(program_slug)
+        if service is None:
+            return {'error': f"Unknown program: {program_slug}"}, 404
+        try:
+            options = parse_read_options(request.args, course_collection=True)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return service.get_all_courses(**options)
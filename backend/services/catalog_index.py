@@ -0,0 +1,133 @@
+# backend/services/catalog_index.py
+
+import os
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogIndex(ABC):
+    # Used in log messages
+    description = "catalog index"
+
+    def __init__(self, cosmos_db, programs, refresh_seconds=None):
+        """
+        Base of the in-memory indexes derived from the program roadmaps (search, prerequisites, overlap).
+        An index is built from every program collection on first use and then maintained one collection at a
+        time: collections written by this worker are reindexed on the next query, writes made by other workers
+        are picked up by comparing revisions at most every refresh_seconds.
+
+        Subclasses implement _add_collection and _remove_collection, which are called with the lock held.
+
+        :param cosmos_db: Instance of the CosmosDB class.
+        :param programs: The ProgramRegistry listing the program collections.
+        :param refresh_seconds: How often the collection revisions are compared; 'catalog_index_refresh_seconds'
+                                from the environment by default (30).
+        """
+        self.cosmos_db = cosmos_db
+        self.programs = programs
+        if refresh_seconds is None:
+            refresh_seconds = float(os.getenv('catalog_index_refresh_seconds', 30))
+        self.refresh_seconds = refresh_seconds
+
+        self._revisions = {}  # collection name -> revision indexed
+        self._stale = set()  # collections to reindex before the next query
+        self._built = False
+        self._next_refresh = 0
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def _add_collection(self, program, collection_name, documents):
+        """
+        Index the documents of a collection.
+
+        :return: The number of entries indexed.
+        """
+
+    @abstractmethod
+    def _remove_collection(self, collection_name):
+        """
+        Drop everything indexed for a collection.
+        """
+
+    def index_collection(self, program, collection_name, revision=None):
+        """
+        (Re)index one program collection.
+
+        :param program: The program slug.
+        :param collection_name: The name of the program collection.
+        :param revision: The revision being indexed, if already known.
+        :return: The number of entries indexed.
+        """
+        if revision is None:
+            revision = self.cosmos_db.get_revision(collection_name)["revision"]
+        documents = self.cosmos_db.get_documents(collection_name)
+
+        with self._lock:
+            self._remove_collection(collection_name)
+            indexed = self._add_collection(program, collection_name, documents)
+            self._revisions[collection_name] = revision
+            self._stale.discard(collection_name)
+        return indexed
+
+    def build(self):
+        """
+        Index every program collection. Collections that cannot be read are logged and retried on the next refresh.
+        """
+        started = time.perf_counter()
+        collections = self.programs.collections()
+        revisions = self.cosmos_db.get_revisions(list(collections.values()))
+        indexed = 0
+        for program, collection_name in collections.items():
+            try:
+                indexed += self.index_collection(program, collection_name, revisions[collection_name]["revision"])
+            except Exception as e:
+                logger.error("Failed to build %s for %s: %s", self.description, collection_name, e)
+        with self._lock:
+            self._built = True
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+        logger.info("Built %s: %s entries from %s programs in %.2fs",
+                    self.description, indexed, len(collections), time.perf_counter() - started)
+
+    def invalidate(self, collection_name):
+        """
+        Mark a collection for reindexing before the next query, e.g. after a write to it.
+        """
+        with self._lock:
+            self._stale.add(collection_name)
+
+    def course_updated(self, collection_name, course_id, field, value):
+        """
+        Called after update_course changed one field of one course. Indexes that can apply such an edit in place
+        override this; by default the collection is reindexed on the next query.
+        """
+        self.invalidate(collection_name)
+
+    def refresh(self):
+        """
+        Build the index on first use, then reindex the collections invalidated in this worker and,
+        at most every refresh_seconds, the ones whose revision changed in another worker.
+        """
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+            return
+
+        collections = self.programs.collections()
+        programs_by_collection = {collection_name: program for program, collection_name in collections.items()}
+        stale = set(self._stale)
+        if time.monotonic() >= self._next_refresh:
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+            revisions = self.cosmos_db.get_revisions(list(programs_by_collection))
+            stale.update(collection_name for collection_name, revision in revisions.items()
+                         if self._revisions.get(collection_name) != revision["revision"])
+
+        for collection_name in stale:
+            try:
+                self.index_collection(programs_by_collection.get(collection_name, collection_name), collection_name)
+            except Exception as e:
+                logger.error("Failed to refresh %s for %s: %s", self.description, collection_name, e)
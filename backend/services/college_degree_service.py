@@ -1,14 +1,18 @@
 # backend/services/college_degree_service.py
 
+from services.conditional_get import conditional_get
+
 class CollegeDegreeService:
-    def __init__(self, cosmos_db):
+    def __init__(self, cosmos_db, snapshot=None):
         self.cosmos_db = cosmos_db
+        self.snapshot = snapshot
 
     def get_all_degrees(self):
-        print("get_all_degrees method called.")  # Print statement to confirm the method is called
+        return conditional_get(self.cosmos_db, 'colleges_degrees', self._fetch, self.snapshot)
+
+    def _fetch(self):
         data, status_code = self.cosmos_db.get_data('colleges_degrees')
-        print("Data retrieved from the database:", data)  # Print the data retrieved to confirm DB interaction
-        
+
         if status_code == 200:
             return data  # Return just the Flask Response object
         
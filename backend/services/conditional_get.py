@@ -0,0 +1,70 @@
+# backend/services/conditional_get.py
+
+import logging
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+
+logger = logging.getLogger(__name__)
+
+
+def collection_etag(collection_name, revision):
+    """
+    Build the ETag of a collection from its revision token.
+
+    :param collection_name: The name of the collection.
+    :param revision: The revision dictionary returned by CosmosDB.get_revision.
+    :return: The ETag value (without quotes).
+    """
+    return f"{collection_name}-{revision['revision']}"
+
+
+def conditional_get(cosmos_db, collection_name, fetch, snapshot=None):
+    """
+    Answer a GET for a collection, replying 304 Not Modified when the client already holds
+    the current revision so the documents are never read or serialized.
+
+    :param cosmos_db: Instance of the CosmosDB class.
+    :param collection_name: The name of the collection being served.
+    :param fetch: Callable returning the full response, either a Response or a (body, status_code) tuple.
+    :param snapshot: Optional CatalogSnapshot; its body is served instead of fetch() while it holds the current
+                     revision, and as is while the database is not connected yet or unreachable.
+    :return: A Flask Response or a (body, status_code) tuple.
+    """
+    entry = snapshot.get(collection_name) if snapshot is not None else None
+    if entry is not None and not getattr(cosmos_db, "initialized", True):
+        # A worker that is still connecting serves the snapshot rather than wait for the database
+        revision = entry.revision_info()
+        fetch = entry.to_response
+    else:
+        try:
+            revision = cosmos_db.get_revision(collection_name)
+        except Exception as e:
+            if entry is None:
+                # Without a revision (database unreachable or still starting) the response simply goes out unversioned
+                logger.warning("Serving %s without an ETag: %s", collection_name, e)
+                return fetch()
+            logger.warning("Serving %s from the catalog snapshot: %s", collection_name, e)
+            revision = entry.revision_info()
+            fetch = entry.to_response
+        else:
+            if entry is not None and entry.revision == revision["revision"]:
+                fetch = entry.to_response
+            elif entry is not None:
+                snapshot.schedule_build()  # Written since the snapshot was built, maybe by another instance
+
+    etag = collection_etag(collection_name, revision)
+    last_modified = revision["updated_at"]
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        result = fetch()
+        response, status_code = result if isinstance(result, tuple) else (result, 200)
+        if status_code != 200 or not isinstance(response, Response):
+            return result
+
+    # Weak, because the same revision may be sent with different content encodings
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
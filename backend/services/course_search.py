@@ -0,0 +1,203 @@
+# backend/services/course_search.py
+
+import re
+import bisect
+from collections import defaultdict
+from db.course_index import iter_courses
+from services.catalog_index import CatalogIndex
+
+# Weight of a term found in each course field; a course number hit outranks a mention in the notes
+FIELD_WEIGHTS = {
+    "courseNumber": 4.0,
+    "title": 3.0,
+    "prerequisite": 1.0,
+    "notes": 1.0
+}
+
+# Terms matched through a longer indexed token ('stat' -> 'statistics') count for this share of an exact match
+PREFIX_WEIGHT = 0.5
+
+MAX_RESULTS = 100
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens, e.g. 'MATH 1324' -> ['math', '1324'].
+    """
+    if not isinstance(text, str):
+        text = "" if text is None else str(text)
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class CourseSearchIndex(CatalogIndex):
+    description = "course search index"
+
+    def __init__(self, cosmos_db, programs, refresh_seconds=None):
+        """
+        In-memory inverted index over the course number, title, notes and prerequisite of every course of every
+        program, so a search is a few dict lookups instead of a scan of every collection.
+
+        :param cosmos_db: Instance of the CosmosDB class.
+        :param programs: The ProgramRegistry listing the program collections.
+        :param refresh_seconds: See CatalogIndex.
+        """
+        super().__init__(cosmos_db, programs, refresh_seconds)
+        self._postings = defaultdict(dict)  # token -> {entry key: weight}
+        self._entries = {}  # entry key -> search result without score
+        self._entry_tokens = {}  # entry key -> tokens, to remove the entry again
+        self._entry_fields = {}  # entry key -> searched field values, to reweigh the entry after an edit
+        self._by_collection = defaultdict(set)  # collection name -> entry keys
+        self._by_course_id = {}  # (collection name, course id) -> entry key
+        self._vocabulary = None  # sorted tokens for prefix matching; None until the next search after a reindex
+
+    @staticmethod
+    def _weights(fields):
+        """
+        :param fields: The searched field values of a course.
+        :return: A dictionary of token -> weight of the best field it appears in.
+        """
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token in tokenize(fields.get(field)):
+                weights[token] = max(weights.get(token, 0), field_weight)
+        return weights
+
+    def _add_entry(self, key, entry, fields, weights):
+        self._entries[key] = entry
+        self._entry_tokens[key] = list(weights)
+        self._entry_fields[key] = fields
+        self._by_collection[entry["collection"]].add(key)
+        if entry["courseId"]:
+            self._by_course_id[(entry["collection"], entry["courseId"])] = key
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                if self._vocabulary is not None:
+                    bisect.insort(self._vocabulary, token)
+            postings[key] = weight
+
+    def _remove_entry(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry["courseId"]:
+            self._by_course_id.pop((entry["collection"], entry["courseId"]), None)
+        self._entry_fields.pop(key, None)
+        for token in self._entry_tokens.pop(key, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+                    if self._vocabulary is not None:
+                        del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _remove_collection(self, collection_name):
+        self._vocabulary = None
+        for key in self._by_collection.pop(collection_name, ()):
+            self._remove_entry(key)
+
+    def _add_collection(self, program, collection_name, documents):
+        self._vocabulary = None
+        indexed = 0
+        for d, document in enumerate(documents):
+            for y, s, c, course in iter_courses(document):
+                fields = {field: course.get(field) for field in FIELD_WEIGHTS if course.get(field) is not None}
+                weights = self._weights(fields)
+                if not weights:
+                    continue
+                year = document["years"][y]
+                semester = year["semesters"][s]
+                self._add_entry((collection_name, d, y, s, c), {
+                    "program": program,
+                    "collection": collection_name,
+                    "department": document.get("department"),
+                    "programName": document.get("program"),
+                    "year": year.get("year"),
+                    "semester": semester.get("semester"),
+                    "courseNumber": course.get("courseNumber"),
+                    "title": course.get("title"),
+                    "courseId": course.get("courseId")
+                }, fields, weights)
+                indexed += 1
+        return indexed
+
+    def course_updated(self, collection_name, course_id, field, value):
+        """
+        Reweigh one course entry after a searched field was edited, without rereading its collection.
+        """
+        if field not in FIELD_WEIGHTS:
+            return
+
+        with self._lock:
+            key = self._by_course_id.get((collection_name, course_id)) if course_id else None
+            if key is None:
+                # Not indexed by id (or it had nothing searchable yet): reindex the collection instead
+                self._stale.add(collection_name)
+                return
+            entry = dict(self._entries[key])
+            fields = dict(self._entry_fields[key], **{field: value})
+            if field in entry:
+                entry[field] = value
+            weights = self._weights(fields)
+            self._remove_entry(key)
+            if weights:
+                self._add_entry(key, entry, fields, weights)
+            else:
+                self._by_collection[collection_name].discard(key)
+            # The edit is applied; only writes from other workers should trigger a reindex of the collection
+            self._revisions[collection_name] = self.cosmos_db.get_revision(collection_name)["revision"]
+
+    def _expand(self, term):
+        """
+        Find the indexed tokens matching a query term: the term itself and the tokens it is a prefix of.
+
+        :return: A list of (token, weight factor) tuples.
+        """
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        matches = []
+        index = bisect.bisect_left(vocabulary, term)
+        while index < len(vocabulary) and vocabulary[index].startswith(term):
+            token = vocabulary[index]
+            matches.append((token, 1.0 if token == term else PREFIX_WEIGHT))
+            index += 1
+        return matches
+
+    def search(self, query, limit=20, program=None):
+        """
+        Find the courses matching every term of a query; each term also matches as a prefix of longer words.
+
+        :param query: The search text, e.g. 'MATH 1324' or 'statist'.
+        :param limit: The maximum number of results.
+        :param program: Optional program slug restricting the results.
+        :return: A list of results, best first, each pointing back to its program, year and semester.
+        """
+        self.refresh()
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token, factor in self._expand(term):
+                    for key, weight in self._postings[token].items():
+                        score = weight * factor
+                        if score > term_scores.get(key, 0):
+                            term_scores[key] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+                if not scores:
+                    return []
+
+            if program is not None:
+                scores = {key: score for key, score in scores.items() if self._entries[key]["program"] == program}
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            return [dict(self._entries[key], score=score) for key, score in ranked]
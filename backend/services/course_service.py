@@ -1,17 +1,27 @@
 # backend/services/course_service.py
 
+from services.conditional_get import conditional_get
+
 class CourseService:
-    def __init__(self, cosmos_db, level, course_type):
+    def __init__(self, cosmos_db, level, course_type, snapshot=None):
         self.cosmos_db = cosmos_db
+        self.snapshot = snapshot
         self.level = level
         self.course_type = course_type
+        self.collection_name = f"{level}_{course_type}_courses"
 
-    def get_all_courses(self):
+    def get_all_courses(self, **options):
         """
         Fetch all courses from the collection without filtering.
+        Projection, pagination and streaming options are passed through to CosmosDB.get_data.
         """
-        collection_name = f"{self.level}_{self.course_type}_courses"
-        data, status_code = self.cosmos_db.get_data(collection_name)
+        collection_name = self.collection_name
+        if options:
+            return self._fetch(collection_name, **options)
+        return conditional_get(self.cosmos_db, collection_name, lambda: self._fetch(collection_name), self.snapshot)
+
+    def _fetch(self, collection_name, **options):
+        data, status_code = self.cosmos_db.get_data(collection_name, **options)
         if status_code == 200:
             return data  # Return just the Flask Response object
         
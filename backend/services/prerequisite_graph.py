@@ -0,0 +1,324 @@
+# backend/services/prerequisite_graph.py
+
+import re
+from collections import Counter, defaultdict, deque
+from db.course_index import iter_courses
+from services.catalog_index import CatalogIndex
+
+# A subject and number such as 'ECON 2301', optionally followed by numbers sharing the subject ('CHEM 1309/1109')
+COURSE_CODE_PATTERN = re.compile(r"\b([A-Z]{3,4})\s*(\d{4})((?:\s*/\s*\d{4})*)")
+
+# Phrases allowing a prerequisite to be taken in the same semester
+CONCURRENT_PATTERN = re.compile(r"concurrent|credit/registration|credit for or enrollment|enrollment in", re.IGNORECASE)
+
+# Phrases making the listed courses alternatives rather than all required
+ALTERNATIVES_PATTERN = re.compile(r"\bor\b", re.IGNORECASE)
+
+
+def course_codes(text):
+    """
+    Extract the normalized course codes referenced in a course number or prerequisite text,
+    e.g. "Minimum grade of 'C' in CIVE 1101 and CHEM 1309/1109." -> ['CIVE 1101', 'CHEM 1309', 'CHEM 1109'].
+
+    :param text: Free text; anything that is not a string yields no codes.
+    :return: The codes in order of appearance, without duplicates.
+    """
+    if not isinstance(text, str):
+        return []
+    codes = []
+    for subject, number, more_numbers in COURSE_CODE_PATTERN.findall(text.upper()):
+        for course_number in [number] + re.findall(r"\d{4}", more_numbers):
+            code = f"{subject} {course_number}"
+            if code not in codes:
+                codes.append(code)
+    return codes
+
+
+def normalize_course_code(code):
+    """
+    Normalize a course code given by a client, e.g. 'econ-2301' or 'ECON2301' -> 'ECON 2301'.
+
+    :return: The normalized code, or None if the text is not a single course code.
+    """
+    codes = course_codes(str(code).replace("-", " ").replace("_", " "))
+    return codes[0] if len(codes) == 1 else None
+
+
+def find_cycles(nodes, edges):
+    """
+    Find the cycles among the given nodes (Tarjan's strongly connected components, iteratively).
+
+    :param nodes: The nodes to consider.
+    :param edges: Mapping of node -> iterable of the nodes it requires; nodes outside 'nodes' are ignored.
+    :return: A list of cycles, each a sorted list of course codes.
+    """
+    nodes = set(nodes)
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+    counter = 0
+
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        work = [(root, iter(sorted(edges.get(root, ()))))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in nodes:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(sorted(edges.get(successor, ())))))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in edges.get(node, ()):
+                    cycles.append(sorted(component))
+    return cycles
+
+
+class PrerequisiteGraph(CatalogIndex):
+    description = "prerequisite graph"
+
+    def __init__(self, cosmos_db, programs, refresh_seconds=None):
+        """
+        Graph of the course codes referenced by the 'prerequisite' text of every course of every roadmap,
+        keyed by normalized course number ('ECON 2301'). An edge goes from a course to each course its
+        prerequisite text mentions.
+
+        Each course entry contributes its edges separately and edges are reference counted, so editing the
+        prerequisite of one course through update_course only replaces that entry's contribution.
+        Transitive queries are memoized until the next change.
+
+        :param cosmos_db: Instance of the CosmosDB class.
+        :param programs: The ProgramRegistry listing the program collections.
+        :param refresh_seconds: See CatalogIndex.
+        """
+        super().__init__(cosmos_db, programs, refresh_seconds)
+        self._sources = {}  # (collection name, courseId or position) -> (program, course codes, prerequisite codes, title)
+        self._by_collection = defaultdict(set)  # collection name -> source keys
+        self._requires = defaultdict(Counter)  # course code -> prerequisite codes (with reference counts)
+        self._unlocks = defaultdict(Counter)  # prerequisite code -> course codes (with reference counts)
+        self._titles = {}  # course code -> a title it is listed under
+        self._programs = defaultdict(Counter)  # course code -> program slugs listing it (with reference counts)
+        self._memo = {}  # (direction, course code) -> transitive closure
+        self._checks = {}  # collection name -> (revision, prerequisite check)
+
+    @staticmethod
+    def _source_key(collection_name, course, position):
+        return collection_name, course.get("courseId") or position
+
+    def _add_source(self, key, program, codes, prerequisites, title=None):
+        # A course listed with several codes ('ENGL 1301/1302') does not require itself
+        prerequisites = [code for code in prerequisites if code not in codes]
+        self._sources[key] = (program, codes, prerequisites, title)
+        self._by_collection[key[0]].add(key)
+        for code in codes:
+            self._programs[code][program] += 1
+            if title:
+                self._titles.setdefault(code, title)
+            for prerequisite in prerequisites:
+                self._requires[code][prerequisite] += 1
+                self._unlocks[prerequisite][code] += 1
+
+    def _remove_source(self, key):
+        program, codes, prerequisites, _ = self._sources.pop(key, (None, (), (), None))
+        self._by_collection[key[0]].discard(key)
+        for code in codes:
+            self._programs[code][program] -= 1
+            if self._programs[code][program] <= 0:
+                del self._programs[code][program]
+            if not self._programs[code]:
+                del self._programs[code]
+                self._titles.pop(code, None)
+            for prerequisite in prerequisites:
+                self._requires[code][prerequisite] -= 1
+                if self._requires[code][prerequisite] <= 0:
+                    del self._requires[code][prerequisite]
+                self._unlocks[prerequisite][code] -= 1
+                if self._unlocks[prerequisite][code] <= 0:
+                    del self._unlocks[prerequisite][code]
+
+    def _add_collection(self, program, collection_name, documents):
+        added = 0
+        for d, document in enumerate(documents):
+            for y, s, c, course in iter_courses(document):
+                codes = course_codes(course.get("courseNumber"))
+                if not codes:
+                    continue
+                self._add_source(self._source_key(collection_name, course, (d, y, s, c)), program,
+                                 codes, course_codes(course.get("prerequisite")), course.get("title"))
+                added += 1
+        self._memo.clear()
+        return added
+
+    def _remove_collection(self, collection_name):
+        for key in list(self._by_collection.pop(collection_name, ())):
+            self._remove_source(key)
+        self._checks.pop(collection_name, None)
+        self._memo.clear()
+
+    def course_updated(self, collection_name, course_id, field, value):
+        """
+        Replace the edges of one course entry after its prerequisite (or course number) was edited,
+        without rereading its collection.
+        """
+        if field not in ("prerequisite", "courseNumber"):
+            return
+
+        key = (collection_name, course_id)
+        with self._lock:
+            if not course_id or key not in self._sources:
+                self._stale.add(collection_name)
+                return
+            program, codes, prerequisites, title = self._sources[key]
+            if field == "prerequisite":
+                prerequisites = course_codes(value)
+            else:
+                codes = course_codes(value)
+            self._remove_source(key)
+            self._add_source(key, program, codes, prerequisites, title)
+            self._checks.pop(collection_name, None)
+            self._memo.clear()
+            # The edit is applied; only writes from other workers should trigger a reindex of the collection
+            self._revisions[collection_name] = self.cosmos_db.get_revision(collection_name)["revision"]
+
+    def _closure(self, direction, code):
+        """
+        Every course reachable from a course through requires (prerequisites) or unlocks edges, breadth first.
+        """
+        memo_key = (direction, code)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        edges = self._requires if direction == "requires" else self._unlocks
+        seen = {code}
+        order = []
+        queue = deque([code])
+        while queue:
+            for neighbour in sorted(edges.get(queue.popleft(), ())):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    order.append(neighbour)
+                    queue.append(neighbour)
+        self._memo[memo_key] = order
+        return order
+
+    def course(self, code):
+        """
+        Describe the prerequisites of a course and the courses it unlocks, directly and transitively.
+
+        :param code: A normalized course code such as 'ECON 2301'.
+        :return: A dictionary, or None if no roadmap lists or requires the course.
+        """
+        self.refresh()
+        with self._lock:
+            if code not in self._programs and not self._unlocks.get(code):
+                return None
+            return {
+                "course": code,
+                "title": self._titles.get(code),
+                "programs": sorted(self._programs.get(code, ())),
+                "prerequisites": sorted(self._requires.get(code, ())),
+                "transitivePrerequisites": list(self._closure("requires", code)),
+                "unlocks": sorted(self._unlocks.get(code, ())),
+                "transitiveUnlocks": list(self._closure("unlocks", code))
+            }
+
+    def cycles(self):
+        """
+        :return: The prerequisite cycles across all roadmaps.
+        """
+        self.refresh()
+        with self._lock:
+            return find_cycles(set(self._requires) | set(self._unlocks), self._requires)
+
+    def check_program(self, collection_name):
+        """
+        Check the semester sequence of a program's roadmaps: a course must come after the courses it requires
+        when they are on the same roadmap (in the same semester only if the prerequisite text allows concurrent
+        enrollment). When the prerequisite text lists alternatives ('... or ...'), it is enough that one of the
+        listed courses on the roadmap comes early enough.
+
+        :param collection_name: The name of the program collection.
+        :return: A dictionary with the 'violations' and the 'cycles' among the program's courses.
+        """
+        self.refresh()
+        revision = self.cosmos_db.get_revision(collection_name)["revision"]
+        with self._lock:
+            cached = self._checks.get(collection_name)
+            if cached is not None and cached[0] == revision:
+                return cached[1]
+
+        violations = []
+        edges = defaultdict(set)
+        for document in self.cosmos_db.get_documents(collection_name):
+            # Position of each course code in the roadmap's sequence of semesters
+            terms = {}
+            entries = []
+            term = -1
+            for y, year in enumerate(document.get("years", [])):
+                for s, semester in enumerate(year.get("semesters", [])):
+                    term += 1
+                    for course in semester.get("courses", []):
+                        codes = course_codes(course.get("courseNumber"))
+                        for code in codes:
+                            terms.setdefault(code, (term, year.get("year"), semester.get("semester")))
+                        entries.append((term, year.get("year"), semester.get("semester"), codes, course))
+
+            for term, year, semester, codes, course in entries:
+                text = course.get("prerequisite") or ""
+                prerequisites = [code for code in course_codes(text) if code not in codes]
+                for code in codes:
+                    edges[code].update(prerequisites)
+
+                scheduled = [code for code in prerequisites if code in terms]
+                if not scheduled:
+                    continue
+                concurrent = bool(CONCURRENT_PATTERN.search(text))
+                late = [code for code in scheduled
+                        if terms[code][0] > term or (terms[code][0] == term and not concurrent)]
+                if ALTERNATIVES_PATTERN.search(text) and len(late) < len(scheduled):
+                    continue
+                for code in late:
+                    violations.append({
+                        "course": codes[0] if codes else None,
+                        "courseNumber": course.get("courseNumber"),
+                        "title": course.get("title"),
+                        "courseId": course.get("courseId"),
+                        "year": year,
+                        "semester": semester,
+                        "prerequisite": code,
+                        "prerequisiteYear": terms[code][1],
+                        "prerequisiteSemester": terms[code][2]
+                    })
+
+        result = {"violations": violations, "cycles": find_cycles(edges, edges)}
+        with self._lock:
+            self._checks[collection_name] = (revision, result)
+        return result
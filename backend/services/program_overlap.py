@@ -0,0 +1,177 @@
+# backend/services/program_overlap.py
+
+from collections import defaultdict
+from db.course_index import iter_courses
+from db.degree_summary import course_hours
+from services.catalog_index import CatalogIndex
+from services.prerequisite_graph import course_codes
+
+SIMILARITY_METRICS = ("jaccard", "containment")
+
+
+def iter_bits(bits):
+    """
+    Yield the positions of the set bits of an integer bitset, lowest first.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class ProgramOverlapIndex(CatalogIndex):
+    description = "program overlap index"
+
+    def __init__(self, cosmos_db, programs, refresh_seconds=None):
+        """
+        Index from normalized course number to the programs and positions listing it, plus one bitset per
+        program over the global course vocabulary, so overlap, difference and shared-hours queries between
+        programs are integer AND/AND-NOT operations and popcounts instead of roadmap downloads.
+
+        A course listed with alternatives ('MGMT 4304 or MARK 3330') sets the bit of each alternative.
+
+        :param cosmos_db: Instance of the CosmosDB class.
+        :param programs: The ProgramRegistry listing the program collections.
+        :param refresh_seconds: See CatalogIndex.
+        """
+        super().__init__(cosmos_db, programs, refresh_seconds)
+        self._bit_of = {}  # course code -> bit position; positions are never reused
+        self._codes = []  # bit position -> course code
+        self._titles = {}  # course code -> a title it is listed under
+        self._bits = {}  # program slug -> bitset of its course codes
+        self._hours = {}  # program slug -> {course code: hours}
+        self._positions = defaultdict(dict)  # course code -> {program slug: [positions]}
+        self._program_of = {}  # collection name -> program slug
+        self._matrix = {}  # metric -> similarity matrix, until the next change
+
+    def _bit(self, code):
+        bit = self._bit_of.get(code)
+        if bit is None:
+            bit = self._bit_of[code] = len(self._codes)
+            self._codes.append(code)
+        return bit
+
+    def _add_collection(self, program, collection_name, documents):
+        bits = 0
+        hours = {}
+        for document in documents:
+            for y, s, c, course in iter_courses(document):
+                codes = course_codes(course.get("courseNumber"))
+                year = document["years"][y]
+                for code in codes:
+                    bits |= 1 << self._bit(code)
+                    hours[code] = max(hours.get(code, 0), course_hours(course))
+                    self._titles.setdefault(code, course.get("title"))
+                    self._positions[code].setdefault(program, []).append({
+                        "year": year.get("year"),
+                        "semester": year["semesters"][s].get("semester"),
+                        "courseId": course.get("courseId")
+                    })
+        self._program_of[collection_name] = program
+        self._bits[program] = bits
+        self._hours[program] = hours
+        self._matrix.clear()
+        return len(hours)
+
+    def _remove_collection(self, collection_name):
+        program = self._program_of.pop(collection_name, None)
+        if program is None:
+            return
+        for bit in iter_bits(self._bits.pop(program, 0)):
+            self._positions[self._codes[bit]].pop(program, None)
+        self._hours.pop(program, None)
+        self._matrix.clear()
+
+    def _course(self, code, programs):
+        return {
+            "course": code,
+            "title": self._titles.get(code),
+            "hours": {program: self._hours[program][code] for program in programs if code in self._hours[program]}
+        }
+
+    def programs_of(self, code):
+        """
+        List the programs and positions where a course code appears.
+
+        :param code: A normalized course code such as 'ECON 2301'.
+        :return: A dictionary of program slug -> list of positions.
+        """
+        self.refresh()
+        with self._lock:
+            return {program: list(positions) for program, positions in self._positions.get(code, {}).items()}
+
+    def overlap(self, programs):
+        """
+        Compare two or more programs: the courses all of them share, the courses only each one lists,
+        and how many of each program's hours the shared courses cover.
+
+        :param programs: The program slugs.
+        :return: A dictionary describing the overlap.
+        """
+        self.refresh()
+        with self._lock:
+            bits = {program: self._bits.get(program, 0) for program in programs}
+            shared = ~0
+            union = 0
+            for program_bits in bits.values():
+                shared &= program_bits
+                union |= program_bits
+            shared = shared if bits else 0
+
+            only = {}
+            for program, program_bits in bits.items():
+                others = 0
+                for other, other_bits in bits.items():
+                    if other != program:
+                        others |= other_bits
+                only[program] = [self._course(self._codes[bit], [program]) for bit in iter_bits(program_bits & ~others)]
+
+            shared_codes = [self._codes[bit] for bit in iter_bits(shared)]
+            hours = {program: sum(self._hours.get(program, {}).values()) for program in programs}
+            shared_hours = {program: sum(self._hours.get(program, {}).get(code, 0) for code in shared_codes)
+                            for program in programs}
+            return {
+                "programs": list(programs),
+                "shared": [self._course(code, programs) for code in shared_codes],
+                "only": only,
+                "hours": hours,
+                "sharedHours": shared_hours,
+                "sharedFraction": {program: round(shared_hours[program] / hours[program], 4) if hours[program] else 0
+                                   for program in programs},
+                "jaccard": round(shared.bit_count() / union.bit_count(), 4) if union else 0
+            }
+
+    def similarity_matrix(self, metric="jaccard"):
+        """
+        Similarity of every pair of programs listing at least one course code.
+        'jaccard' is |A & B| / |A | B|; 'containment' is |A & B| / |A|, i.e. how much of the row program
+        the column program covers.
+
+        :param metric: 'jaccard' or 'containment'.
+        :return: A dictionary with the 'programs' (row and column order) and the 'matrix' of rounded values.
+        """
+        if metric not in SIMILARITY_METRICS:
+            raise ValueError(f"metric must be one of {', '.join(SIMILARITY_METRICS)}")
+        self.refresh()
+        with self._lock:
+            cached = self._matrix.get(metric)
+            if cached is not None:
+                return cached
+
+            programs = sorted(program for program, bits in self._bits.items() if bits)
+            bits = [self._bits[program] for program in programs]
+            counts = [program_bits.bit_count() for program_bits in bits]
+            matrix = []
+            for i, row_bits in enumerate(bits):
+                row = []
+                for j, column_bits in enumerate(bits):
+                    shared = (row_bits & column_bits).bit_count()
+                    if metric == "jaccard":
+                        row.append(round(shared / (counts[i] + counts[j] - shared), 4))
+                    else:
+                        row.append(round(shared / counts[i], 4))
+                matrix.append(row)
+
+            result = {"metric": metric, "programs": programs, "matrix": matrix}
+            self._matrix[metric] = result
+            return result
@@ -0,0 +1,95 @@
+# backend/services/program_registry.py
+
+import os
+import json
+import logging
+from course_types import COURSE_TYPES
+from services.course_service import CourseService
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLLEGES_DEGREES_FILE = os.path.join(BACKEND_DIR, "data", "colleges_degrees.json")
+DATA_FILES_CONFIG = os.path.join(BACKEND_DIR, "config", "data_files_config.json")
+
+COURSES_SUFFIX = "-courses"
+
+
+def program_slug(name):
+    """
+    Normalize a program slug or collection name, e.g. 'bachelor_economics_courses' -> 'bachelor-economics-courses'.
+    """
+    return name.strip().lower().replace("_", "-")
+
+
+def discover_program_slugs(colleges_degrees_file=None, data_files_config=None):
+    """
+    Collect the slugs of every program roadmap: the 'courseType' of each entry in colleges_degrees.json,
+    the '*_courses' collections of data_files_config.json and the entries of COURSE_TYPES.
+    A missing or unreadable file is logged and skipped.
+
+    :param colleges_degrees_file: Defaults to 'colleges_degrees_file' from the environment, then data/colleges_degrees.json.
+    :param data_files_config: Defaults to 'data_files_config' from the environment, then config/data_files_config.json.
+        Both can point at a generated catalog (see db/generate_synthetic_catalog.py).
+
+    :return: A sorted list of slugs such as 'bachelor-economics-courses'.
+    """
+    colleges_degrees_file = colleges_degrees_file or os.getenv('colleges_degrees_file', COLLEGES_DEGREES_FILE)
+    data_files_config = data_files_config or os.getenv('data_files_config', DATA_FILES_CONFIG)
+    slugs = {f"{course['level']}-{course['course_type']}{COURSES_SUFFIX}".replace("_", "-") for course in COURSE_TYPES}
+
+    try:
+        with open(colleges_degrees_file, 'r') as file:
+            slugs.update(program_slug(entry["courseType"]) for entry in json.load(file) if entry.get("courseType"))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read programs from %s: %s", colleges_degrees_file, e)
+
+    try:
+        with open(data_files_config, 'r') as file:
+            slugs.update(program_slug(entry["collection_name"]) for entry in json.load(file)
+                         if entry.get("collection_name", "").endswith("_courses"))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read programs from %s: %s", data_files_config, e)
+
+    return sorted(slug for slug in slugs if slug.endswith(COURSES_SUFFIX) and "-" in slug[:-len(COURSES_SUFFIX)])
+
+
+class ProgramRegistry:
+    def __init__(self, cosmos_db, slugs, snapshot=None):
+        """
+        Map every program slug to a CourseService built once at startup, so serving a program is a dict lookup
+        and unknown programs are turned away without a database call.
+
+        :param cosmos_db: Instance of the CosmosDB class shared by all services.
+        :param slugs: The program slugs, e.g. 'bachelor-economics-courses'.
+        :param snapshot: Optional CatalogSnapshot the roadmaps are served from.
+        """
+        self._services = {}
+        for slug in slugs:
+            level, course_type = slug[:-len(COURSES_SUFFIX)].split("-", 1)
+            self._services[slug] = CourseService(cosmos_db, level, course_type.replace("-", "_"), snapshot)
+        logger.info("Registered %s programs", len(self._services))
+
+    def get(self, slug):
+        """
+        Get the service of a program.
+
+        :param slug: The program slug; underscores are accepted in place of hyphens.
+        :return: The CourseService, or None for an unknown program.
+        """
+        return self._services.get(program_slug(slug))
+
+    def slugs(self):
+        return list(self._services)
+
+    def collections(self):
+        """
+        :return: A dictionary of program slug -> collection name.
+        """
+        return {slug: service.collection_name for slug, service in self._services.items()}
+
+    def __contains__(self, slug):
+        return program_slug(slug) in self._services
+
+    def __len__(self):
+        return len(self._services)
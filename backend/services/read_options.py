@@ -0,0 +1,65 @@
+# backend/services/read_options.py
+
+# Fields of a course entry nested under years.semesters.courses in every roadmap document
+COURSE_FIELDS = {"important", "hours", "courseNumber", "title", "minGrade", "gec", "prerequisite", "notes"}
+
+# Structural fields kept whenever course fields are projected, so the roadmap shape survives
+ROADMAP_SKELETON = ["department", "program", "years.year", "years.semesters.semester"]
+
+MAX_PAGE_SIZE = 1000
+
+
+def course_projection(fields):
+    """
+    Expand bare course field names (e.g. 'title') to their nested roadmap paths.
+
+    :param fields: List of requested field names or dotted paths.
+    :return: List of dotted paths suitable for a Mongo projection.
+    """
+    if not any(field in COURSE_FIELDS for field in fields):
+        return fields
+
+    expanded = [f"years.semesters.courses.{field}" if field in COURSE_FIELDS else field for field in fields]
+    return ROADMAP_SKELETON + [field for field in expanded if field not in ROADMAP_SKELETON]
+
+
+def parse_read_options(args, course_collection=False):
+    """
+    Parse the projection, pagination and streaming query parameters of a read endpoint.
+
+    Supported parameters:
+      - fields: comma-separated list of fields to return, pushed down to Mongo as a projection
+      - limit: page size; the cursor of the next page is returned in the X-Next-Cursor header
+      - after: cursor returned by the previous page
+      - format: 'ndjson' to stream one document per line as the cursor yields them
+
+    :param args: The request query arguments.
+    :param course_collection: Whether bare course field names should be expanded to roadmap paths.
+    :return: A dictionary of keyword arguments for CosmosDB.get_data (empty for a plain full read).
+    :raises ValueError: If a parameter is invalid.
+    """
+    options = {}
+
+    fields = [field.strip() for field in args.get("fields", "").split(",") if field.strip()]
+    if fields:
+        options["fields"] = course_projection(fields) if course_collection else fields
+
+    if "limit" in args:
+        try:
+            limit = int(args["limit"])
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        options["limit"] = limit
+
+    if args.get("after"):
+        options["after"] = args["after"]
+
+    output_format = args.get("format", "json")
+    if output_format not in ("json", "ndjson"):
+        raise ValueError("format must be 'json' or 'ndjson'")
+    if output_format == "ndjson":
+        options["stream"] = True
+
+    return options
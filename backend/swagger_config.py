@@ -1,8 +1,20 @@
-import copy  # For making deep copies of the course schema
-from course_types import COURSE_TYPES  # Import COURSE_TYPES
+# backend/swagger_config.py
 
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections.abc import Mapping
 
-def generate_swagger_spec():
+logger = logging.getLogger(__name__)
+
+# Bump when generate_swagger_spec changes, so specs cached on disk by an older version are not reused
+SPEC_VERSION = 2
+
+
+def generate_swagger_spec(program_slugs):
     base_spec = {
         "swagger": "2.0",
         "info": {
@@ -67,6 +79,18 @@ def generate_swagger_spec():
         }
     }
 
+    # Projection, pagination and streaming query parameters of the course endpoint
+    read_parameters = [
+        {"name": "fields", "in": "query", "type": "string", "required": False,
+         "description": "Comma-separated fields to return, e.g. title,hours,courseNumber"},
+        {"name": "limit", "in": "query", "type": "integer", "required": False,
+         "description": "Page size; the next page cursor is returned in the X-Next-Cursor header"},
+        {"name": "after", "in": "query", "type": "string", "required": False,
+         "description": "Cursor of the page to fetch"},
+        {"name": "format", "in": "query", "type": "string", "required": False,
+         "description": "'ndjson' to stream one document per line"}
+    ]
+
     # Add the static colleges_degrees path
     base_spec["paths"]["/api/colleges-degrees"] = {
         "get": {
@@ -80,30 +104,100 @@ def generate_swagger_spec():
         }
     }
 
-    # Dynamically add course types
-    for course in COURSE_TYPES:
-        # Convert underscores to hyphens in the path
-        level = course["level"].replace("_", "-")
-        course_type = course["course_type"].replace("_", "-")
-        path = f"/api/{level}-{course_type}-courses"
-
-        # Create a deep copy of the course schema for each path
-        course_schema_copy = copy.deepcopy(course_schema)
-
-        # Add the dynamic path
-        base_spec["paths"][path] = {
-            "get": {
-                "summary": f"Get all {course_type.replace('-', ' ')} courses",
-                "responses": {
-                    "200": {
-                        "description": f"A list of {course_type.replace('-', ' ')} courses",
-                        "schema": course_schema_copy
-                    }
+    # A single path documents every program roadmap; the known slugs are listed as the enum of its parameter
+    path = "/api/{program_slug}"
+    base_spec["paths"][path] = {
+        "get": {
+            "summary": "Get all courses of a program",
+            "parameters": [
+                {"name": "program_slug", "in": "path", "type": "string", "required": True,
+                 "enum": list(program_slugs),
+                 "description": "Program roadmap, e.g. bachelor-economics-courses"}
+            ] + read_parameters,
+            "responses": {
+                "200": {
+                    "description": "The roadmap of the program",
+                    "schema": course_schema
+                },
+                "404": {
+                    "description": "Unknown program"
                 }
             }
         }
+    }
 
-        # Print statement for debugging which APIs are being generated
-        print(f"Generated Swagger API for: {path}")
-
+    logger.debug("Generated Swagger API for: %s (%s programs)", path, len(program_slugs))
     return base_spec
+
+
+def swagger_cache_key(program_slugs):
+    """
+    Hash the program registry (and the spec version), so a cached spec is reused only for the same programs.
+    """
+    payload = json.dumps({"version": SPEC_VERSION, "programs": sorted(program_slugs)}, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CachedSwaggerSpec(Mapping):
+    def __init__(self, program_slugs, cache_dir=None):
+        """
+        Swagger template that is only built when flasgger first reads it, i.e. on the first request for the
+        API docs, instead of at startup. The spec is also cached on disk under a hash of the program registry,
+        so workers and restarts with the same programs load it instead of generating it again.
+
+        :param program_slugs: The program slugs served under /api/<program_slug>.
+        :param cache_dir: Directory of the cached specs; 'swagger_cache_dir' from the environment by default,
+                          falling back to the system temporary directory. An empty value disables the disk cache.
+        """
+        self.program_slugs = list(program_slugs)
+        if cache_dir is None:
+            cache_dir = os.getenv('swagger_cache_dir', os.path.join(tempfile.gettempdir(), "edupathfinder-swagger"))
+        self.cache_dir = cache_dir
+        self._spec = None
+        self._lock = threading.Lock()
+
+    def _cache_path(self):
+        return os.path.join(self.cache_dir, f"swagger-{swagger_cache_key(self.program_slugs)}.json")
+
+    def _load(self):
+        """
+        Read the spec from the disk cache, or generate it and write it there atomically.
+        """
+        if not self.cache_dir:
+            return generate_swagger_spec(self.program_slugs)
+
+        path = self._cache_path()
+        try:
+            with open(path, 'r') as file:
+                logger.debug("Loaded Swagger spec from %s", path)
+                return json.load(file)
+        except (OSError, ValueError):
+            pass
+
+        spec = generate_swagger_spec(self.program_slugs)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(file_descriptor, 'w') as file:
+                json.dump(spec, file, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as e:
+            # The docs still work, they are just generated again by the next worker
+            logger.warning("Could not cache Swagger spec in %s: %s", self.cache_dir, e)
+        return spec
+
+    def spec(self):
+        if self._spec is None:
+            with self._lock:
+                if self._spec is None:
+                    self._spec = self._load()
+        return self._spec
+
+    def __getitem__(self, key):
+        return self.spec()[key]
+
+    def __iter__(self):
+        return iter(self.spec())
+
+    def __len__(self):
+        return len(self.spec())
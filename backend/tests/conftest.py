@@ -0,0 +1,60 @@
+# backend/tests/conftest.py
+
+import os
+import json
+import shutil
+import mongomock
+import pytest
+from flask import Flask
+import db.cosmos_mongo_db as cosmos_mongo_db
+from db.cosmos_mongo_db import CosmosDB
+from db.local_store import LocalStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# A roadmap whose courses include GEC codes stored as '10' rather than '010'
+ROADMAP = "bachelor_accountancy_courses"
+
+
+def load_roadmap():
+    with open(os.path.join(DATA_DIR, f"{ROADMAP}.json"), 'r') as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def app():
+    """
+    A bare Flask application, for the methods that build responses.
+    """
+    app = Flask(__name__)
+    with app.test_request_context():
+        yield app
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    """
+    A LocalStore over a copy of one roadmap and the colleges and degrees, so tests may write to it.
+    """
+    for collection_name in (ROADMAP, "colleges_degrees"):
+        shutil.copy(os.path.join(DATA_DIR, f"{collection_name}.json"), tmp_path)
+    return LocalStore(str(tmp_path))
+
+
+@pytest.fixture
+def cosmos_db(monkeypatch):
+    """
+    A CosmosDB on an in-memory mongomock client, holding one roadmap.
+    """
+    monkeypatch.setattr(cosmos_mongo_db, "MongoClient", mongomock.MongoClient)
+    cosmos_db = CosmosDB("mongodb://localhost", "edupathfinder_test")
+    cosmos_db.add_data(ROADMAP, load_roadmap())
+    return cosmos_db
+
+
+@pytest.fixture(params=["local_store", "cosmos_db"])
+def store(request):
+    """
+    Each storage backend in turn, holding the same roadmap.
+    """
+    return request.getfixturevalue(request.param)
@@ -0,0 +1,64 @@
+# backend/tests/test_batch_updates.py
+
+from tests.conftest import ROADMAP
+from tests.test_course_updates import TITLE, find_course
+
+
+def test_update_courses_reports_malformed_edits_as_failed(store):
+    results = store.update_courses([
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "hours", "value": 4},
+        "not an edit",
+        {"collectionName": 3, "courseTitle": TITLE, "field": "hours"},
+        {"collectionName": ROADMAP, "field": "hours"},
+        {"collectionName": ROADMAP, "courseTitle": ["list"], "field": "hours"},
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": 5},
+        {"collectionName": ROADMAP, "courseTitle": "No such course", "field": "hours", "value": 1},
+    ])
+
+    assert [result["index"] for result in results] == list(range(7))
+    assert results[0] == {"index": 0, "status": "success"}
+    assert [result.get("status_code") for result in results[1:]] == [400, 400, 400, 400, 400, 404]
+
+
+def test_update_courses_applies_the_valid_edits_of_a_mixed_batch(store):
+    store.update_courses([
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "hours", "value": 4},
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": 5, "value": 1},
+    ])
+    assert find_course(store, TITLE)["hours"] == 4
+
+
+def test_update_courses_sets_several_fields_of_one_document(store):
+    course_id = find_course(store, TITLE)["courseId"]
+    results = store.update_courses([
+        {"collectionName": ROADMAP, "courseId": course_id, "field": "notes", "value": "Online"},
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "minGrade", "value": "B"},
+        {"collectionName": ROADMAP, "courseId": course_id, "field": "notes", "value": "Online"},
+    ])
+    assert [result["status"] for result in results[:2]] == ["success", "success"]
+    course = find_course(store, TITLE)
+    assert (course["notes"], course["minGrade"]) == ("Online", "B")
+
+
+def test_a_stale_title_position_falls_back_to_single_edits(cosmos_db, monkeypatch):
+    locate_by_title = cosmos_db._locate_by_title
+    calls = []
+
+    def moved_once(collection, course_title):
+        calls.append(course_title)
+        document_id, _ = locate_by_title(collection, course_title)
+        if len(calls) == 1:
+            return document_id, "years.0.semesters.0.courses.0"
+        return locate_by_title(collection, course_title)
+
+    first_course = find_course(cosmos_db, "Communication (Core)")
+    monkeypatch.setattr(cosmos_db, "_locate_by_title", moved_once)
+    results = cosmos_db.update_courses([
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "notes", "value": "Online"},
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "minGrade", "value": "B"},
+    ])
+
+    assert [result["status"] for result in results] == ["success", "success"]
+    course = find_course(cosmos_db, TITLE)
+    assert (course["notes"], course["minGrade"]) == ("Online", "B")
+    assert find_course(cosmos_db, "Communication (Core)") == first_course
@@ -0,0 +1,189 @@
+# backend/tests/test_bulk_loader.py
+
+import json
+import pytest
+from pymongo import errors as pymongo_errors
+import db.bulk_loader as bulk_loader
+from db.bulk_loader import AdaptiveRateLimiter, BulkLoader, throttle_delay
+from db.course_index import iter_courses
+from db.insert_data import dedup_query
+from tests.conftest import ROADMAP, load_roadmap
+
+
+class FakeClock:
+    """
+    Stands in for the time module: sleeping advances the clock instead of waiting.
+    """
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(bulk_loader, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("code, message, expected", [
+    (16500, "Request rate is large. RetryAfterMs=250", 0.25),
+    (16500, "Request rate is large", 0.0),
+    (429, None, 0.0),
+    (2, "Error=16500, TooManyRequests, RetryAfterMs=1000", 1.0),
+    (11000, "E11000 duplicate key error", None),
+    (None, None, None),
+])
+def test_throttle_delay(code, message, expected):
+    assert throttle_delay(code, message) == expected
+
+
+def test_rate_increases_after_success_up_to_max_rate(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=100, max_rate=130, increase=20)
+    limiter.on_success()
+    assert limiter.rate == 120
+    limiter.on_success()
+    assert limiter.rate == 130
+
+
+def test_rate_halves_after_throttle_down_to_min_rate(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=100, min_rate=30, decrease_factor=0.5)
+    limiter.on_throttle()
+    assert limiter.rate == 50
+    limiter.on_throttle()
+    assert limiter.rate == 30
+
+
+def test_acquire_runs_into_debt_and_waits_it_off(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=100)
+    limiter.acquire(200)
+    assert clock.sleeps == []
+
+    # The previous batch left 200 documents of debt: two seconds at 100 docs/s
+    limiter.acquire(10)
+    assert sum(clock.sleeps) == pytest.approx(2.0)
+
+
+def test_throttle_pauses_every_worker_for_the_retry_after_hint(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=100)
+    limiter.on_throttle(retry_after=1.5)
+    limiter.acquire(1)
+    assert clock.sleeps[0] == pytest.approx(1.5)
+    assert clock.now >= 101.5
+
+
+def roadmap_copies(count):
+    documents = []
+    for n in range(count):
+        document = load_roadmap()[0]
+        document["program"] = f"Program {n}"
+        documents.append(document)
+    return documents
+
+
+def fast_limiter():
+    return AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6)
+
+
+def test_bulk_insert_missing_skips_existing_documents(cosmos_db):
+    revision = cosmos_db.get_revision(ROADMAP)["revision"]
+    documents = load_roadmap() + roadmap_copies(2)
+    key_for = lambda document: dedup_query(ROADMAP, document)
+
+    result = cosmos_db.bulk_insert_missing(ROADMAP, documents, key_for)
+    assert (result["inserted"], result["existing"], result["errors"]) == (2, 1, [])
+    stored = cosmos_db.get_documents(ROADMAP)
+    assert [document["program"] for document in stored] == ["Accountancy", "Program 0", "Program 1"]
+    assert all(course.get("courseId") for _, _, _, course in iter_courses(stored[1]))
+    assert cosmos_db.get_revision(ROADMAP)["revision"] > revision
+
+    result = cosmos_db.bulk_insert_missing(ROADMAP, roadmap_copies(2), key_for)
+    assert (result["inserted"], result["existing"]) == (0, 2)
+    assert len(cosmos_db.get_documents(ROADMAP)) == 3
+
+
+def test_load_collection_writes_in_batches_and_counts_existing(cosmos_db, tmp_path):
+    path = tmp_path / "programs.json"
+    path.write_text(json.dumps(roadmap_copies(5)))
+    loader = BulkLoader(cosmos_db, dedup_query, batch_size=2, rate_limiter=fast_limiter())
+
+    assert loader.load_collection("programs", str(path)) == 5
+    assert (loader.stats["inserted"], loader.stats["existing"]) == (5, 0)
+    loader.load_collection("programs", str(path))
+    assert (loader.stats["inserted"], loader.stats["existing"]) == (5, 5)
+    assert len(cosmos_db.get_documents("programs")) == 5
+
+
+def test_only_throttled_documents_are_retried(cosmos_db, monkeypatch):
+    bulk_insert_missing = cosmos_db.bulk_insert_missing
+    calls = []
+
+    def partly_throttled(collection_name, documents, key_for):
+        calls.append([document["program"] for document in documents])
+        if len(calls) > 1:
+            return bulk_insert_missing(collection_name, documents, key_for)
+        # The server wrote every document but the second one
+        result = bulk_insert_missing(collection_name, documents[:1] + documents[2:], key_for)
+        result["errors"] = [{"index": 1, "code": 16500, "errmsg": "Request rate is large. RetryAfterMs=1"}]
+        return result
+
+    monkeypatch.setattr(cosmos_db, "bulk_insert_missing", partly_throttled)
+    loader = BulkLoader(cosmos_db, dedup_query, rate_limiter=fast_limiter())
+    loader.load_batch("programs", roadmap_copies(3))
+
+    assert calls == [["Program 0", "Program 1", "Program 2"], ["Program 1"]]
+    assert (loader.stats["inserted"], loader.stats["throttled"], loader.stats["failed"]) == (3, 1, 0)
+    assert len(cosmos_db.get_documents("programs")) == 3
+
+
+def test_a_throttled_batch_is_retried_whole(cosmos_db, monkeypatch):
+    bulk_insert_missing = cosmos_db.bulk_insert_missing
+    calls = []
+
+    def throttled_once(collection_name, documents, key_for):
+        calls.append(len(documents))
+        if len(calls) == 1:
+            raise pymongo_errors.OperationFailure("Request rate is large. RetryAfterMs=1", code=16500)
+        return bulk_insert_missing(collection_name, documents, key_for)
+
+    monkeypatch.setattr(cosmos_db, "bulk_insert_missing", throttled_once)
+    limiter = fast_limiter()
+    loader = BulkLoader(cosmos_db, dedup_query, rate_limiter=limiter)
+    loader.load_batch("programs", roadmap_copies(2))
+
+    assert calls == [2, 2]
+    assert (loader.stats["inserted"], loader.stats["throttled"]) == (2, 2)
+    assert limiter.rate < 1e6
+
+
+def test_write_errors_other_than_throttling_are_not_retried(cosmos_db, monkeypatch):
+    calls = []
+
+    def failing(collection_name, documents, key_for):
+        calls.append(len(documents))
+        return {"inserted": 1, "existing": 0,
+                "errors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"}]}
+
+    monkeypatch.setattr(cosmos_db, "bulk_insert_missing", failing)
+    loader = BulkLoader(cosmos_db, dedup_query, rate_limiter=fast_limiter())
+    loader.load_batch("programs", roadmap_copies(2))
+    assert calls == [2]
+    assert loader.stats["failed"] == 1
+
+
+def test_documents_still_throttled_after_max_retries_count_as_failed(cosmos_db, monkeypatch):
+    def always_throttled(collection_name, documents, key_for):
+        return {"inserted": 0, "existing": 0,
+                "errors": [{"index": i, "code": 16500, "errmsg": "RetryAfterMs=0"} for i in range(len(documents))]}
+
+    monkeypatch.setattr(cosmos_db, "bulk_insert_missing", always_throttled)
+    loader = BulkLoader(cosmos_db, dedup_query, max_retries=2, rate_limiter=fast_limiter())
+    loader.load_batch("programs", roadmap_copies(2))
+    assert (loader.stats["throttled"], loader.stats["failed"]) == (6, 2)
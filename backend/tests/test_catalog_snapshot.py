@@ -0,0 +1,63 @@
+# backend/tests/test_catalog_snapshot.py
+
+import json
+import os
+from db.catalog_snapshot import CatalogSnapshot
+from db.encoded_body import EncodedBody
+from tests.conftest import ROADMAP
+
+COLLECTIONS = [ROADMAP, "colleges_degrees"]
+
+
+def snapshot_documents(snapshot, collection_name):
+    return json.loads(bytes(snapshot.get(collection_name).variant("identity")))
+
+
+def test_build_publishes_every_collection(local_store, tmp_path):
+    snapshot = CatalogSnapshot(str(tmp_path / "snapshots" / "catalog"), local_store, COLLECTIONS)
+    assert snapshot.get(ROADMAP) is None
+    assert snapshot.build()
+
+    for collection_name in COLLECTIONS:
+        entry = snapshot.get(collection_name)
+        assert entry.revision == local_store.get_revision(collection_name)["revision"]
+        expected = EncodedBody.from_documents(local_store.get_documents(collection_name))
+        assert bytes(entry.variant("identity")) == expected.identity
+        assert bytes(entry.variant("gzip")) == expected.gzipped
+
+
+def test_build_without_changes_keeps_the_generation(local_store, tmp_path):
+    snapshot = CatalogSnapshot(str(tmp_path / "catalog"), local_store, COLLECTIONS)
+    assert snapshot.build()
+    target = os.readlink(snapshot.path)
+    assert not snapshot.build()
+    assert os.readlink(snapshot.path) == target
+
+
+def test_build_after_a_write_swaps_in_a_new_generation(local_store, tmp_path):
+    snapshot = CatalogSnapshot(str(tmp_path / "catalog"), local_store, COLLECTIONS)
+    snapshot.build()
+    previous = snapshot.get(ROADMAP)
+    readers_view = bytes(previous.variant("identity"))
+    colleges = bytes(snapshot.get("colleges_degrees").variant("identity"))
+
+    title = snapshot_documents(snapshot, ROADMAP)[0]["years"][0]["semesters"][0]["courses"][1]["title"]
+    local_store.update_course(ROADMAP, title, "notes", "Offered online")
+    assert snapshot.build()
+
+    entry = snapshot.get(ROADMAP)
+    assert entry.revision == local_store.get_revision(ROADMAP)["revision"] != previous.revision
+    assert snapshot_documents(snapshot, ROADMAP)[0]["years"][0]["semesters"][0]["courses"][1]["notes"] == "Offered online"
+    # The unchanged collection is carried over, and the replaced generation stays readable for its readers
+    assert bytes(snapshot.get("colleges_degrees").variant("identity")) == colleges
+    assert bytes(previous.variant("identity")) == readers_view
+
+    generations = [name for name in os.listdir(tmp_path) if name.startswith("catalog.g")]
+    assert len(generations) == 2
+
+
+def test_a_second_reader_maps_the_published_generation(local_store, tmp_path):
+    writer = CatalogSnapshot(str(tmp_path / "catalog"), local_store, COLLECTIONS)
+    reader = CatalogSnapshot(str(tmp_path / "catalog"))
+    writer.build()
+    assert reader.get(ROADMAP).revision == writer.get(ROADMAP).revision
@@ -0,0 +1,54 @@
+# backend/tests/test_compact_catalog.py
+
+import json
+from db.compact_catalog import STRINGS, CompactDocument
+from tests.conftest import load_roadmap
+
+
+def as_json(document):
+    # Without sort_keys, so the field order is compared as well
+    return json.dumps(document)
+
+
+def test_roadmap_round_trip_keeps_values_and_key_order():
+    for document in load_roadmap():
+        document["_id"] = "0553265f90c9689ac8f53042"
+        compact = CompactDocument(document)
+        assert compact.courses is not None
+        assert as_json(compact.to_document()) == as_json(document)
+
+
+def test_values_that_fit_no_column_are_kept_as_is():
+    document = {"_id": "a", "years": [{"year": "First Year", "semesters": [{"semester": "Fall", "courses": [
+        {"hours": 3.5, "title": "Half hours", "gec": 10},
+        {"title": None, "hours": "3", "extra": {"nested": [1, 2]}},
+        {"hours": True, "courseNumber": "MATH 1324"},
+        {"hours": 2 ** 40},
+        {},
+    ]}]}]}
+    restored = CompactDocument(document).to_document()
+    assert as_json(restored) == as_json(document)
+    course = restored["years"][0]["semesters"][0]["courses"][2]
+    assert course["hours"] is True
+
+
+def test_documents_without_roadmap_shape_are_kept_field_by_field():
+    for document in ({"_id": "b", "college": "Business", "degrees": ["BBA", "BS"]},
+                     {"_id": "c", "years": "not a list"},
+                     {"_id": "d", "years": [{"semesters": [{"courses": ["not a course"]}]}]}):
+        compact = CompactDocument(document)
+        assert compact.courses is None
+        assert as_json(compact.to_document()) == as_json(document)
+
+
+def test_every_read_returns_new_dictionaries():
+    compact = CompactDocument(load_roadmap()[0])
+    first = compact.to_document()
+    first["years"][0]["semesters"][0]["courses"][0]["title"] = "Changed"
+    assert compact.to_document()["years"][0]["semesters"][0]["courses"][0]["title"] != "Changed"
+
+
+def test_equal_strings_are_shared():
+    title = "".join(["Communication", " (Core)"])
+    CompactDocument({"years": [{"semesters": [{"courses": [{"title": title}]}]}]})
+    assert STRINGS.intern("Communication (Core)") is STRINGS.intern(title)
@@ -0,0 +1,64 @@
+# backend/tests/test_course_updates.py
+
+from db.course_index import iter_courses
+from tests.conftest import ROADMAP
+
+TITLE = "Mathematics for Business and Social Sciences"
+
+
+def find_course(store, title):
+    return next(course for document in store.get_documents(ROADMAP)
+                for _, _, _, course in iter_courses(document) if course["title"] == title)
+
+
+def test_every_course_gets_a_course_id(store):
+    course_ids = [course.get("courseId") for document in store.get_documents(ROADMAP)
+                  for _, _, _, course in iter_courses(document)]
+    assert all(course_ids)
+    assert len(set(course_ids)) == len(course_ids)
+
+
+def test_update_course_by_id(store):
+    course_id = find_course(store, TITLE)["courseId"]
+    assert store.update_course(ROADMAP, None, "notes", "Online", course_id=course_id)["updated"]
+    assert find_course(store, TITLE)["notes"] == "Online"
+
+
+def test_update_course_by_title(store):
+    assert store.update_course(ROADMAP, TITLE, "minGrade", "B")["updated"]
+    assert find_course(store, TITLE)["minGrade"] == "B"
+
+
+def test_update_course_of_an_unknown_course(store):
+    assert store.update_course(ROADMAP, None, "notes", "x", course_id="0" * 24)[1] == 404
+    assert store.update_course(ROADMAP, "No such course", "notes", "x")[1] == 404
+
+
+def test_update_course_rejects_a_non_string_field(store):
+    assert store.update_course(ROADMAP, TITLE, 5, 4) == ({"error": "Field 5 cannot be updated"}, 400)
+
+
+def test_update_course_rejects_identity_fields(store):
+    body, status_code = store.update_course(ROADMAP, TITLE, "courseId", "x")
+    assert status_code == 400
+
+
+def test_a_stale_title_position_never_updates_another_course(cosmos_db, monkeypatch):
+    locate_by_title = cosmos_db._locate_by_title
+    calls = []
+
+    def moved_once(collection, course_title):
+        # The first lookup sees the document before another writer moved the course to a different position
+        calls.append(course_title)
+        document_id, _ = locate_by_title(collection, course_title)
+        if len(calls) == 1:
+            return document_id, "years.0.semesters.0.courses.0"
+        return locate_by_title(collection, course_title)
+
+    first_course = find_course(cosmos_db, "Communication (Core)")
+    monkeypatch.setattr(cosmos_db, "_locate_by_title", moved_once)
+    assert cosmos_db.update_course(ROADMAP, TITLE, "notes", "Online")["updated"]
+
+    assert len(calls) == 2
+    assert find_course(cosmos_db, TITLE)["notes"] == "Online"
+    assert find_course(cosmos_db, "Communication (Core)") == first_course
@@ -0,0 +1,40 @@
+# backend/tests/test_degree_summary.py
+
+from db.degree_summary import GEC_SECTIONS, compute_summary, gec_section
+from tests.conftest import load_roadmap
+
+
+def roadmap(*courses):
+    return {"years": [{"year": "First Year", "semesters": [{"semester": "Fall", "courses": list(courses)}]}]}
+
+
+def test_gec_codes_without_the_leading_zero_count():
+    summary = compute_summary(roadmap({"hours": 3, "gec": "10"}, {"hours": 3, "gec": "020"}, {"hours": 4, "gec": 30}))
+    assert summary["gecCoverage"]["010"]["hours"] == 3
+    assert summary["gecCoverage"]["020"]["courses"] == 1
+    assert summary["gecCoverage"]["030"]["hours"] == 4
+    assert "010" not in summary["missingGecSections"]
+
+
+def test_gec_section_leaves_the_course_untouched():
+    course = {"gec": " 10 "}
+    assert gec_section(course) == "010"
+    assert course["gec"] == " 10 "
+    assert gec_section({"gec": ""}) == ""
+    assert gec_section({"gec": None}) == ""
+    assert gec_section({"gec": "Core"}) == "Core"
+
+
+def test_checked_in_roadmap_covers_every_gec_section():
+    summary = compute_summary(load_roadmap()[0])
+    assert summary["missingGecSections"] == []
+    assert set(summary["gecCoverage"]) == set(GEC_SECTIONS)
+
+
+def test_hours_advanced_hours_and_cap():
+    courses = [{"hours": 3, "courseNumber": f"ACCT 3{n:03d}"} for n in range(15)]
+    courses.append({"hours": "3", "courseNumber": "MATH 1324"})
+    summary = compute_summary(roadmap(*courses))
+    assert summary["totalDegreeHours"] == 48
+    assert summary["advancedHours"] == 45
+    assert summary["advancedMinimumCreditHours"] == 42
@@ -0,0 +1,79 @@
+# backend/tests/test_local_store.py
+
+import json
+import os
+import stat
+import pytest
+from db.local_store import LocalStore
+from tests.conftest import ROADMAP
+from tests.test_course_updates import TITLE, find_course
+
+
+@pytest.fixture
+def failing_writes(local_store, monkeypatch):
+    def persist(collection):
+        raise OSError("No space left on device")
+    monkeypatch.setattr(local_store, "_persist", persist)
+    return local_store
+
+
+def stored_course(local_store, title):
+    with open(os.path.join(local_store.data_dir, f"{ROADMAP}.json"), 'r') as file:
+        documents = json.load(file)
+    return next(course for document in documents for year in document["years"]
+                for semester in year["semesters"] for course in semester["courses"] if course["title"] == title)
+
+
+def test_a_failed_write_leaves_memory_as_it_was(local_store, failing_writes, monkeypatch, app):
+    body_before = local_store.get_data(ROADMAP)[0].get_data()
+
+    assert local_store.update_course(ROADMAP, TITLE, "hours", 4)[1] == 500
+    assert find_course(local_store, TITLE)["hours"] == 3
+    assert local_store.get_data(ROADMAP)[0].get_data() == body_before
+
+    # A retry once the disk is writable again applies the edit
+    monkeypatch.undo()
+    assert local_store.update_course(ROADMAP, TITLE, "hours", 4)["updated"]
+    assert stored_course(local_store, TITLE)["hours"] == 4
+
+
+def test_a_failed_batch_write_leaves_memory_as_it_was(failing_writes):
+    before = dict(find_course(failing_writes, TITLE))
+    results = failing_writes.update_courses([
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "hours", "value": 4},
+        {"collectionName": ROADMAP, "courseTitle": TITLE, "field": "notes", "value": "Online"},
+    ])
+    assert [result["status_code"] for result in results] == [500, 500]
+    assert find_course(failing_writes, TITLE) == before
+
+
+def test_a_failed_add_drops_the_appended_documents(failing_writes):
+    count = len(failing_writes.get_documents(ROADMAP))
+    assert failing_writes.add_data(ROADMAP, [{"program": "New"}, {"program": "Newer"}])[1] == 400
+    assert len(failing_writes.get_documents(ROADMAP)) == count
+    assert failing_writes.find_document(ROADMAP, {"program": "New"}) is None
+
+
+def test_writes_keep_the_file_mode(local_store):
+    path = os.path.join(local_store.data_dir, f"{ROADMAP}.json")
+    os.chmod(path, 0o664)
+    local_store.update_course(ROADMAP, TITLE, "hours", 4)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o664
+
+
+def test_new_files_get_the_umask_mode(local_store):
+    local_store.create_collection("new_collection")
+    path = os.path.join(local_store.data_dir, "new_collection.json")
+    assert stat.S_IMODE(os.stat(path).st_mode) == local_store.new_file_mode
+
+
+def test_edits_leave_derived_fields_out_of_the_file(local_store):
+    local_store.update_course(ROADMAP, TITLE, "hours", 4)
+    with open(os.path.join(local_store.data_dir, f"{ROADMAP}.json"), 'r') as file:
+        text = file.read()
+    assert "courseId" not in text and "totalDegreeHours" not in text
+    assert find_course(LocalStore(local_store.data_dir), TITLE)["hours"] == 4
+
+
+def test_rejected_collection_names_are_reported(local_store):
+    assert local_store.add_data(".hidden", {"a": 1})[1] == 400
@@ -0,0 +1,65 @@
+# backend/tests/test_metrics.py
+
+import pytest
+from flask import Flask, jsonify
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+from metrics import collection_label, init_request_metrics, instrumented, record_documents, register_collections
+
+
+def sample(name, **labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+class Storage:
+    @instrumented("test_read")
+    def read(self, collection_name, status_code=200):
+        return jsonify({"collection": collection_name}), status_code
+
+    @instrumented("test_fail")
+    def fail(self, collection_name):
+        raise RuntimeError("database unreachable")
+
+
+def test_unknown_collections_share_one_label():
+    register_collections(["test_known_courses"])
+    assert collection_label("test_known_courses") == "test_known_courses"
+    assert collection_label("anything_from_a_url") == "other"
+    assert collection_label("") == ""
+
+
+def test_operations_record_latency_errors_and_response_size(app):
+    register_collections(["test_metrics_courses"])
+    labels = {"operation": "test_read", "collection": "test_metrics_courses"}
+    calls = sample("edupathfinder_db_operation_seconds_count", **labels)
+    sizes = sample("edupathfinder_db_response_bytes_count", **labels)
+    errors = sample("edupathfinder_db_operation_errors_total", **labels)
+
+    storage = Storage()
+    storage.read("test_metrics_courses")
+    storage.read("test_metrics_courses", status_code=500)
+    with pytest.raises(RuntimeError):
+        storage.fail("test_metrics_courses")
+
+    assert sample("edupathfinder_db_operation_seconds_count", **labels) == calls + 2
+    assert sample("edupathfinder_db_response_bytes_count", **labels) == sizes + 1
+    assert sample("edupathfinder_db_operation_errors_total", **labels) == errors + 1
+    assert sample("edupathfinder_db_operation_errors_total",
+                  operation="test_fail", collection="test_metrics_courses") >= 1
+
+
+def test_documents_are_counted_per_operation():
+    before = sample("edupathfinder_db_documents_total", operation="test_load", collection="other")
+    record_documents("test_load", "unregistered_collection", 3)
+    assert sample("edupathfinder_db_documents_total", operation="test_load", collection="other") == before + 3
+
+
+def test_metrics_endpoint_serves_the_request_metrics():
+    app = Flask(__name__)
+    init_request_metrics(app)
+    app.add_url_rule("/ping", "ping", lambda: "pong")
+    client = app.test_client()
+    client.get("/ping")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'edupathfinder_http_request_seconds_count{method="GET",route="/ping",status="200"}' in body
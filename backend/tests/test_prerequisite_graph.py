@@ -0,0 +1,47 @@
+# backend/tests/test_prerequisite_graph.py
+
+import pytest
+from services.catalog_index import CatalogIndex
+from services.prerequisite_graph import PrerequisiteGraph, course_codes, normalize_course_code
+from services.program_registry import ProgramRegistry
+from tests.conftest import ROADMAP
+from tests.test_course_updates import TITLE, find_course
+
+PROGRAM = ROADMAP.replace("_", "-")
+
+
+@pytest.fixture
+def graph(local_store):
+    return PrerequisiteGraph(local_store, ProgramRegistry(local_store, [PROGRAM]), refresh_seconds=3600)
+
+
+def test_course_codes():
+    assert course_codes("Minimum grade of 'C' in CIVE 1101 and CHEM 1309/1109.") == ["CIVE 1101", "CHEM 1309", "CHEM 1109"]
+    assert course_codes(None) == []
+    assert normalize_course_code("econ-2301") == "ECON 2301"
+    assert normalize_course_code("not a code") is None
+
+
+def test_edits_applied_in_place_keep_the_title(graph, local_store):
+    assert graph.course("MATH 1324")["title"] == TITLE
+    course_id = find_course(local_store, TITLE)["courseId"]
+
+    local_store.update_course(ROADMAP, None, "prerequisite", "ECON 2301", course_id=course_id)
+    graph.course_updated(ROADMAP, course_id, "prerequisite", "ECON 2301")
+    course = graph.course("MATH 1324")
+    assert (course["title"], course["prerequisites"]) == (TITLE, ["ECON 2301"])
+
+    local_store.update_course(ROADMAP, None, "courseNumber", "MATH 1325", course_id=course_id)
+    graph.course_updated(ROADMAP, course_id, "courseNumber", "MATH 1325")
+    assert graph.course("MATH 1325")["title"] == TITLE
+    # Still known as a prerequisite of other courses, but no longer listed by the program
+    assert graph.course("MATH 1324")["programs"] == []
+
+
+def test_catalog_indexes_must_implement_both_hooks():
+    class Incomplete(CatalogIndex):
+        def _add_collection(self, program, collection_name, documents):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete(None, None, refresh_seconds=1)
@@ -0,0 +1,41 @@
+# backend/tests/test_profiling.py
+
+import os
+from flask import Flask, jsonify
+
+from profiling import PROFILE_TOKEN_HEADER, RequestProfiler
+
+
+def profiled_app(profiler):
+    app = Flask(__name__)
+    app.before_request(profiler.start)
+    app.after_request(profiler.stop)
+    app.teardown_request(profiler.discard)
+
+    @app.route('/api/colleges-degrees', endpoint='collegedegrees')
+    def colleges_degrees():
+        return jsonify([]), 200
+
+    return app
+
+
+def test_disabled_profiler_creates_no_directory(tmp_path):
+    directory = tmp_path / "profiles"
+    profiler = RequestProfiler(directory=str(directory))
+    assert not profiler.enabled
+    assert profiler.list_profiles() == []
+    assert not directory.exists()
+
+
+def test_directory_is_created_with_the_first_profile(tmp_path):
+    directory = tmp_path / "profiles"
+    profiler = RequestProfiler(directory=str(directory), token="secret")
+    client = profiled_app(profiler).test_client()
+
+    assert client.get('/api/colleges-degrees').headers.get('X-Profile') is None
+    assert not directory.exists()
+
+    response = client.get('/api/colleges-degrees', headers={PROFILE_TOKEN_HEADER: "secret"})
+    assert response.status_code == 200
+    assert os.listdir(directory) == [response.headers['X-Profile']]
+    assert [profile["file"] for profile in profiler.list_profiles()] == [response.headers['X-Profile']]
@@ -0,0 +1,86 @@
+# backend/tests/test_revision_store.py
+
+import mongomock
+import pytest
+import db.revision_store as revision_store
+from db.revision_store import CHANGES_COLLECTION, SEQUENCE_ID, RevisionStore
+
+
+@pytest.fixture
+def database():
+    return mongomock.MongoClient()["edupathfinder_test"]
+
+
+@pytest.fixture
+def revisions(database):
+    return RevisionStore(database, memo_ttl_seconds=0, poll_seconds=0, change_streams=False)
+
+
+def take_sequence_numbers(database, count):
+    """
+    Take sequence numbers without writing their changes, like writers that failed after taking them.
+    """
+    database[CHANGES_COLLECTION].update_one({"_id": SEQUENCE_ID}, {"$inc": {"value": count}}, upsert=True)
+
+
+def sequences(changes):
+    return [change["sequence"] for change in changes]
+
+
+def test_bump_increments_the_revision_and_logs_the_change(revisions):
+    assert revisions.get("a")["revision"] == 0
+    assert revisions.bump("a")["revision"] == 1
+    assert revisions.bump("a")["revision"] == 2
+    assert revisions.get("a")["revision"] == 2
+
+    changes, sequence = revisions.changes(0)
+    # Only the latest change of each collection is returned
+    assert [(change["collection"], change["revision"]) for change in changes] == [("a", 2)]
+    assert sequence == 2
+
+
+def test_changes_after_a_sequence_number(revisions):
+    for collection_name in ("a", "b", "c"):
+        revisions.bump(collection_name)
+    changes, sequence = revisions.changes(1)
+    assert [change["collection"] for change in changes] == ["b", "c"]
+    assert sequence == 3
+    assert revisions.changes(sequence) == ([], 3)
+
+
+def test_negative_since_reads_from_the_start(revisions):
+    revisions.bump("a")
+    assert sequences(revisions.changes(-1000)[0]) == [1]
+
+
+def test_a_gap_stops_the_read_until_it_settles(revisions, database, monkeypatch):
+    revisions.bump("a")
+    take_sequence_numbers(database, 1)
+    revisions.bump("b")
+
+    changes, sequence = revisions.changes(0)
+    assert sequences(changes) == [1]
+    assert sequence == 1
+
+    # The missing change is skipped once the entry after it has been visible for GAP_WAIT_SECONDS
+    monkeypatch.setattr(revision_store, "GAP_WAIT_SECONDS", 0)
+    changes, sequence = revisions.changes(sequence)
+    assert sequences(changes) == [3]
+    assert sequence == 3
+
+
+def test_a_wide_gap_settles_at_once(revisions, database, monkeypatch):
+    monkeypatch.setattr(revision_store, "GAP_WAIT_SECONDS", 0)
+    take_sequence_numbers(database, 500)
+    revisions.bump("a")
+    revisions.bump("b")
+
+    changes, sequence = revisions.changes(0)
+    assert sequences(changes) == [501, 502]
+    assert sequence == 502
+    assert len(revisions._gaps) == 1
+
+
+def test_wait_for_changes_returns_when_nothing_changed(revisions):
+    revisions.bump("a")
+    assert revisions.wait_for_changes(1, timeout=0) == ([], 1)
@@ -0,0 +1,42 @@
+# backend/tests/test_synthetic_catalog.py
+
+import json
+import pytest
+from db.course_index import iter_courses
+from db.degree_summary import compute_summary
+from db.generate_synthetic_catalog import CatalogGenerator, CatalogModel, write_catalog
+from db.local_store import LocalStore
+from tests.conftest import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def model():
+    return CatalogModel.learn(DATA_DIR)
+
+
+def test_the_same_seed_gives_the_same_catalog(model):
+    first = CatalogGenerator(model, seed=7).generate(12)
+    second = CatalogGenerator(model, seed=7).generate(12)
+    assert json.dumps(first) == json.dumps(second)
+    assert json.dumps(CatalogGenerator(model, seed=8).generate(12)) != json.dumps(first)
+
+
+def test_generated_roadmaps_have_the_catalog_shape(model):
+    entries, collections = CatalogGenerator(model, seed=1).generate(20)
+    documents = [document for roadmaps in collections.values() for document in roadmaps]
+    assert len(documents) == 20
+    assert len(entries) >= len(collections)
+    for document in documents:
+        assert document["years"]
+        assert all(course.get("title") for _, _, _, course in iter_courses(document))
+        assert compute_summary(document)["totalDegreeHours"] > 0
+
+
+def test_written_catalog_is_served_by_the_local_store(model, tmp_path):
+    entries, collections = CatalogGenerator(model, seed=2).generate(5)
+    data_files = write_catalog(entries, collections, str(tmp_path), str(tmp_path / "data_files_config.json"))
+
+    assert [data_file["collection_name"] for data_file in data_files] == ["colleges_degrees"] + sorted(collections)
+    store = LocalStore(str(tmp_path))
+    for collection_name, documents in collections.items():
+        assert len(store.get_documents(collection_name)) == len(documents)
@@ -44,6 +44,7 @@ function updateCourseData(cell, newValue) {
   // Prepare the data to send to the backend
   const updateData = {
     collectionName: collectionName,
+    courseId: row.dataset.courseId, // Preferred over the title, which can repeat within a roadmap
     courseTitle: courseTitle,
     field: fieldToUpdate,
     value: newValue,
@@ -51,14 +52,46 @@ function updateCourseData(cell, newValue) {
 
   console.log("Update data prepared:", updateData);
 
+  queueCourseEdit(updateData);
+}
+
+// Edits made in quick succession are sent together to the batch endpoint,
+// so the backend writes each touched document once instead of once per cell
+const BATCH_DELAY_MS = 400;
+let pendingEdits = [];
+let flushTimer = null;
+
+/**
+ * Queue an edit and schedule the batch to be sent
+ * @param {Object} updateData - The edit in the format of /api/update-course
+ */
+function queueCourseEdit(updateData) {
+  pendingEdits.push(updateData);
+  clearTimeout(flushTimer);
+  flushTimer = setTimeout(flushCourseEdits, BATCH_DELAY_MS);
+}
+
+/**
+ * Send all queued edits in one request
+ * @param {boolean} keepalive - Let the request outlive the page (used on pagehide)
+ */
+function flushCourseEdits(keepalive = false) {
+  clearTimeout(flushTimer);
+  if (pendingEdits.length === 0) return;
+
+  const edits = pendingEdits;
+  pendingEdits = [];
+  console.log(`Sending ${edits.length} course edits to backend`);
+
   fetch(
-    `https://flask-dp-gmaqhzfdfcadgncp.centralus-01.azurewebsites.net/api/update-course`,
+    `https://flask-dp-gmaqhzfdfcadgncp.centralus-01.azurewebsites.net/api/update-courses`,
     {
       method: "PUT",
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify(updateData),
+      body: JSON.stringify({ edits: edits }),
+      keepalive: keepalive,
     }
   )
     .then((response) => {
@@ -69,9 +102,17 @@ function updateCourseData(cell, newValue) {
       return response.json();
     })
     .then((data) => {
-      console.log("Update successful, data returned from backend:", data);
+      console.log("Batch update finished, data returned from backend:", data);
+      data.results
+        .filter((result) => result.error)
+        .forEach((result) =>
+          console.error("Error updating course data:", edits[result.index], result.error)
+        );
     })
     .catch((error) => console.error("Error updating course data:", error));
 }
 
-export { updateCourseData };
+// Do not lose edits made right before leaving the page
+window.addEventListener("pagehide", () => flushCourseEdits(true));
+
+export { updateCourseData, flushCourseEdits };
@@ -71,6 +71,10 @@ function appendSemesterRows(tableBody, semester, rowIndex) {
 
   semester.courses.forEach((course) => {
     const row = document.createElement("tr");
+    // Stable id used by the backend to update this exact course entry
+    if (course.courseId) {
+      row.dataset.courseId = course.courseId;
+    }
 
     if (firstRow) {
       row.appendChild(semesterCell);